@@ -1,17 +1,39 @@
+import asyncio
 import logging
 from datetime import time, timezone
+from pathlib import Path
 
-from telegram import BotCommand
-from telegram.ext import Application, CommandHandler
+from telegram import BotCommand, Update
+from telegram.ext import Application, ChatMemberHandler, CommandHandler, InlineQueryHandler
 
 from app.config import Settings
 from app.handlers.commands import CommandHandlers
+from app.handlers.inline import InlineQueryHandlers
+from app.handlers.processor import ChatOrderedUpdateProcessor
+from app.handlers.throttle import CommandThrottle
 from app.services import AnalyticsService, DailyReportService
 from app.services.buyback_alerts import BuybackAlertService
+from app.services.charts import ChartService
+from app.services.auto_delete import AutoDeleteQueue
+from app.services.chat_admins import ChatAdminDirectory
+from app.services.delivery_journal import DeliveryJournal
+from app.services.event_store import EventStore
+from app.services.outbound import OutboundMessageQueue
+from app.services.ticker import TickerService
 from app.services.exchange_flow_alerts import ExchangeFlowAlertService
+from app.services.metrics_history import MetricsHistoryService
 from app.services.wco_dex_alerts import WCODexAlertService
 from app.services.wco_whale_alert import WCOWhaleAlert
 from app.services.wswap_liquidity_alerts import WSwapLiquidityAlertService
+from app.utils import (
+    BRAND_IMAGE_PATH,
+    BRAND_IMAGE_SCALE,
+    PhotoUploadRegistry,
+    flush_state_stores,
+    state_store_metrics,
+    warm_brand_image,
+)
+from app.utils.timing import HandlerTimings, TimedHTTPXRequest
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +46,7 @@ PUBLIC_COMMAND_SPECS = [
     ("price", "price", "Multi-token price lookup"),
     ("token", "token", "Token details lookup (e.g. /token SOL)"),
     ("stats", "stats", "Network throughput and gas metrics"),
+    ("chart", "chart", "Price chart (e.g. /chart WCO 7d)"),
     ("dailyreport", "dailyreport", "Trigger daily metrics report manually"),
 ]
 
@@ -40,14 +63,42 @@ HIDDEN_COMMAND_SPECS = [
     ("liqstatus", "liqstatus", "Show liquidity alert status"),
     ("liqalerts", "liqalerts", "Toggle liquidity alerts (admin only)"),
     ("pairs", "pairs", "List all WCO pairs on W-Swap"),
+    ("perf", "perf", "Command latency percentiles (admin only)"),
+    ("ticker", "ticker", "Pin a live WCO ticker in this chat (admin only)"),
 ]
 ALL_COMMAND_SPECS = [*PUBLIC_COMMAND_SPECS, *HIDDEN_COMMAND_SPECS]
+
+# Update types the registered handlers consume; everything else is never delivered.
+# CommandHandler listens to messages and edited messages by default; member updates
+# keep the cached admin lists honest.
+ALLOWED_UPDATES = [
+    Update.MESSAGE,
+    Update.EDITED_MESSAGE,
+    Update.INLINE_QUERY,
+    Update.CHAT_MEMBER,
+    Update.MY_CHAT_MEMBER,
+]
 COMMAND_MENU = [BotCommand(command, description) for command, _, description in PUBLIC_COMMAND_SPECS]
 
 
-def _register_command_handlers(application: Application, command_handlers: CommandHandlers) -> None:
+def _register_command_handlers(
+    application: Application,
+    command_handlers: CommandHandlers,
+    throttle: CommandThrottle,
+    timings: HandlerTimings,
+) -> None:
     for command, handler_name, _ in ALL_COMMAND_SPECS:
-        application.add_handler(CommandHandler(command, getattr(command_handlers, handler_name)))
+        # Timing sits inside the throttle so only real handler runs are measured.
+        callback = timings.instrument(handler_name, getattr(command_handlers, handler_name))
+        callback = throttle.wrap(handler_name, callback)
+        application.add_handler(CommandHandler(command, callback))
+    inline_handlers = InlineQueryHandlers(command_handlers, command_handlers.settings)
+    application.add_handler(InlineQueryHandler(inline_handlers.inline_query))
+    application.add_handler(
+        ChatMemberHandler(
+            command_handlers.admins.on_chat_member_updated, ChatMemberHandler.ANY_CHAT_MEMBER
+        )
+    )
 
 
 def _schedule_job_queue_jobs(
@@ -59,6 +110,11 @@ def _schedule_job_queue_jobs(
     wco_dex_alerts: WCODexAlertService,
     wswap_liquidity_alerts: WSwapLiquidityAlertService,
     daily_report: DailyReportService,
+    metrics_history: MetricsHistoryService,
+    command_handlers: CommandHandlers,
+    deletions: AutoDeleteQueue,
+    ticker: TickerService,
+    events: EventStore,
 ) -> None:
     job_queue = application.job_queue
     if not job_queue:
@@ -78,6 +134,49 @@ def _schedule_job_queue_jobs(
         settings.buyback_poll_seconds,
     )
 
+    job_queue.run_repeating(
+        command_handlers.warm_caches,
+        interval=settings.cache_warm_seconds,
+        first=1,
+        name="cache_warm",
+    )
+    logger.info("Snapshot cache warm-up enabled (interval=%ss).", settings.cache_warm_seconds)
+
+    # Drains the persisted auto-delete schedule, including deletions left over from before a restart.
+    job_queue.run_repeating(
+        deletions.job_callback,
+        interval=settings.auto_delete_sweep_seconds,
+        first=5,
+        name="auto_delete",
+    )
+
+    # Applies EVENT_RETENTION_DAYS / PROCESSED_KEY_RETENTION_DAYS to the event store.
+    job_queue.run_repeating(
+        events.job_callback,
+        interval=settings.event_compact_seconds,
+        first=60,
+        name="event_store_compact",
+    )
+
+    job_queue.run_repeating(
+        ticker.job_callback,
+        interval=settings.ticker_update_seconds,
+        first=30,
+        name="ticker",
+    )
+
+    job_queue.run_repeating(
+        metrics_history.job_callback,
+        interval=settings.timeseries_sample_seconds,
+        first=20,
+        name="metrics_history",
+    )
+    logger.info(
+        "Metrics history sampling enabled (interval=%ss path=%s).",
+        settings.timeseries_sample_seconds,
+        settings.timeseries_path,
+    )
+
     # Schedule daily report at configured time (default 23:00 UTC)
     report_time = time(
         hour=settings.daily_report_hour,
@@ -161,12 +260,30 @@ def _schedule_job_queue_jobs(
 
 def build_application(settings: Settings) -> Application:
     analytics = AnalyticsService(settings)
-    buyback_alerts = BuybackAlertService(settings, analytics.wchain)
-    whale_alerts = WCOWhaleAlert(settings, analytics.wchain)
-    exchange_flow_alerts = ExchangeFlowAlertService(settings, analytics.wchain)
-    wco_dex_alerts = WCODexAlertService(settings, analytics.wchain)
-    wswap_liquidity_alerts = WSwapLiquidityAlertService(settings, analytics.wchain)
-    daily_report = DailyReportService(settings, analytics.wchain)
+    admins = ChatAdminDirectory(settings)
+    outbound = OutboundMessageQueue(settings)
+    deletions = AutoDeleteQueue(settings)
+    events = EventStore(settings)
+    journal = DeliveryJournal(settings)
+    uploads = PhotoUploadRegistry(
+        Path(settings.photo_upload_state_path), settings.telegram_token, settings.state_flush_seconds
+    )
+    buyback_alerts = BuybackAlertService(settings, analytics.wchain, outbound, events, journal)
+    whale_alerts = WCOWhaleAlert(settings, analytics.wchain, outbound, events)
+    exchange_flow_alerts = ExchangeFlowAlertService(settings, analytics.wchain, admins, outbound, events)
+    wco_dex_alerts = WCODexAlertService(
+        settings, analytics.wchain, admins, outbound, deletions, events, journal
+    )
+    wswap_liquidity_alerts = WSwapLiquidityAlertService(
+        settings, analytics.wchain, admins, outbound, deletions, events, journal
+    )
+    daily_report = DailyReportService(settings, analytics.wchain, uploads, outbound)
+    metrics_history = MetricsHistoryService(settings, analytics.wchain)
+    charts = ChartService(settings, metrics_history)
+    ticker = TickerService(settings, analytics, outbound)
+    throttle = CommandThrottle(settings, outbound)
+    update_processor = ChatOrderedUpdateProcessor(max(1, settings.update_concurrency))
+    timings = HandlerTimings()
     command_handlers = CommandHandlers(
         analytics,
         settings,
@@ -175,11 +292,36 @@ def build_application(settings: Settings) -> Application:
         wco_dex_alerts,
         wswap_liquidity_alerts,
         daily_report,
+        charts,
+        uploads,
+        timings,
+        admins,
+        ticker,
     )
+    command_handlers.register_metrics("chat_admins", admins.metrics)
+    command_handlers.register_metrics("outbound", outbound.metrics)
+    command_handlers.register_metrics("auto_delete", deletions.metrics)
+    command_handlers.register_metrics("events", events.metrics)
+    command_handlers.register_metrics("journal", journal.metrics)
+    command_handlers.register_metrics("ticker", ticker.metrics)
+    command_handlers.register_metrics("wco_dex", wco_dex_alerts.metrics)
+    command_handlers.register_metrics("wswap_liquidity", wswap_liquidity_alerts.metrics)
+    command_handlers.register_metrics("wswap_pairs", wswap_liquidity_alerts.pairs.metrics)
+    command_handlers.register_metrics("throttle", throttle.metrics)
+    command_handlers.register_metrics("updates", update_processor.metrics)
+    command_handlers.register_metrics("state", state_store_metrics)
 
     async def _post_init(application: Application) -> None:
         await application.bot.set_my_commands(COMMAND_MENU)
 
+        # Encode the branded photo once, off the event loop, before the first reply needs it.
+        try:
+            await asyncio.to_thread(
+                warm_brand_image, BRAND_IMAGE_PATH, BRAND_IMAGE_SCALE, settings.brand_image_policy
+            )
+        except Exception:
+            logger.warning("Brand image warm-up failed; it will be encoded on first use.")
+
         application.bot_data["buyback_alerts"] = buyback_alerts
         await buyback_alerts.ensure_initialized()
         logger.info("Buyback alert service initialized.")
@@ -188,6 +330,8 @@ def build_application(settings: Settings) -> Application:
         await daily_report.ensure_initialized()
         logger.info("Daily report service initialized.")
 
+        application.bot_data["metrics_history"] = metrics_history
+
         if settings.movement_alerts_enabled:
             application.bot_data["whale_alerts"] = whale_alerts
             await whale_alerts.ensure_initialized()
@@ -214,16 +358,38 @@ def build_application(settings: Settings) -> Application:
             wco_dex_alerts=wco_dex_alerts,
             wswap_liquidity_alerts=wswap_liquidity_alerts,
             daily_report=daily_report,
+            metrics_history=metrics_history,
+            command_handlers=command_handlers,
+            deletions=deletions,
+            ticker=ticker,
+            events=events,
         )
 
+    async def _post_stop(application: Application) -> None:
+        # The bot's HTTP client is closed by Application.shutdown(), so drain queued sends before it.
+        await outbound.stop()
+
+    async def _post_shutdown(application: Application) -> None:
+        await journal.close()
+        wco_dex_alerts.close()
+        wswap_liquidity_alerts.close()
+        await flush_state_stores()
+        await metrics_history.flush()
+        events.close()
+        charts.shutdown()
+
     application = (
         Application.builder()
         .token(settings.telegram_token)
+        .request(TimedHTTPXRequest(connection_pool_size=256))
+        .concurrent_updates(update_processor)
         .post_init(_post_init)
+        .post_stop(_post_stop)
+        .post_shutdown(_post_shutdown)
         .build()
     )
 
-    _register_command_handlers(application, command_handlers)
+    _register_command_handlers(application, command_handlers, throttle, timings)
 
     logger.info("Telegram application wired with command handlers.")
     return application
@@ -1,11 +1,12 @@
 import asyncio
 import logging
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Dict, Iterable, Optional, Tuple
 
 import httpx
 
 from app.config import Settings
 from app.utils import TTLCache
+from app.utils.timing import upstream_phase
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +35,7 @@ class WChainClient:
 
     async def get_token_counters(self, contract_address: str) -> Optional[Dict]:
         url = f"{self.settings.blockscout_base}/tokens/{contract_address}/counters"
-        cache_key = f"token:counters:{contract_address.lower()}"
+        cache_key = self.token_counters_cache_key(contract_address)
         return await self._fetch_json(url, cache_key=cache_key, ttl=self.settings.cache_stats_ttl)
 
     async def get_network_stats(self) -> Optional[Dict]:
@@ -47,6 +48,27 @@ class WChainClient:
             self.settings.gas_oracle_endpoint, cache_key="network:gas", ttl=self.settings.cache_stats_ttl
         )
 
+    def peek(self, cache_key: str) -> Optional[Dict]:
+        """Return a live cached payload without ever touching the network."""
+        return self._cache.get(cache_key)
+
+    @staticmethod
+    def token_counters_cache_key(contract_address: str) -> str:
+        return f"token:counters:{contract_address.lower()}"
+
+    def cache_stamp(self, *cache_keys: str) -> Optional[Tuple[int, ...]]:
+        """
+        Return the versions of the given cached payloads, or None if any of them
+        is missing or expired (i.e. the next read would hit the network).
+        """
+        versions = []
+        for key in cache_keys:
+            version = self._cache.version(key)
+            if version is None:
+                return None
+            versions.append(version)
+        return tuple(versions)
+
     async def get_address_transactions(
         self,
         address: str,
@@ -70,14 +92,7 @@ class WChainClient:
         if page_size:
             params["page_size"] = int(page_size)
 
-        try:
-            async with httpx.AsyncClient(timeout=self.settings.http_timeout) as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPError as exc:
-            logger.warning("HTTP error calling %s: %s", url, exc)
-            return None
+        return await self._get_json(url, params=params)
 
     async def get_address_internal_transactions(
         self,
@@ -97,28 +112,14 @@ class WChainClient:
         if page_size:
             params["page_size"] = int(page_size)
 
-        try:
-            async with httpx.AsyncClient(timeout=self.settings.http_timeout) as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPError as exc:
-            logger.warning("HTTP error calling %s: %s", url, exc)
-            return None
+        return await self._get_json(url, params=params)
 
     async def get_transaction(self, tx_hash: str) -> Optional[Dict[str, Any]]:
         """
         Fetch transaction details by hash from Blockscout.
         """
         url = f"{self.settings.blockscout_base}/transactions/{tx_hash}"
-        try:
-            async with httpx.AsyncClient(timeout=self.settings.http_timeout) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPError as exc:
-            logger.warning("HTTP error calling %s: %s", url, exc)
-            return None
+        return await self._get_json(url)
 
     async def get_transaction_token_transfers(
         self, tx_hash: str, *, page_size: int = 50
@@ -132,14 +133,7 @@ class WChainClient:
         if page_size:
             params["page_size"] = int(page_size)
 
-        try:
-            async with httpx.AsyncClient(timeout=self.settings.http_timeout) as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPError as exc:
-            logger.warning("HTTP error calling %s: %s", url, exc)
-            return None
+        return await self._get_json(url, params=params)
 
     async def get_address_token_transfers(
         self,
@@ -155,38 +149,27 @@ class WChainClient:
         if page_size:
             params["page_size"] = int(page_size)
 
-        try:
-            async with httpx.AsyncClient(timeout=self.settings.http_timeout) as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPError as exc:
-            logger.warning("HTTP error calling %s: %s", url, exc)
-            return None
+        return await self._get_json(url, params=params)
 
     async def get_address_logs(
         self,
         address: str,
         *,
         page_size: int = 50,
+        page_params: Optional[Dict[str, Any]] = None,
     ) -> Optional[Dict[str, Any]]:
         """
         Fetch event logs for a contract address from Blockscout.
         Returns decoded events like Swap, Mint, Burn, PairCreated, etc.
+
+        Pass a response's ``next_page_params`` as ``page_params`` to fetch the next (older) page.
         """
         url = f"{self.settings.blockscout_base}/addresses/{address}/logs"
-        params: Dict[str, Any] = {}
+        params: Dict[str, Any] = dict(page_params or {})
         if page_size:
             params["page_size"] = int(page_size)
 
-        try:
-            async with httpx.AsyncClient(timeout=self.settings.http_timeout) as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPError as exc:
-            logger.warning("HTTP error calling %s: %s", url, exc)
-            return None
+        return await self._get_json(url, params=params)
 
     async def get_token_info(self, token_address: str) -> Optional[Dict[str, Any]]:
         """
@@ -198,17 +181,11 @@ class WChainClient:
             return cached
 
         url = f"{self.settings.blockscout_base}/tokens/{token_address}"
-        try:
-            async with httpx.AsyncClient(timeout=self.settings.http_timeout) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                data = response.json()
-                # Cache for 1 hour (token info rarely changes)
-                self._cache.set(cache_key, data, 3600)
-                return data
-        except httpx.HTTPError as exc:
-            logger.warning("HTTP error calling %s: %s", url, exc)
-            return None
+        data = await self._get_json(url)
+        if data is not None:
+            # Cache for 1 hour (token info rarely changes)
+            self._cache.set(cache_key, data, 3600)
+        return data
 
     async def get_recent_transactions(
         self,
@@ -227,34 +204,34 @@ class WChainClient:
         if filter_type:
             params["filter"] = filter_type
 
-        try:
-            async with httpx.AsyncClient(timeout=self.settings.http_timeout) as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPError as exc:
-            logger.warning("HTTP error calling %s: %s", url, exc)
-            return None
+        return await self._get_json(url, params=params)
 
     async def _fetch_json(self, url: str, cache_key: Optional[str], ttl: Optional[int]) -> Optional[Dict]:
         if cache_key:
-            cached = self._cache.get(cache_key)
+            cached = self._cache.fresh(cache_key)
             if cached is not None:
                 return cached
 
-        try:
-            async with httpx.AsyncClient(timeout=self.settings.http_timeout) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                data = response.json()
-        except httpx.HTTPError as exc:
-            logger.warning("HTTP error calling %s: %s", url, exc)
+        data = await self._get_json(url)
+        if data is None:
             return self._cache.get(cache_key) if cache_key else None
 
         if cache_key and ttl:
             self._cache.set(cache_key, data, ttl)
         return data
 
+    async def _get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict]:
+        """GET ``url`` and decode JSON; HTTP failures are logged and return None."""
+        with upstream_phase():
+            try:
+                async with httpx.AsyncClient(timeout=self.settings.http_timeout) as client:
+                    response = await client.get(url, params=params)
+                    response.raise_for_status()
+                    return response.json()
+            except httpx.HTTPError as exc:
+                logger.warning("HTTP error calling %s: %s", url, exc)
+                return None
+
 
 class ReferencePriceClient:
     """Lightweight helper for non W-Chain prices (USDT, USDC, etc.)."""
@@ -275,30 +252,44 @@ class ReferencePriceClient:
         if not coingecko_ids:
             return result
 
-        cache_key = "fiat:" + ",".join(normalized)
-        cached = self._cache.get(cache_key)
-        if cached:
+        cached = self.peek_prices(coingecko_ids)
+        missing = {
+            symbol: cg_id
+            for symbol, cg_id in coingecko_ids.items()
+            if self._cache.fresh(self.price_cache_key(symbol)) is None
+        }
+        if not missing:
             return {**result, **cached}
 
         params = {
-            "ids": ",".join(filter(None, coingecko_ids.values())),
+            "ids": ",".join(filter(None, missing.values())),
             "vs_currencies": "usd",
         }
 
         try:
-            async with httpx.AsyncClient(timeout=self.settings.http_timeout) as client:
-                response = await client.get(self.settings.coin_prices_url, params=params)
-                response.raise_for_status()
-                payload = response.json()
+            with upstream_phase():
+                async with httpx.AsyncClient(timeout=self.settings.http_timeout) as client:
+                    response = await client.get(self.settings.coin_prices_url, params=params)
+                    response.raise_for_status()
+                    payload = response.json()
         except httpx.HTTPError as exc:
             logger.warning("Failed to fetch reference prices: %s", exc)
-            return result
+            return {**result, **cached}
 
-        parsed: Dict[str, Optional[float]] = {}
-        for symbol, cg_id in coingecko_ids.items():
+        parsed: Dict[str, Optional[float]] = dict(cached)
+        for symbol, cg_id in missing.items():
             usd_value = payload.get(cg_id, {}).get("usd")
             parsed[symbol] = float(usd_value) if usd_value is not None else None
+            if parsed[symbol] is not None:
+                # Cached per symbol so any later combination of symbols can reuse it.
+                self._cache.set(self.price_cache_key(symbol), parsed[symbol], self.settings.cache_price_ttl)
 
-        self._cache.set(cache_key, parsed, self.settings.cache_price_ttl)
         return {**result, **parsed}
 
+    def peek_prices(self, symbols: Iterable[str]) -> Dict[str, Optional[float]]:
+        """Cached reference prices for ``symbols``; never makes a request."""
+        return {symbol.upper(): self._cache.get(self.price_cache_key(symbol)) for symbol in symbols}
+
+    @staticmethod
+    def price_cache_key(symbol: str) -> str:
+        return f"fiat:{symbol.upper()}"
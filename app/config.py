@@ -1,9 +1,13 @@
 import os
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from functools import cached_property
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
 
 from dotenv import load_dotenv
 
+from app.utils.images import EncodingPolicy
+
 load_dotenv()
 
 _TRUE_VALUES = {"1", "true", "yes", "on"}
@@ -24,6 +28,41 @@ class TokenProfile:
     info_url: Optional[str] = None
 
 
+@dataclass(frozen=True)
+class TokenCatalogIndex:
+    """Immutable lookup tables over the token catalog, built once per Settings."""
+
+    profiles: Tuple[TokenProfile, ...]
+    by_symbol: Mapping[str, TokenProfile]
+    by_contract: Mapping[str, TokenProfile]
+
+    @classmethod
+    def build(cls, catalog: Iterable[TokenProfile]) -> "TokenCatalogIndex":
+        profiles = tuple(catalog)
+        by_symbol: Dict[str, TokenProfile] = {}
+        by_contract: Dict[str, TokenProfile] = {}
+        for profile in profiles:
+            # First entry wins, matching the previous linear scan semantics.
+            by_symbol.setdefault(profile.symbol.upper(), profile)
+            if profile.contract:
+                by_contract.setdefault(profile.contract.lower(), profile)
+        return cls(
+            profiles=profiles,
+            by_symbol=MappingProxyType(by_symbol),
+            by_contract=MappingProxyType(by_contract),
+        )
+
+    @property
+    def symbols(self) -> List[str]:
+        return [profile.symbol for profile in self.profiles]
+
+    def get_symbol(self, symbol: str) -> Optional[TokenProfile]:
+        return self.by_symbol.get(symbol.upper())
+
+    def get_contract(self, contract: str) -> Optional[TokenProfile]:
+        return self.by_contract.get(contract.lower())
+
+
 @dataclass
 class Settings:
     """Centralised configuration for the Telegram bot."""
@@ -162,6 +201,13 @@ class Settings:
     wco_dex_auto_delete_seconds: int = field(
         default_factory=lambda: int(os.getenv("WCO_DEX_AUTO_DELETE_SECONDS", "300"))  # 5 minutes
     )
+    # Coalesce bursts of pool alerts into one digest (window 0 = only alerts from the same poll)
+    wco_dex_digest_window_seconds: int = field(
+        default_factory=lambda: int(os.getenv("WCO_DEX_DIGEST_WINDOW_SECONDS", "0"))
+    )
+    wco_dex_digest_min_events: int = field(
+        default_factory=lambda: int(os.getenv("WCO_DEX_DIGEST_MIN_EVENTS", "4"))
+    )
     # W-Swap liquidity alert settings
     wswap_liquidity_alerts_enabled: bool = field(
         default_factory=lambda: _env_bool("WSWAP_LIQUIDITY_ALERTS_ENABLED", "true")
@@ -186,6 +232,13 @@ class Settings:
     wswap_liquidity_auto_delete_seconds: int = field(
         default_factory=lambda: int(os.getenv("WSWAP_LIQUIDITY_AUTO_DELETE_SECONDS", "600"))  # 10 min
     )
+    # Coalesce bursts of liquidity alerts into one digest (window 0 = only alerts from the same poll)
+    wswap_liquidity_digest_window_seconds: int = field(
+        default_factory=lambda: int(os.getenv("WSWAP_LIQUIDITY_DIGEST_WINDOW_SECONDS", "0"))
+    )
+    wswap_liquidity_digest_min_events: int = field(
+        default_factory=lambda: int(os.getenv("WSWAP_LIQUIDITY_DIGEST_MIN_EVENTS", "4"))
+    )
     # Daily report settings
     daily_report_enabled: bool = field(
         default_factory=lambda: _env_bool("DAILY_REPORT_ENABLED", "true")
@@ -202,6 +255,164 @@ class Settings:
     daily_report_state_path: str = field(
         default_factory=lambda: os.getenv("DAILY_REPORT_STATE_PATH", ".alert_state.json")
     )
+    # Update delivery: long polling by default, or a webhook listener when enabled
+    webhook_enabled: bool = field(default_factory=lambda: _env_bool("WEBHOOK_ENABLED"))
+    # Public base URL Telegram posts to (e.g. https://bot.example.com); WEBHOOK_PATH is appended
+    webhook_url: str = field(default_factory=lambda: os.getenv("WEBHOOK_URL", "").strip())
+    webhook_path: str = field(
+        default_factory=lambda: os.getenv("WEBHOOK_PATH", "telegram").strip().strip("/")
+    )
+    webhook_listen: str = field(default_factory=lambda: os.getenv("WEBHOOK_LISTEN", "0.0.0.0"))
+    webhook_port: int = field(
+        default_factory=lambda: int(os.getenv("WEBHOOK_PORT", os.getenv("PORT", "8443")))
+    )
+    # Sent back by Telegram in X-Telegram-Bot-Api-Secret-Token; generated per run when unset
+    webhook_secret_token: str = field(
+        default_factory=lambda: os.getenv("WEBHOOK_SECRET_TOKEN", "").strip()
+    )
+    # Optional TLS for serving HTTPS directly (otherwise terminate TLS at a proxy)
+    webhook_cert_path: str = field(default_factory=lambda: os.getenv("WEBHOOK_CERT_PATH", "").strip())
+    webhook_key_path: str = field(default_factory=lambda: os.getenv("WEBHOOK_KEY_PATH", "").strip())
+    webhook_max_connections: int = field(
+        default_factory=lambda: int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
+    )
+    # Updates handled concurrently (updates from one chat still run in order)
+    update_concurrency: int = field(
+        default_factory=lambda: int(os.getenv("UPDATE_CONCURRENCY", "16"))
+    )
+    # Outbound message queue limits (Telegram allows ~30 msg/s overall, ~20 msg/min per group)
+    outbound_global_per_second: float = field(
+        default_factory=lambda: float(os.getenv("OUTBOUND_GLOBAL_PER_SECOND", "30"))
+    )
+    outbound_group_per_minute: float = field(
+        default_factory=lambda: float(os.getenv("OUTBOUND_GROUP_PER_MINUTE", "20"))
+    )
+    outbound_group_burst: int = field(
+        default_factory=lambda: int(os.getenv("OUTBOUND_GROUP_BURST", "3"))
+    )
+    outbound_private_per_second: float = field(
+        default_factory=lambda: float(os.getenv("OUTBOUND_PRIVATE_PER_SECOND", "1"))
+    )
+    # Sends awaited concurrently by the outbound queue
+    outbound_max_in_flight: int = field(
+        default_factory=lambda: int(os.getenv("OUTBOUND_MAX_IN_FLIGHT", "16"))
+    )
+    # Persisted auto-delete schedule for alert messages, drained every N seconds
+    auto_delete_state_path: str = field(
+        default_factory=lambda: os.getenv("AUTO_DELETE_STATE_PATH", ".alert_state.json")
+    )
+    auto_delete_sweep_seconds: int = field(
+        default_factory=lambda: int(os.getenv("AUTO_DELETE_SWEEP_SECONDS", "10"))
+    )
+    # Live /ticker boards: refresh interval and persisted message ids
+    ticker_update_seconds: int = field(
+        default_factory=lambda: int(os.getenv("TICKER_UPDATE_SECONDS", "60"))
+    )
+    ticker_state_path: str = field(
+        default_factory=lambda: os.getenv("TICKER_STATE_PATH", ".alert_state.json")
+    )
+    # Seconds to batch state-file updates before one atomic write
+    state_flush_seconds: float = field(
+        default_factory=lambda: float(os.getenv("STATE_FLUSH_SECONDS", "1.0"))
+    )
+    # SQLite history of detected events, watcher cursors and processed keys (0 days = keep forever)
+    event_store_path: str = field(
+        default_factory=lambda: os.getenv("EVENT_STORE_PATH", ".alert_events.sqlite3")
+    )
+    event_retention_days: float = field(
+        default_factory=lambda: float(os.getenv("EVENT_RETENTION_DAYS", "90"))
+    )
+    processed_key_retention_days: float = field(
+        default_factory=lambda: float(os.getenv("PROCESSED_KEY_RETENTION_DAYS", "14"))
+    )
+    event_compact_seconds: int = field(
+        default_factory=lambda: int(os.getenv("EVENT_COMPACT_SECONDS", "3600"))
+    )
+    # Minimum size of the Bloom filter built from the event store's processed keys (0 = disabled)
+    dedupe_bloom_capacity: int = field(
+        default_factory=lambda: int(os.getenv("DEDUPE_BLOOM_CAPACITY", "20000"))
+    )
+    dedupe_bloom_error_rate: float = field(
+        default_factory=lambda: float(os.getenv("DEDUPE_BLOOM_ERROR_RATE", "0.001"))
+    )
+    # Write-ahead journal of alert sends; unsent alerts older than this are not resent after a restart
+    delivery_journal_path: str = field(
+        default_factory=lambda: os.getenv("DELIVERY_JOURNAL_PATH", ".alert_journal.jsonl")
+    )
+    delivery_journal_max_age_seconds: int = field(
+        default_factory=lambda: int(os.getenv("DELIVERY_JOURNAL_MAX_AGE_SECONDS", "3600"))
+    )
+    # Pools/pairs a DEX or liquidity watcher polls at the same time
+    pool_poll_concurrency: int = field(
+        default_factory=lambda: int(os.getenv("POOL_POLL_CONCURRENCY", "4"))
+    )
+    # Token metadata lookups made at once when new W-Swap pairs are registered
+    token_metadata_concurrency: int = field(
+        default_factory=lambda: int(os.getenv("TOKEN_METADATA_CONCURRENCY", "8"))
+    )
+    # Memory-mapped rings of recently processed transaction hashes
+    wco_dex_processed_ring_path: str = field(
+        default_factory=lambda: os.getenv("WCO_DEX_PROCESSED_RING_PATH", ".wco_dex_processed.ring")
+    )
+    wswap_liquidity_processed_ring_path: str = field(
+        default_factory=lambda: os.getenv("WSWAP_LIQUIDITY_PROCESSED_RING_PATH", ".wswap_liquidity_processed.ring")
+    )
+    # Seconds a chat's administrator list is cached (also invalidated on member updates)
+    chat_admin_cache_ttl: int = field(
+        default_factory=lambda: int(os.getenv("CHAT_ADMIN_CACHE_TTL", "600"))
+    )
+    # Command rate limits (token buckets) and duplicate-response reuse window
+    command_user_burst: int = field(
+        default_factory=lambda: int(os.getenv("COMMAND_USER_BURST", "3"))
+    )
+    command_user_rate_per_minute: float = field(
+        default_factory=lambda: float(os.getenv("COMMAND_USER_RATE_PER_MINUTE", "6"))
+    )
+    command_chat_burst: int = field(
+        default_factory=lambda: int(os.getenv("COMMAND_CHAT_BURST", "10"))
+    )
+    command_chat_rate_per_minute: float = field(
+        default_factory=lambda: float(os.getenv("COMMAND_CHAT_RATE_PER_MINUTE", "30"))
+    )
+    command_reuse_seconds: int = field(
+        default_factory=lambda: int(os.getenv("COMMAND_REUSE_SECONDS", "30"))
+    )
+    # Inline mode: client-side cache hint and how often cached snapshots are refreshed
+    inline_cache_seconds: int = field(
+        default_factory=lambda: int(os.getenv("INLINE_CACHE_SECONDS", "30"))
+    )
+    cache_warm_seconds: int = field(
+        default_factory=lambda: int(os.getenv("CACHE_WARM_SECONDS", "40"))
+    )
+    # Branded photo encoding: smallest of these formats meeting the PSNR floor within the byte budget
+    brand_image_formats: str = field(
+        default_factory=lambda: os.getenv("BRAND_IMAGE_FORMATS", "jpeg,png")
+    )
+    brand_image_min_psnr: float = field(
+        default_factory=lambda: float(os.getenv("BRAND_IMAGE_MIN_PSNR", "38"))
+    )
+    brand_image_max_bytes: int = field(
+        default_factory=lambda: int(os.getenv("BRAND_IMAGE_MAX_BYTES", "150000"))
+    )
+    # Telegram file_id registry for uploaded brand photos
+    photo_upload_state_path: str = field(
+        default_factory=lambda: os.getenv("PHOTO_UPLOAD_STATE_PATH", ".alert_state.json")
+    )
+    # Time-series history sampled from cached oracle/Blockscout data
+    timeseries_path: str = field(
+        default_factory=lambda: os.getenv("TIMESERIES_PATH", ".metrics_history.bin")
+    )
+    timeseries_sample_seconds: int = field(
+        default_factory=lambda: int(os.getenv("TIMESERIES_SAMPLE_SECONDS", "300"))
+    )
+    # Samples retained per series (8640 x 5 min = 30 days)
+    timeseries_capacity: int = field(
+        default_factory=lambda: int(os.getenv("TIMESERIES_CAPACITY", "8640"))
+    )
+    # Worker threads used to render /chart images off the event loop
+    chart_render_workers: int = field(
+        default_factory=lambda: int(os.getenv("CHART_RENDER_WORKERS", "2"))
+    )
     token_catalog: List[TokenProfile] = field(
         default_factory=lambda: [
             TokenProfile(
@@ -288,9 +499,24 @@ class Settings:
         ]
     )
 
+    @cached_property
+    def catalog_index(self) -> TokenCatalogIndex:
+        return TokenCatalogIndex.build(self.token_catalog)
+
+    @cached_property
+    def brand_image_policy(self) -> EncodingPolicy:
+        return EncodingPolicy.parse(
+            self.brand_image_formats, self.brand_image_min_psnr, self.brand_image_max_bytes
+        )
+
     @property
     def wave_contract(self) -> Optional[str]:
-        return next((token.contract for token in self.token_catalog if token.symbol == "WAVE"), None)
+        profile = self.catalog_index.get_symbol("WAVE")
+        return profile.contract if profile else None
+
+    @property
+    def webhook_endpoint(self) -> str:
+        return f"{self.webhook_url.rstrip('/')}/{self.webhook_path}"
 
     @property
     def stats_endpoint(self) -> str:
@@ -309,5 +535,11 @@ class Settings:
     @classmethod
     def from_env(cls) -> "Settings":
         token = cls._require("TELEGRAM_BOT_TOKEN", os.getenv("TELEGRAM_BOT_TOKEN"))
-        return cls(telegram_token=token)
+        settings = cls(telegram_token=token)
+        try:
+            # Parsed now so a typo fails at startup, not inside the first photo send.
+            settings.brand_image_policy
+        except ValueError as exc:
+            raise RuntimeError(f"Invalid BRAND_IMAGE_FORMATS: {exc}") from exc
+        return settings
 
@@ -1,6 +1,7 @@
 """Telegram command handlers."""
 
 from .commands import CommandHandlers
+from .inline import InlineQueryHandlers
 
-__all__ = ["CommandHandlers"]
+__all__ = ["CommandHandlers", "InlineQueryHandlers"]
 
@@ -1,26 +1,55 @@
+import asyncio
 import logging
-from pathlib import Path
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
-from telegram import Message, Update
+from telegram import Chat, Message, Update
 from telegram.ext import ContextTypes
 from telegram.error import TelegramError
 
 from app.config import Settings
 from app.services import AnalyticsService, DailyReportService
 from app.services.buyback_alerts import BuybackAlertService
+from app.services.chat_admins import ChatAdminDirectory
+from app.services.charts import (
+    CHART_SERIES,
+    CHART_WINDOWS,
+    DEFAULT_CHART_SYMBOL,
+    DEFAULT_CHART_WINDOW,
+    ChartService,
+)
 from app.services.exchange_flow_alerts import ExchangeFlowAlertService
+from app.services.ticker import TickerService
 from app.services.wco_dex_alerts import WCODexAlertService
 from app.services.wswap_liquidity_alerts import WSwapLiquidityAlertService
-from app.utils import format_percent, format_token_amount, format_usd, get_resized_brand_image, humanize_number
+from app.handlers.throttle import record_response
+from app.utils.timing import HandlerTimings
+from app.utils import (
+    BRAND_IMAGE_PATH,
+    BRAND_IMAGE_SCALE,
+    CachedResponse,
+    PhotoUploadRegistry,
+    ResponseCache,
+    format_percent,
+    format_token_amount,
+    format_usd,
+    get_brand_image_async,
+    get_resized_brand_image,
+    humanize_number,
+    refresh_ahead,
+)
 from decimal import Decimal, InvalidOperation
 
 
 logger = logging.getLogger(__name__)
-BRAND_IMAGE_PATH = Path(__file__).resolve().parents[2] / "wocean.png"
 BRAND_CAPTION = "🌊 W-Ocean ecosystem update"
 MAX_CAPTION_LENGTH = 1024
-# Scale factor for brand image (0.5 = half size)
-BRAND_IMAGE_SCALE = 0.5
+# Telegram rejects messages over 4096 characters; /perf is split below that.
+MAX_PERF_MESSAGE_LENGTH = 4000
+# Each component's metrics line in /perf is cut to this many characters.
+MAX_PERF_METRICS_LINE = 300
+# (text, parse_mode, cacheable) produced by a response renderer.
+RenderedResponse = Tuple[str, Optional[str], bool]
 
 
 class CommandHandlers:
@@ -35,6 +64,11 @@ class CommandHandlers:
         wco_dex_alerts: WCODexAlertService | None = None,
         wswap_liquidity_alerts: WSwapLiquidityAlertService | None = None,
         daily_report: DailyReportService | None = None,
+        charts: ChartService | None = None,
+        uploads: PhotoUploadRegistry | None = None,
+        timings: HandlerTimings | None = None,
+        admins: ChatAdminDirectory | None = None,
+        ticker: TickerService | None = None,
     ):
         self.analytics = analytics
         self.settings = settings
@@ -43,6 +77,17 @@ class CommandHandlers:
         self.wco_dex_alerts = wco_dex_alerts
         self.wswap_liquidity_alerts = wswap_liquidity_alerts
         self.daily_report = daily_report
+        self.charts = charts
+        self.uploads = uploads
+        self.timings = timings
+        self.admins = admins or ChatAdminDirectory(settings)
+        self.live_ticker = ticker
+        self.responses = ResponseCache()
+        self._metric_providers: Dict[str, Callable[[], Dict[str, Any]]] = {
+            "response_cache": self.responses.metrics,
+        }
+        if uploads is not None:
+            self._metric_providers["photo_uploads"] = uploads.metrics
 
     async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         message = await self._ensure_message(update)
@@ -57,6 +102,7 @@ class CommandHandlers:
             "• /price [symbols] - quick multi-token prices\n"
             "• /token <symbol> - detailed token view\n"
             "• /stats - network and gas metrics\n"
+            "• /chart [symbol] [24h|7d|30d] - price chart\n"
             "• /dailyreport - trigger daily report\n\n"
             "_Tip: additional admin/alert commands are available but hidden from the menu._\n"
             "🌐 scan.w-chain.com"
@@ -67,44 +113,15 @@ class CommandHandlers:
         message = await self._ensure_message(update)
         if not message:
             return
-        data = await self.analytics.build_wco_overview()
-        if not data:
-            await self._send_branded_message(
-                message, "Unable to load WCO analytics right now. Please try again shortly.", parse_mode=None
-            )
-            return
-
-        distribution = data.get("distribution") or {}
-        text = (
-            "🟠 *WCO Analytics*\n\n"
-            f"• Price: {format_usd(data.get('price'))}\n"
-            f"• Market Cap: {format_usd(data.get('market_cap'))}\n"
-            f"• Circulating: {format_token_amount(data.get('circulating'))} WCO\n"
-            f"• Locked: {format_token_amount(data.get('locked'))} WCO\n"
-            f"• Burned: {format_token_amount(data.get('burned'))} WCO\n"
-            f"• Total Supply: {format_token_amount(data.get('total'))} WCO\n\n"
-            "*Distribution*\n"
-            f"• Circulating: {format_percent(distribution.get('circulating'))}\n"
-            f"• Locked: {format_percent(distribution.get('locked'))}\n"
-            f"• Burned: {format_percent(distribution.get('burned'))}\n"
-        )
-        await self._send_branded_message(message, text)
+        text, parse_mode = await self._cached_response("wco", self._render_wco)
+        await self._send_branded_message(message, text, parse_mode=parse_mode)
 
     async def wave(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         message = await self._ensure_message(update)
         if not message:
             return
-        data = await self.analytics.build_wave_overview()
-        counters = data.get("counters") or {}
-        text = (
-            "🌊 *WAVE Token Overview*\n\n"
-            f"• Price: {format_usd(data.get('price_usd'))}\n"
-            f"• Price (WCO): {format_token_amount(data.get('price_wco'))} WCO\n"
-            f"• Holders: {humanize_number(counters.get('token_holders_count'))}\n"
-            f"• Transfers: {humanize_number(counters.get('transfers_count'))}\n"
-            "\nWAVE fuels W-Swap incentives, liquidity mining, and community rewards across the W-Chain DEX stack."
-        )
-        await self._send_branded_message(message, text)
+        text, parse_mode = await self._cached_response("wave", self._render_wave)
+        await self._send_branded_message(message, text, parse_mode=parse_mode)
 
     async def price(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         message = await self._ensure_message(update)
@@ -117,50 +134,21 @@ class CommandHandlers:
                 message, "No prices available right now, please retry shortly.", parse_mode=None
             )
             return
-        lines = ["💹 *Token Prices*"]
-        for symbol, value in prices.items():
-            display = format_usd(value) if value is not None else "N/A"
-            lines.append(f"{symbol}: {display}")
-        lines.append("\nPowered by W-Chain Oracle & CoinGecko reference feeds.")
-        await self._send_branded_message(message, "\n".join(lines))
+        await self._send_branded_message(message, self.format_prices(prices))
 
     async def stats(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         message = await self._ensure_message(update)
         if not message:
             return
-        try:
-            data = await self.analytics.network_stats()
-        except Exception:
-            logger.exception("Failed to load network stats.")
-            await self._send_branded_message(
-                message, "Unable to load network stats right now. Please try again shortly.", parse_mode=None
-            )
-            return
-        if not data:
-            await self._send_branded_message(
-                message, "Network stats are unavailable at the moment. Please try again soon.", parse_mode=None
-            )
-            return
-        lines = [
-            "📡 *Network Stats*",
-            f"• Last Block: {int(data.get('last_block')) if data.get('last_block') else 'N/A'}",
-            f"• Total Transactions: {humanize_number(data.get('tx_count'))}",
-            f"• Active Wallets: {humanize_number(data.get('wallets'))}",
-            f"• Average Gas: {humanize_number(data.get('gas'), 4)} Gwei",
-        ]
-        await self._send_branded_message(message, "\n".join(lines))
+        text, parse_mode = await self._cached_response("stats", self._render_stats)
+        await self._send_branded_message(message, text, parse_mode=parse_mode)
 
     async def tokens(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         message = await self._ensure_message(update)
         if not message:
             return
-        catalog = self._token_reference_section()
-        if not catalog:
-            await self._send_branded_message(
-                message, "No token references configured yet.", parse_mode=None
-            )
-            return
-        await self._send_branded_message(message, catalog)
+        text, parse_mode = await self._cached_response("tokens", self._render_tokens)
+        await self._send_branded_message(message, text, parse_mode=parse_mode)
 
     async def token(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Show detailed info for a specific token. Usage: /token <symbol>"""
@@ -170,7 +158,7 @@ class CommandHandlers:
 
         if not context.args:
             # List available tokens when no argument provided
-            available = [t.symbol for t in self.settings.token_catalog]
+            available = self.settings.catalog_index.symbols
             text = (
                 "🔍 *Token Lookup*\n\n"
                 f"Usage: `/token <symbol>`\n\n"
@@ -183,7 +171,7 @@ class CommandHandlers:
         data = await self.analytics.build_token_overview(symbol)
 
         if not data:
-            available = [t.symbol for t in self.settings.token_catalog]
+            available = self.settings.catalog_index.symbols
             text = (
                 f"❌ Token `{symbol}` not found.\n\n"
                 f"Available tokens: {', '.join(available)}"
@@ -210,6 +198,51 @@ class CommandHandlers:
 
         await self._send_branded_message(message, "\n".join(lines))
 
+    async def chart(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Render a price chart. Usage: /chart [WCO|WAVE] [24h|7d|30d]"""
+        message = await self._ensure_message(update)
+        if not message:
+            return
+
+        if not self.charts:
+            await message.reply_text("Charts are not configured.")
+            return
+
+        symbol = DEFAULT_CHART_SYMBOL
+        window = DEFAULT_CHART_WINDOW
+        for arg in context.args or []:
+            if arg.upper() in CHART_SERIES:
+                symbol = arg.upper()
+            elif arg.lower() in CHART_WINDOWS:
+                window = arg.lower()
+            else:
+                await message.reply_text(
+                    "Usage: /chart [symbol] [window]\n"
+                    f"Symbols: {', '.join(CHART_SERIES)}\n"
+                    f"Windows: {', '.join(CHART_WINDOWS)}"
+                )
+                return
+
+        try:
+            chart = await self.charts.get_chart(symbol, window)
+        except Exception:
+            logger.exception("Failed to render %s %s chart.", symbol, window)
+            await message.reply_text("Unable to render the chart right now. Please try again shortly.")
+            return
+
+        if not chart:
+            await message.reply_text(
+                f"Not enough {symbol} price history for a {window} chart yet. Please check back soon."
+            )
+            return
+
+        sent = await message.reply_photo(
+            photo=chart.png,
+            caption=f"📈 *{symbol} Price* · {window}",
+            parse_mode="Markdown",
+        )
+        record_response(sent)
+
     async def buybackalerts(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         message = await self._ensure_message(update)
         if not message:
@@ -375,6 +408,7 @@ class CommandHandlers:
             f"• Liquidity threshold: {format_token_amount(self.settings.wco_dex_min_liquidity_wco)} WCO\n"
             f"• Whale threshold: {format_token_amount(self.settings.wco_dex_whale_threshold_wco)} WCO "
             f"or ${self.settings.wco_dex_whale_threshold_usdt:,.2f} USDT\n\n"
+            f"{_format_recent_events(await self.wco_dex_alerts.recent_events())}\n\n"
             "Use /dexalerts [on|off] to toggle (admin only)."
         )
         await self._send_branded_message(message, text)
@@ -437,6 +471,7 @@ class CommandHandlers:
             f"• Min USD: ${min_usd:,.0f}\n"
             f"• Auto-delete: {auto_delete}s ({auto_delete // 60} min)\n"
             f"• Factory: `{factory[:20]}...`\n\n"
+            f"{_format_recent_events(await self.wswap_liquidity_alerts.recent_events())}\n\n"
             "Use /liqalerts [on|off] to toggle (admin only).\n"
             "Use /pairs to see all WCO pairs."
         )
@@ -455,7 +490,8 @@ class CommandHandlers:
             return
 
         summary = await self.wswap_liquidity_alerts.get_all_pairs_summary()
-        await message.reply_text(summary, parse_mode="MarkdownV2", disable_web_page_preview=True)
+        sent = await message.reply_text(summary, parse_mode="MarkdownV2", disable_web_page_preview=True)
+        record_response(sent)
 
     async def dailyreport(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """
@@ -485,6 +521,222 @@ class CommandHandlers:
             logger.exception("Failed to send manual daily report")
             await message.reply_text(f"❌ Failed to send daily report: {e}")
 
+    async def ticker(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """
+        Start or stop the pinned live WCO ticker in this chat. Admin only in groups.
+        Usage: /ticker [on|off]
+        """
+        message = await self._ensure_message(update)
+        if not message:
+            return
+
+        if not self.live_ticker:
+            await message.reply_text("Live ticker service not configured.")
+            return
+
+        user = update.effective_user
+        if not user or not await self._is_chat_admin(context, message.chat, user.id):
+            await message.reply_text("⛔ /ticker is restricted to chat admins.")
+            return
+
+        enable = self._parse_toggle_argument(context.args)
+        if enable is None:
+            enable = not self.live_ticker.is_running(message.chat_id)
+        if enable:
+            _, result_msg = await self.live_ticker.start(context.bot, message.chat_id)
+        else:
+            _, result_msg = await self.live_ticker.stop(context.bot, message.chat_id)
+        await message.reply_text(result_msg)
+
+    async def perf(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """
+        Show per-command latency percentiles and component metrics. Admin only in groups.
+        Usage: /perf
+        """
+        message = await self._ensure_message(update)
+        if not message:
+            return
+
+        user = update.effective_user
+        if not user or not await self._is_chat_admin(context, message.chat, user.id):
+            await message.reply_text("⛔ /perf is restricted to chat admins.")
+            return
+
+        for text in self._render_perf():
+            await message.reply_text(text, parse_mode="Markdown")
+
+    def register_metrics(self, name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+        """Expose a component's ``metrics()`` in /perf."""
+        self._metric_providers[name] = provider
+
+    def _render_perf(self) -> List[str]:
+        """The /perf reply, split into messages Telegram accepts."""
+        latency_lines: List[str] = []
+        for command, latency in self.timings.items() if self.timings is not None else ():
+            if not latency.total.count:
+                continue
+            phases = "  ".join(
+                f"{phase[:3]} {stats['p50_ms']:.0f}/{stats['p95_ms']:.0f}/{stats['p99_ms']:.0f}"
+                for phase, stats in latency.snapshot().items()
+            )
+            latency_lines.append(f"/{command} n={latency.total.count}  {phases}")
+
+        metrics_lines: List[str] = []
+        for name, provider in self._metric_providers.items():
+            try:
+                values = provider()
+            except Exception:
+                logger.exception("Metrics provider %s failed.", name)
+                continue
+            line = f"{name}: {_flatten_metrics(values)}"
+            if len(line) > MAX_PERF_METRICS_LINE:
+                line = line[: MAX_PERF_METRICS_LINE - 1] + "…"
+            metrics_lines.append(line)
+
+        return _pack_code_sections(
+            [
+                (
+                    "⏱ *Handler latency* (ms, p50/p95/p99 of total, upstream, render, send)",
+                    latency_lines or ["no commands recorded yet"],
+                ),
+                ("📦 *Components*", metrics_lines or ["no components registered"]),
+            ],
+            MAX_PERF_MESSAGE_LENGTH,
+        )
+
+    async def _is_chat_admin(self, context: ContextTypes.DEFAULT_TYPE, chat: Chat, user_id: int) -> bool:
+        if chat.type == Chat.PRIVATE:
+            return True
+        return await self.admins.is_admin(context.bot, chat.id, user_id)
+
+    def cached_snapshot(self, command: str) -> Optional[CachedResponse]:
+        """Rendered response for ``command`` if it is still current; never fetches or renders."""
+        return self.responses.get(command, self.analytics.response_stamp(command))
+
+    async def warm_caches(self, context: ContextTypes.DEFAULT_TYPE | None = None) -> None:
+        """
+        Refresh upstream payloads and rendered snapshots ahead of expiry so
+        cache-only readers (inline queries) always have something to serve.
+
+        Any upstream entry that would expire before the next run (plus one
+        slow fetch) is refetched now, once, and every snapshot is re-rendered
+        from the result.
+        """
+        symbols = list(dict.fromkeys([*self.settings.default_price_symbols, *self.settings.coingecko_ids]))
+        with refresh_ahead(self.settings.cache_warm_seconds + self.settings.http_timeout):
+            # One after another: the snapshots share upstream entries, and refetching one while
+            # another snapshot is rendering would leave that snapshot stamped with a stale version.
+            steps = [self._refresh_response(command, render) for command, render in self._snapshot_renderers()]
+            steps.append(self.analytics.price_lookup(symbols))
+            for step in steps:
+                try:
+                    await step
+                except Exception as exc:
+                    logger.warning("Cache warm-up step failed: %s", exc)
+
+    def _snapshot_renderers(self) -> Tuple[Tuple[str, Callable[[], Awaitable[RenderedResponse]]], ...]:
+        return (
+            ("wco", self._render_wco),
+            ("wave", self._render_wave),
+            ("stats", self._render_stats),
+            ("tokens", self._render_tokens),
+        )
+
+    async def _refresh_response(self, command: str, render: Callable[[], Awaitable[RenderedResponse]]) -> None:
+        # A failed render keeps the previous snapshot, which stays servable until its data expires.
+        text, parse_mode, cacheable = await render()
+        if cacheable:
+            self.responses.put(command, text, parse_mode, self.analytics.response_stamp(command))
+
+    async def _cached_response(
+        self, command: str, render: Callable[[], Awaitable[RenderedResponse]]
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Serve a parameterless command from the response cache, re-rendering only
+        when the upstream data it was built from has changed.
+        """
+        started = time.perf_counter()
+        cached = self.responses.get(command, self.analytics.response_stamp(command))
+        if cached:
+            elapsed = time.perf_counter() - started
+            self.responses.served_latency.record(elapsed)
+            logger.debug("/%s served from response cache in %.2fms", command, elapsed * 1000)
+            return cached.text, cached.parse_mode
+
+        text, parse_mode, cacheable = await render()
+        if cacheable:
+            self.responses.put(command, text, parse_mode, self.analytics.response_stamp(command))
+        elapsed = time.perf_counter() - started
+        self.responses.render_latency.record(elapsed)
+        logger.debug("/%s rendered on demand in %.2fms", command, elapsed * 1000)
+        return text, parse_mode
+
+    async def _render_wco(self) -> RenderedResponse:
+        data = await self.analytics.build_wco_overview()
+        if not data:
+            return "Unable to load WCO analytics right now. Please try again shortly.", None, False
+
+        distribution = data.get("distribution") or {}
+        text = (
+            "🟠 *WCO Analytics*\n\n"
+            f"• Price: {format_usd(data.get('price'))}\n"
+            f"• Market Cap: {format_usd(data.get('market_cap'))}\n"
+            f"• Circulating: {format_token_amount(data.get('circulating'))} WCO\n"
+            f"• Locked: {format_token_amount(data.get('locked'))} WCO\n"
+            f"• Burned: {format_token_amount(data.get('burned'))} WCO\n"
+            f"• Total Supply: {format_token_amount(data.get('total'))} WCO\n\n"
+            "*Distribution*\n"
+            f"• Circulating: {format_percent(distribution.get('circulating'))}\n"
+            f"• Locked: {format_percent(distribution.get('locked'))}\n"
+            f"• Burned: {format_percent(distribution.get('burned'))}\n"
+        )
+        return text, "Markdown", True
+
+    async def _render_wave(self) -> RenderedResponse:
+        data = await self.analytics.build_wave_overview()
+        counters = data.get("counters") or {}
+        text = (
+            "🌊 *WAVE Token Overview*\n\n"
+            f"• Price: {format_usd(data.get('price_usd'))}\n"
+            f"• Price (WCO): {format_token_amount(data.get('price_wco'))} WCO\n"
+            f"• Holders: {humanize_number(counters.get('token_holders_count'))}\n"
+            f"• Transfers: {humanize_number(counters.get('transfers_count'))}\n"
+            "\nWAVE fuels W-Swap incentives, liquidity mining, and community rewards across the W-Chain DEX stack."
+        )
+        return text, "Markdown", True
+
+    async def _render_stats(self) -> RenderedResponse:
+        try:
+            data = await self.analytics.network_stats()
+        except Exception:
+            logger.exception("Failed to load network stats.")
+            return "Unable to load network stats right now. Please try again shortly.", None, False
+        if not data:
+            return "Network stats are unavailable at the moment. Please try again soon.", None, False
+        lines = [
+            "📡 *Network Stats*",
+            f"• Last Block: {int(data.get('last_block')) if data.get('last_block') else 'N/A'}",
+            f"• Total Transactions: {humanize_number(data.get('tx_count'))}",
+            f"• Active Wallets: {humanize_number(data.get('wallets'))}",
+            f"• Average Gas: {humanize_number(data.get('gas'), 4)} Gwei",
+        ]
+        return "\n".join(lines), "Markdown", True
+
+    async def _render_tokens(self) -> RenderedResponse:
+        catalog = self._token_reference_section()
+        if not catalog:
+            return "No token references configured yet.", None, False
+        return catalog, "Markdown", True
+
+    @staticmethod
+    def format_prices(prices: Dict[str, Optional[float]]) -> str:
+        lines = ["💹 *Token Prices*"]
+        for symbol, value in prices.items():
+            display = format_usd(value) if value is not None else "N/A"
+            lines.append(f"{symbol}: {display}")
+        lines.append("\nPowered by W-Chain Oracle & CoinGecko reference feeds.")
+        return "\n".join(lines)
+
     async def _ensure_message(self, update: Update):
         if not update.message:
             return None
@@ -494,16 +746,29 @@ class CommandHandlers:
         send_text = True
         if BRAND_IMAGE_PATH.exists():
             try:
-                photo_buffer = get_resized_brand_image(BRAND_IMAGE_PATH, scale=BRAND_IMAGE_SCALE)
                 if len(text) <= MAX_CAPTION_LENGTH:
-                    await message.reply_photo(photo=photo_buffer, caption=text, parse_mode=parse_mode)
+                    record_response(await self._reply_brand_photo(message, text, parse_mode))
                     send_text = False
                 else:
-                    await message.reply_photo(photo=photo_buffer, caption=BRAND_CAPTION, parse_mode="Markdown")
+                    await self._reply_brand_photo(message, BRAND_CAPTION, "Markdown")
             except TelegramError:
                 logger.exception("Unable to send branding image, falling back to text.")
         if send_text:
-            await message.reply_text(text, parse_mode=parse_mode)
+            record_response(await message.reply_text(text, parse_mode=parse_mode))
+
+    async def _reply_brand_photo(self, message: Message, caption: str, parse_mode: str | None) -> Message:
+        """Reply with the brand photo, by cached file_id when the upload registry knows one."""
+        if self.uploads is None:
+            photo_buffer = await asyncio.to_thread(
+                get_resized_brand_image, BRAND_IMAGE_PATH, BRAND_IMAGE_SCALE, self.settings.brand_image_policy
+            )
+            return await message.reply_photo(photo=photo_buffer, caption=caption, parse_mode=parse_mode)
+        brand_image = await get_brand_image_async(self.settings.brand_image_policy)
+        return await self.uploads.send(
+            brand_image.data,
+            lambda photo: message.reply_photo(photo=photo, caption=caption, parse_mode=parse_mode),
+            filename=brand_image.filename,
+        )
 
     @staticmethod
     def _parse_toggle_argument(args: list[str]) -> bool | None:
@@ -535,3 +800,50 @@ class CommandHandlers:
         lines.append("\n🔍 Use /token <symbol> for details")
         return "\n".join(lines)
 
+
+def _format_recent_events(events: List[Dict[str, Any]]) -> str:
+    lines = ["*Recent alerts*"]
+    now = time.time()
+    for event in events:
+        age_minutes = max(0, int(now - event["occurred_at"]) // 60)
+        age = f"{age_minutes}m ago" if age_minutes < 120 else f"{age_minutes // 60}h ago"
+        kind = str(event["kind"]).replace("_", " ")
+        value = f" · {format_usd(event['usd'])}" if event["usd"] is not None else ""
+        lines.append(f"• {kind}{value} · {age}")
+    if len(lines) == 1:
+        lines.append("• None recorded yet")
+    return "\n".join(lines)
+
+
+def _pack_code_sections(sections: List[Tuple[str, List[str]]], limit: int) -> List[str]:
+    """Lay out (heading, code lines) sections as messages of at most ``limit`` characters."""
+    messages: List[str] = []
+    current: List[str] = []
+    for heading, lines in sections:
+        opening = [heading, "```"]
+        # Start the section in a new message unless its heading and first line still fit.
+        if current and len("\n".join(current + opening + lines[:1])) + 4 > limit:
+            messages.append("\n".join(current))
+            current = []
+        current += opening
+        for line in lines:
+            if len("\n".join(current + [line])) + 4 > limit:
+                # Close the code block and carry on in a new message.
+                messages.append("\n".join(current + ["```"]))
+                current = ["```"]
+            current.append(line)
+        current.append("```")
+    messages.append("\n".join(current))
+    return messages
+
+
+def _flatten_metrics(values: Dict[str, Any], prefix: str = "") -> str:
+    parts: List[str] = []
+    for key, value in values.items():
+        if isinstance(value, dict):
+            parts.append(_flatten_metrics(value, f"{prefix}{key}."))
+        elif isinstance(value, float):
+            parts.append(f"{prefix}{key}={value:.1f}")
+        else:
+            parts.append(f"{prefix}{key}={value}")
+    return " ".join(part for part in parts if part)
@@ -0,0 +1,104 @@
+"""Inline query mode (``@bot wco``, ``@bot price BTC``) served from cached snapshots only."""
+
+import hashlib
+import logging
+from typing import List, Optional
+
+from telegram import InlineQueryResultArticle, InputTextMessageContent, Update
+from telegram.error import TelegramError
+from telegram.ext import ContextTypes
+
+from app.config import Settings
+from app.handlers.commands import CommandHandlers
+
+logger = logging.getLogger(__name__)
+
+# Inline keyword -> (snapshot command, result title, result description)
+SNAPSHOT_RESULTS = {
+    "wco": ("wco", "🟠 WCO Analytics", "Price, market cap and supply"),
+    "wave": ("wave", "🌊 WAVE Overview", "Price, holders and transfers"),
+    "stats": ("stats", "📡 Network Stats", "Blocks, transactions, wallets and gas"),
+    "tokens": ("tokens", "🪙 Ecosystem Tokens", "Key W-Chain assets and contracts"),
+}
+PRICE_KEYWORD = "price"
+MAX_PRICE_SYMBOLS = 10
+
+
+class InlineQueryHandlers:
+    """
+    Answers inline queries at keystroke rate.
+
+    Nothing here awaits an upstream call: results come from the rendered
+    response snapshots and the price caches, which ``CommandHandlers.warm_caches``
+    keeps fresh on a schedule. Anything not cached is simply left out of the
+    results, and ``cache_time`` lets Telegram serve repeats from its own cache.
+    """
+
+    def __init__(self, command_handlers: CommandHandlers, settings: Settings):
+        self.commands = command_handlers
+        self.settings = settings
+
+    async def inline_query(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        query = update.inline_query
+        if not query:
+            return
+
+        results = self.build_results(query.query)
+        try:
+            await query.answer(results, cache_time=self.settings.inline_cache_seconds, is_personal=False)
+        except TelegramError as exc:
+            # Queries expire quickly and users keep typing; a stale answer is not worth more.
+            logger.debug("Inline query answer failed: %s", exc)
+
+    def build_results(self, raw_query: str) -> List[InlineQueryResultArticle]:
+        terms = raw_query.strip().split()
+        keyword = terms[0].lower() if terms else ""
+        results: List[InlineQueryResultArticle] = []
+
+        if keyword == PRICE_KEYWORD or (keyword and not _is_keyword_prefix(keyword)):
+            # "price BTC ETH" or a bare list of symbols ("BTC ETH").
+            symbols = terms[1:] if keyword == PRICE_KEYWORD else terms
+            article = self._price_article(symbols[:MAX_PRICE_SYMBOLS])
+            return [article] if article else []
+
+        for name, (command, title, description) in SNAPSHOT_RESULTS.items():
+            if keyword and not name.startswith(keyword):
+                continue
+            snapshot = self.commands.cached_snapshot(command)
+            if snapshot is None:
+                continue
+            results.append(
+                InlineQueryResultArticle(
+                    id=_result_id(name, snapshot.text),
+                    title=title,
+                    description=description,
+                    input_message_content=InputTextMessageContent(snapshot.text, parse_mode=snapshot.parse_mode),
+                )
+            )
+
+        if not keyword or PRICE_KEYWORD.startswith(keyword):
+            article = self._price_article([])
+            if article:
+                results.append(article)
+        return results
+
+    def _price_article(self, symbols: List[str]) -> Optional[InlineQueryResultArticle]:
+        prices = self.commands.analytics.peek_prices(symbols or None)
+        if not prices or all(value is None for value in prices.values()):
+            return None
+        text = self.commands.format_prices(prices)
+        return InlineQueryResultArticle(
+            id=_result_id("price", text),
+            title="💹 Token Prices",
+            description=", ".join(prices),
+            input_message_content=InputTextMessageContent(text, parse_mode="Markdown"),
+        )
+
+
+def _is_keyword_prefix(keyword: str) -> bool:
+    return PRICE_KEYWORD.startswith(keyword) or any(name.startswith(keyword) for name in SNAPSHOT_RESULTS)
+
+
+def _result_id(kind: str, text: str) -> str:
+    # Stable per content, so Telegram's client cache lines up with ours (ids max 64 bytes).
+    return f"{kind}:{hashlib.sha1(text.encode('utf-8')).hexdigest()[:20]}"
@@ -0,0 +1,189 @@
+"""Rate limiting and duplicate-response reuse in front of the command handlers."""
+
+import functools
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from telegram import Message, Update
+from telegram.error import TelegramError
+from telegram.ext import ContextTypes
+
+from app.config import Settings
+from app.services.outbound import OutboundMessageQueue, Priority
+from app.utils.rate_limit import KeyedTokenBuckets
+
+logger = logging.getLogger(__name__)
+
+HandlerCallback = Callable[[Update, ContextTypes.DEFAULT_TYPE], Awaitable[None]]
+
+# Commands whose answer only depends on (command, args) within a short window,
+# so a repeat can be pointed at the earlier reply instead of being recomputed.
+REUSABLE_COMMANDS: FrozenSet[str] = frozenset(
+    {"start", "wco", "wave", "price", "token", "stats", "chart", "tokens", "pairs"}
+)
+
+# Admin and toggle commands: dropping these silently leaves the caller guessing whether
+# the change took effect, so a throttled one gets a notice instead.
+CONTROL_COMMANDS: FrozenSet[str] = frozenset(
+    {"buybackalerts", "flowalerts", "dexalerts", "liqalerts", "perf", "ticker"}
+)
+
+# Collects the messages a handler sent while it runs (one list per handler task).
+_sent_messages: ContextVar[Optional[List[Message]]] = ContextVar("sent_messages", default=None)
+
+
+def record_response(sent: Optional[Message]) -> None:
+    """Register ``sent`` as (part of) the reply to the command currently being handled."""
+    collected = _sent_messages.get()
+    if collected is not None and sent is not None:
+        collected.append(sent)
+
+
+@dataclass(frozen=True)
+class _PreviousResponse:
+    message_id: int
+    sent_at: float
+
+
+class CommandThrottle:
+    """
+    Token buckets per user and per chat, plus response reuse.
+
+    A user over their budget is ignored silently, so spamming does not turn
+    into spamming replies. A chat over its budget only gets pointer replies.
+    The exception is ``CONTROL_COMMANDS``: a throttled one gets a single
+    notice saying when to retry, then nothing more until that time.
+    Inside ``command_reuse_seconds``, a repeat of the same read-only command
+    and arguments in the same chat gets a short reply quoting the earlier
+    answer. No upstream call or photo upload is made for it. With an
+    ``outbound`` queue, those pointer replies go out in its follow-up lane.
+    """
+
+    def __init__(self, settings: Settings, outbound: Optional[OutboundMessageQueue] = None):
+        self.reuse_seconds = settings.command_reuse_seconds
+        self.outbound = outbound
+        self._users: KeyedTokenBuckets[int] = KeyedTokenBuckets(
+            settings.command_user_rate_per_minute / 60, settings.command_user_burst
+        )
+        self._chats: KeyedTokenBuckets[int] = KeyedTokenBuckets(
+            settings.command_chat_rate_per_minute / 60, settings.command_chat_burst
+        )
+        self._previous: Dict[Tuple[int, str, str], _PreviousResponse] = {}
+        # user (or chat) id -> when its last throttle notice stops covering further drops
+        self._notified_until: Dict[int, float] = {}
+        self.throttled = 0
+        self.reused = 0
+        self.notices = 0
+
+    def wrap(self, command: str, callback: HandlerCallback) -> HandlerCallback:
+        async def throttled(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+            await self._handle(command, callback, update, context)
+
+        throttled.__name__ = getattr(callback, "__name__", command)
+        throttled.__doc__ = getattr(callback, "__doc__", None)
+        return throttled
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "throttled": self.throttled,
+            "reused": self.reused,
+            "notices": self.notices,
+            "tracked_users": len(self._users),
+        }
+
+    async def _handle(
+        self,
+        command: str,
+        callback: HandlerCallback,
+        update: Update,
+        context: ContextTypes.DEFAULT_TYPE,
+    ) -> None:
+        message = update.effective_message
+        chat = update.effective_chat
+        user = update.effective_user
+        if message is None or chat is None:
+            await callback(update, context)
+            return
+
+        now = time.monotonic()
+        if user is not None and not self._users.try_acquire(user.id, now=now):
+            self.throttled += 1
+            logger.debug("Dropping /%s from user %s: rate limited.", command, user.id)
+            wait = self._users.bucket(user.id, now).retry_after(now=now)
+            await self._notify_throttled(command, message, user.id, wait, now)
+            return
+
+        reuse_key = None
+        if command in REUSABLE_COMMANDS and self.reuse_seconds > 0:
+            args = " ".join(arg.lower() for arg in (context.args or []))
+            reuse_key = (chat.id, command, args)
+            previous = self._previous.get(reuse_key)
+            if previous is not None and now - previous.sent_at <= self.reuse_seconds:
+                await self._point_to_previous(message, previous, now)
+                return
+
+        if not self._chats.try_acquire(chat.id, now=now):
+            self.throttled += 1
+            logger.debug("Dropping /%s in chat %s: rate limited.", command, chat.id)
+            wait = self._chats.bucket(chat.id, now).retry_after(now=now)
+            await self._notify_throttled(command, message, user.id if user is not None else chat.id, wait, now)
+            return
+
+        collected: List[Message] = []
+        token = _sent_messages.set(collected)
+        try:
+            await callback(update, context)
+        finally:
+            _sent_messages.reset(token)
+
+        if reuse_key is not None and collected:
+            self._remember(reuse_key, collected[-1].message_id, now)
+
+    async def _point_to_previous(self, message: Message, previous: _PreviousResponse, now: float) -> None:
+        self.reused += 1
+        age = max(1, int(now - previous.sent_at))
+        reply = functools.partial(
+            message.reply_text,
+            f"👆 Same answer as above (posted {age}s ago).",
+            reply_to_message_id=previous.message_id,
+            allow_sending_without_reply=True,
+        )
+        if self.outbound is not None:
+            self.outbound.submit(message.chat_id, reply, Priority.FOLLOW_UP, label="repeat pointer")
+            return
+        try:
+            await reply()
+        except TelegramError:
+            logger.warning("Unable to point to previous response %s.", previous.message_id)
+
+    async def _notify_throttled(self, command: str, message: Message, key: int, wait: float, now: float) -> None:
+        if command not in CONTROL_COMMANDS or self._notified_until.get(key, 0.0) > now:
+            return
+        wait = max(1.0, wait)
+        self._notified_until[key] = now + wait
+        if len(self._notified_until) > 1024:
+            for stale in [k for k, until in self._notified_until.items() if until <= now]:
+                del self._notified_until[stale]
+        self.notices += 1
+        reply = functools.partial(
+            message.reply_text,
+            f"⏳ Too many commands; /{command} was not run. Try again in {int(wait + 0.999)}s.",
+            allow_sending_without_reply=True,
+        )
+        if self.outbound is not None:
+            self.outbound.submit(message.chat_id, reply, Priority.FOLLOW_UP, label="throttle notice")
+            return
+        try:
+            await reply()
+        except TelegramError:
+            logger.warning("Unable to send throttle notice for /%s.", command)
+
+    def _remember(self, key: Tuple[int, str, str], message_id: int, now: float) -> None:
+        self._previous[key] = _PreviousResponse(message_id=message_id, sent_at=now)
+        if len(self._previous) > 1024:
+            cutoff = now - self.reuse_seconds
+            for stale in [k for k, v in self._previous.items() if v.sent_at < cutoff]:
+                del self._previous[stale]
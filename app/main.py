@@ -1,8 +1,7 @@
 import logging
+import secrets
 
-from telegram import Update
-
-from app.bot import build_application
+from app.bot import ALLOWED_UPDATES, build_application
 from app.config import Settings
 
 
@@ -17,10 +16,33 @@ def main() -> None:
     configure_logging()
     settings = Settings.from_env()
     application = build_application(settings)
+    if settings.webhook_enabled:
+        if not settings.webhook_url:
+            raise RuntimeError("WEBHOOK_ENABLED is set but WEBHOOK_URL is missing.")
+        # Telegram echoes this in a header and PTB rejects requests without it.
+        secret_token = settings.webhook_secret_token or secrets.token_urlsafe(32)
+        logging.info(
+            "Starting W-Chain Telegram bot (webhook %s, listening on %s:%s)...",
+            settings.webhook_endpoint,
+            settings.webhook_listen,
+            settings.webhook_port,
+        )
+        application.run_webhook(
+            listen=settings.webhook_listen,
+            port=settings.webhook_port,
+            url_path=settings.webhook_path,
+            webhook_url=settings.webhook_endpoint,
+            cert=settings.webhook_cert_path or None,
+            key=settings.webhook_key_path or None,
+            secret_token=secret_token,
+            allowed_updates=ALLOWED_UPDATES,
+            max_connections=settings.webhook_max_connections,
+        )
+        return
+
     logging.info("Starting W-Chain Telegram bot...")
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    application.run_polling(allowed_updates=ALLOWED_UPDATES)
 
 
 if __name__ == "__main__":
     main()
-
@@ -1,5 +1,5 @@
 import asyncio
-from typing import Dict, Iterable, Optional
+from typing import Dict, Iterable, Optional, Tuple
 
 from app.clients import ReferencePriceClient, WChainClient
 from app.config import Settings
@@ -13,6 +13,27 @@ class AnalyticsService:
         self.wchain = WChainClient(settings)
         self.reference = ReferencePriceClient(settings)
 
+    def response_stamp(self, command: str) -> Optional[Tuple[int, ...]]:
+        """
+        Version stamp of the cached upstream data a parameterless command renders.
+
+        Returns None when any source is missing or expired, meaning the command
+        has to fetch (and re-render) before it can reply.
+        """
+        if command == "wco":
+            return self.wchain.cache_stamp("price:wco", "supply:wco")
+        if command == "wave":
+            keys = ["price:wave", "price:wco"]
+            if self.settings.wave_contract:
+                keys.append(self.wchain.token_counters_cache_key(self.settings.wave_contract))
+            return self.wchain.cache_stamp(*keys)
+        if command == "stats":
+            return self.wchain.cache_stamp("network:stats")
+        if command == "tokens":
+            # Static content derived from configuration only.
+            return ()
+        return None
+
     async def build_wco_overview(self) -> Dict:
         price_data, supply_data, stats = await asyncio.gather(
             self.wchain.get_wco_price(),
@@ -89,6 +110,27 @@ class AnalyticsService:
 
         return result
 
+    def peek_prices(self, symbols: Optional[Iterable[str]]) -> Dict[str, Optional[float]]:
+        """
+        Same shape as ``price_lookup`` but served purely from cached payloads,
+        for latency-critical paths that must never wait on an upstream call.
+        """
+        symbols = list(symbols) if symbols else self.settings.default_price_symbols
+        symbols = [symbol.upper() for symbol in symbols if symbol]
+
+        result: Dict[str, Optional[float]] = {symbol: None for symbol in symbols}
+        if "WCO" in result:
+            result["WCO"] = _safe_float(self.wchain.peek("price:wco"), "price")
+        if "WAVE" in result:
+            result["WAVE"] = _safe_float(self.wchain.peek("price:wave"), "price")
+
+        remaining = [symbol for symbol in symbols if result.get(symbol) is None]
+        if remaining:
+            for symbol, price in self.reference.peek_prices(remaining).items():
+                if price is not None:
+                    result[symbol] = price
+        return result
+
     async def network_stats(self) -> Dict:
         stats = await self.wchain.get_network_stats() or {}
         gas_prices = stats.get("gas_prices") or {}
@@ -115,22 +157,17 @@ class AnalyticsService:
     async def build_token_overview(self, symbol: str) -> Optional[Dict]:
         """Build overview for a specific token from the catalog."""
         symbol_upper = symbol.upper()
-        profile = next(
-            (t for t in self.settings.token_catalog if t.symbol.upper() == symbol_upper),
-            None,
-        )
+        profile = self.settings.catalog_index.get_symbol(symbol_upper)
         if not profile:
             return None
 
-        # Fetch price
-        prices = await self.price_lookup([symbol_upper])
+        # Price and counters come from independent upstreams; fetch them together.
+        prices, counters = await asyncio.gather(
+            self.price_lookup([symbol_upper]),
+            self.wchain.get_token_counters(profile.contract) if profile.contract else _none(),
+        )
         price = prices.get(symbol_upper)
 
-        # Fetch counters if contract exists
-        counters = None
-        if profile.contract:
-            counters = await self.wchain.get_token_counters(profile.contract)
-
         return {
             "symbol": profile.symbol,
             "name": profile.name,
@@ -142,6 +179,10 @@ class AnalyticsService:
         }
 
 
+async def _none() -> None:
+    return None
+
+
 def _safe_float(payload: Optional[Dict], key: str) -> Optional[float]:
     if not payload:
         return None
@@ -0,0 +1,136 @@
+"""Persisted schedule of alert messages to delete, drained by one periodic job."""
+
+import heapq
+import logging
+import time
+from typing import Dict, List, Tuple
+
+from telegram import Bot
+from telegram.error import BadRequest, Forbidden, TelegramError
+from telegram.ext import ContextTypes
+
+from app.config import Settings
+from app.services.outbound import is_transient_error
+from app.utils.state_store import get_state_store
+
+logger = logging.getLogger(__name__)
+
+STATE_SECTION = "auto_delete"
+# Bots can only delete messages that are less than 48 hours old.
+DELETE_WINDOW_SECONDS = 48 * 3600
+# deleteMessages accepts at most 100 ids per call.
+BULK_DELETE_LIMIT = 100
+# Delay before retrying deletions that hit a network error.
+RETRY_DELAY_SECONDS = 30.0
+
+# (delete_at, chat_id, message_id, posted_at); wall-clock times so they survive restarts.
+_Entry = Tuple[float, str, int, float]
+
+
+class AutoDeleteQueue:
+    """
+    Min-heap of pending deletions ordered by delete-at time, persisted to the
+    shared state file.
+
+    Pending deletions survive restarts. A single repeating job (``job_callback``)
+    pops everything that is due and deletes it, one ``deleteMessages`` call
+    per chat and up to 100 messages. Bots without ``Bot.delete_messages``
+    (python-telegram-bot < 20.8) fall back to one ``deleteMessage`` call per
+    message. Entries past Telegram's 48-hour deletion window are dropped.
+    """
+
+    def __init__(self, settings: Settings):
+        self._state = get_state_store(settings.auto_delete_state_path, settings.state_flush_seconds)
+        self._heap: List[_Entry] = []
+        self.deleted = 0
+        self.expired = 0
+        self.failed = 0
+        self._load_state()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, chat_id: str | int, message_id: int, delay_seconds: float) -> None:
+        now = time.time()
+        heapq.heappush(self._heap, (now + delay_seconds, str(chat_id), int(message_id), now))
+        self._save_state()
+        logger.debug("Scheduled auto-delete for message %s in %s in %.0f seconds.", message_id, chat_id, delay_seconds)
+
+    async def job_callback(self, context: ContextTypes.DEFAULT_TYPE) -> None:
+        await self.sweep(context.bot)
+
+    async def sweep(self, bot: Bot) -> int:
+        """Delete every message that is due; returns how many were deleted."""
+        now = time.time()
+        due: Dict[str, List[Tuple[int, float]]] = {}
+        while self._heap and self._heap[0][0] <= now:
+            _, chat_id, message_id, posted_at = heapq.heappop(self._heap)
+            if now - posted_at >= DELETE_WINDOW_SECONDS:
+                self.expired += 1
+                continue
+            due.setdefault(chat_id, []).append((message_id, posted_at))
+        if not due:
+            return 0
+
+        deleted = 0
+        for chat_id, messages in due.items():
+            for start in range(0, len(messages), BULK_DELETE_LIMIT):
+                deleted += await self._delete_batch(bot, chat_id, messages[start : start + BULK_DELETE_LIMIT])
+        self.deleted += deleted
+        self._save_state()
+        logger.debug("Auto-delete sweep removed %d message(s) across %d chat(s).", deleted, len(due))
+        return deleted
+
+    async def _delete_batch(self, bot: Bot, chat_id: str, messages: List[Tuple[int, float]]) -> int:
+        delete_messages = getattr(bot, "delete_messages", None)
+        if delete_messages is None:
+            deleted = 0
+            for message in messages:
+                deleted += await self._delete_one(bot, chat_id, message)
+            return deleted
+
+        try:
+            await delete_messages(chat_id=chat_id, message_ids=[message_id for message_id, _ in messages])
+            return len(messages)
+        except TelegramError as exc:
+            return self._handle_failure(chat_id, messages, exc)
+
+    async def _delete_one(self, bot: Bot, chat_id: str, message: Tuple[int, float]) -> int:
+        try:
+            await bot.delete_message(chat_id=chat_id, message_id=message[0])
+            return 1
+        except TelegramError as exc:
+            return self._handle_failure(chat_id, [message], exc)
+
+    def _handle_failure(self, chat_id: str, messages: List[Tuple[int, float]], exc: TelegramError) -> int:
+        if is_transient_error(exc):
+            retry_at = time.time() + RETRY_DELAY_SECONDS
+            for message_id, posted_at in messages:
+                heapq.heappush(self._heap, (retry_at, chat_id, message_id, posted_at))
+            logger.warning("Auto-delete in %s deferred: %s", chat_id, exc)
+        elif isinstance(exc, (BadRequest, Forbidden)):
+            # Already deleted by an admin, or the bot lost its delete permission.
+            self.failed += len(messages)
+            logger.debug("Could not delete %d message(s) in %s: %s", len(messages), chat_id, exc)
+        else:
+            self.failed += len(messages)
+            logger.warning("Could not delete %d message(s) in %s: %s", len(messages), chat_id, exc)
+        return 0
+
+    def metrics(self) -> Dict[str, int]:
+        return {"pending": len(self._heap), "deleted": self.deleted, "expired": self.expired, "failed": self.failed}
+
+    def _load_state(self) -> None:
+        section = self._state.get(STATE_SECTION)
+        for entry in section.get("pending") or []:
+            try:
+                delete_at, chat_id, message_id, posted_at = entry
+                self._heap.append((float(delete_at), str(chat_id), int(message_id), float(posted_at)))
+            except (TypeError, ValueError):
+                continue
+        heapq.heapify(self._heap)
+        if self._heap:
+            logger.info("Recovered %d pending auto-delete(s).", len(self._heap))
+
+    def _save_state(self) -> None:
+        self._state.update(STATE_SECTION, {"pending": [list(entry) for entry in sorted(self._heap)]})
@@ -1,16 +1,20 @@
 import asyncio
-import json
+import functools
 import logging
 from dataclasses import dataclass
 from decimal import Decimal, InvalidOperation
-from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Set
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 from telegram import Bot
+from telegram.error import ChatMigrated
 
 from app.clients.wchain import WChainClient
 from app.config import Settings
+from app.services.delivery_journal import DeliveryJournal
+from app.services.event_store import EventStore, StoredEvent, parse_timestamp, wco_to_wei
+from app.services.outbound import OutboundMessageQueue, Priority, is_permanent_error
 from app.utils import format_token_amount
+from app.utils.state_store import get_state_store
 
 logger = logging.getLogger(__name__)
 
@@ -29,12 +33,23 @@ class BuybackAlertService:
     an alert message to subscribed Telegram chats.
     """
 
-    def __init__(self, settings: Settings, wchain: WChainClient):
+    def __init__(
+        self,
+        settings: Settings,
+        wchain: WChainClient,
+        outbound: Optional[OutboundMessageQueue] = None,
+        events: Optional[EventStore] = None,
+        journal: Optional[DeliveryJournal] = None,
+    ):
         self.settings = settings
         self.wchain = wchain
+        self.outbound = outbound or OutboundMessageQueue(settings)
+        self.events = events or EventStore(settings)
+        self.journal = journal or DeliveryJournal(settings)
         self._lock = asyncio.Lock()
+        self._pruning: Set["asyncio.Task[None]"] = set()
 
-        self._state_path = Path(self.settings.buyback_alert_state_path)
+        self._state = get_state_store(self.settings.buyback_alert_state_path, self.settings.state_flush_seconds)
         self._subscribers: Set[int] = set()
         self._last_seen_tx_hash: Optional[str] = None
 
@@ -81,6 +96,9 @@ class BuybackAlertService:
             logger.debug("Buyback alerts disabled, skipping poll.")
             return
 
+        # Alerts journaled but never sent (crash, failed send) go out before anything new.
+        await self._resend_unsent(bot)
+
         async with self._lock:
             subscribers = set(self._subscribers)
             last_seen = self._last_seen_tx_hash
@@ -100,23 +118,34 @@ class BuybackAlertService:
             return
         logger.info("Detected %d new buyback event(s) to process.", len(events))
 
-        # Send oldest -> newest, and only advance last_seen after send attempts.
+        # Journal every delivery and the new cursor, then send oldest -> newest once that is durable.
         newest_hash = events[-1].tx_hash
-        alerts_sent = 0
+        outgoing: List[Tuple[BuybackEvent, str]] = []
         for event in events:
             if event.amount_wco < Decimal(str(self.settings.buyback_min_amount_wco)):
                 logger.debug("Skipping buyback event %s: amount %.2f below minimum.", event.tx_hash, event.amount_wco)
                 continue
             text = self._render_message(event.amount_wco)
-            await self._broadcast(bot, subscribers, text)
-            alerts_sent += 1
-        if alerts_sent > 0:
-            logger.info("Sent %d buyback alert(s) to %d subscriber(s).", alerts_sent, len(subscribers))
+            for chat_id in subscribers:
+                self.journal.detect(
+                    "buyback",
+                    self._delivery_id(event.tx_hash, chat_id),
+                    {"chat": chat_id, "text": text, "tx_hash": event.tx_hash},
+                )
+            self.events.record([self._stored_event(event)])
+            outgoing.append((event, text))
 
         async with self._lock:
             self._last_seen_tx_hash = newest_hash
+            self.journal.commit_cursor("buyback", newest_hash)
             self._save_state()
 
+        await self.journal.sync()
+        for event, text in outgoing:
+            await self._broadcast(bot, subscribers, text, event.tx_hash)
+        if outgoing:
+            logger.info("Sent %d buyback alert(s) to %d subscriber(s).", len(outgoing), len(subscribers))
+
     async def job_callback(self, context) -> None:
         await self.poll_and_broadcast(context.bot)
 
@@ -127,6 +156,21 @@ class BuybackAlertService:
         """
         return "🧪 *TEST ALERT* (no on-chain transfer)\n\n" + self._render_message(amount_wco)
 
+    @staticmethod
+    def _delivery_id(tx_hash: str, chat_id: int) -> str:
+        return f"buyback:{tx_hash}:{chat_id}"
+
+    def _stored_event(self, event: BuybackEvent) -> StoredEvent:
+        return StoredEvent(
+            kind="buyback",
+            source="buyback",
+            tx_hash=event.tx_hash,
+            from_address=event.from_address,
+            to_address=self.settings.buyback_wallet_address,
+            amount_wei=wco_to_wei(event.amount_wco),
+            occurred_at=parse_timestamp(event.timestamp),
+        )
+
     def _render_message(self, amount_wco: Decimal) -> str:
         # Reuse existing formatter for consistent thousands separators.
         amount_display = format_token_amount(float(amount_wco))
@@ -138,24 +182,84 @@ class BuybackAlertService:
             "📈 Pressure ↑"
         )
 
-    async def _broadcast(self, bot: Bot, chat_ids: Iterable[int], text: str) -> None:
-        failures: List[int] = []
-        for chat_id in chat_ids:
-            try:
-                await bot.send_message(chat_id=chat_id, text=text, parse_mode="Markdown")
-            except Exception:
-                logger.exception("Failed to send buyback alert to chat_id=%s", chat_id)
-                failures.append(chat_id)
-
-        if failures:
-            async with self._lock:
-                changed = False
-                for chat_id in failures:
-                    if chat_id in self._subscribers:
-                        self._subscribers.remove(chat_id)
-                        changed = True
-                if changed:
-                    self._save_state()
+    async def _resend_unsent(self, bot: Bot) -> None:
+        pending = self.journal.take_pending("buyback")
+        resent = 0
+        for delivery in pending:
+            chat_id = delivery.payload.get("chat")
+            tx_hash = delivery.payload.get("tx_hash")
+            if chat_id not in self._subscribers or not tx_hash:
+                # Unsubscribed since the alert was detected.
+                self.journal.drop(delivery.id)
+                continue
+            await self._broadcast(bot, [chat_id], str(delivery.payload.get("text")), str(tx_hash))
+            resent += 1
+        if resent:
+            logger.info("Resending %d unsent buyback alert(s) from the journal.", resent)
+
+    async def _broadcast(self, bot: Bot, chat_ids: Iterable[int], text: str, tx_hash: Optional[str] = None) -> None:
+        """Send ``text`` to each chat; with ``tx_hash``, each send settles its journaled delivery."""
+        deliveries = {
+            chat_id: self.outbound.submit(
+                chat_id,
+                functools.partial(bot.send_message, chat_id=chat_id, text=text, parse_mode="Markdown"),
+                Priority.ALERT,
+                label="buyback alert",
+            )
+            for chat_id in chat_ids
+        }
+        if tx_hash:
+            for chat_id, delivery in deliveries.items():
+                self.journal.track(delivery, [self._delivery_id(tx_hash, chat_id)])
+        # Don't hold up the poll; failed subscribers are pruned once every send has settled.
+        task = asyncio.create_task(self._prune_failed(deliveries))
+        self._pruning.add(task)
+        task.add_done_callback(self._pruning.discard)
+
+    async def _prune_failed(self, deliveries: Dict[int, "asyncio.Future[Any]"]) -> None:
+        """
+        Drop subscribers whose chat is gone (bot blocked or kicked, chat deleted)
+        and follow group -> supergroup migrations. Chats that only hit transient
+        errors stay subscribed; the queue already retried them.
+        """
+        if not deliveries:
+            return
+        await asyncio.wait(deliveries.values())
+
+        removed: List[int] = []
+        migrated: Dict[int, int] = {}
+        transient = 0
+        for chat_id, delivery in deliveries.items():
+            if delivery.cancelled() or delivery.exception() is None:
+                continue
+            exc = delivery.exception()
+            if isinstance(exc, ChatMigrated):
+                migrated[chat_id] = exc.new_chat_id
+            elif is_permanent_error(exc):
+                removed.append(chat_id)
+            else:
+                transient += 1
+        if transient:
+            logger.warning("Buyback alert not delivered to %d subscriber(s); keeping them subscribed.", transient)
+        if not removed and not migrated:
+            return
+
+        async with self._lock:
+            changed = False
+            for chat_id in removed:
+                if chat_id in self._subscribers:
+                    self._subscribers.remove(chat_id)
+                    changed = True
+            for old_id, new_id in migrated.items():
+                if old_id in self._subscribers:
+                    self._subscribers.remove(old_id)
+                    self._subscribers.add(new_id)
+                    changed = True
+            if changed:
+                logger.info(
+                    "Buyback subscribers updated: %d removed, %d migrated.", len(removed), len(migrated)
+                )
+                self._save_state()
 
     def _extract_new_events(self, payload: Optional[Dict[str, Any]], *, last_seen: Optional[str]) -> List[BuybackEvent]:
         items = (payload or {}).get("items") or []
@@ -215,21 +319,7 @@ class BuybackAlertService:
         return wei / Decimal("1000000000000000000")
 
     def _load_state(self) -> None:
-        try:
-            raw = self._state_path.read_text(encoding="utf-8")
-        except FileNotFoundError:
-            return
-        except OSError:
-            logger.exception("Failed to read buyback alert state from %s", self._state_path)
-            return
-
-        try:
-            data = json.loads(raw)
-        except json.JSONDecodeError:
-            logger.warning("Buyback alert state file is invalid JSON: %s", self._state_path)
-            return
-
-        buyback = (data or {}).get("buyback") or {}
+        buyback = self._state.get("buyback")
         subs = buyback.get("subscribers") or []
         if isinstance(subs, list):
             for chat_id in subs:
@@ -238,26 +328,20 @@ class BuybackAlertService:
                 except (TypeError, ValueError):
                     continue
 
-        last_seen = buyback.get("last_seen_tx_hash")
+        # The cursor moved to the event store; the state file value is only read once, to migrate it.
+        last_seen = (
+            self.journal.cursor("buyback") or self.events.cursor("buyback") or buyback.get("last_seen_tx_hash")
+        )
         if isinstance(last_seen, str) and last_seen:
             self._last_seen_tx_hash = last_seen
 
     def _save_state(self) -> None:
-        data: Dict[str, Any] = {}
-        # Preserve other watcher sections (e.g., whale, exchange flow) if sharing a state file.
-        if self._state_path.exists():
-            try:
-                data = json.loads(self._state_path.read_text(encoding="utf-8"))
-            except Exception:
-                data = {}
-
-        data["buyback"] = {
-            "subscribers": sorted(self._subscribers),
-            "last_seen_tx_hash": self._last_seen_tx_hash,
-            "wallet": self.settings.buyback_wallet_address,
-        }
-        try:
-            self._state_path.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
-        except OSError:
-            logger.exception("Failed to write buyback alert state to %s", self._state_path)
+        self.events.set_cursor("buyback", self._last_seen_tx_hash)
+        self._state.update(
+            "buyback",
+            {
+                "subscribers": sorted(self._subscribers),
+                "wallet": self.settings.buyback_wallet_address,
+            },
+        )
 
@@ -0,0 +1,109 @@
+"""Price chart rendering backed by the metrics history store."""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from app.config import Settings
+from app.services.metrics_history import WAVE_PRICE, WCO_PRICE, MetricsHistoryService
+from app.utils.charts import render_price_chart
+
+logger = logging.getLogger(__name__)
+
+CHART_SERIES: Dict[str, str] = {
+    "WCO": WCO_PRICE,
+    "WAVE": WAVE_PRICE,
+}
+CHART_WINDOWS: Dict[str, int] = {
+    "24h": 24 * 3600,
+    "7d": 7 * 24 * 3600,
+    "30d": 30 * 24 * 3600,
+}
+DEFAULT_CHART_SYMBOL = "WCO"
+DEFAULT_CHART_WINDOW = "24h"
+
+
+@dataclass(frozen=True)
+class ChartImage:
+    """Rendered chart PNG and the sample bucket it was drawn from."""
+
+    symbol: str
+    window: str
+    bucket: float
+    png: bytes
+
+
+class ChartService:
+    """
+    Renders price charts in a worker thread and caches them per
+    (symbol, window, bucket), where the bucket is the timestamp of the latest
+    stored sample. A new sample therefore invalidates every cached chart for
+    that symbol, while repeated requests in between cost a dict lookup.
+    """
+
+    def __init__(self, settings: Settings, history: MetricsHistoryService):
+        self.settings = settings
+        self.history = history
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, settings.chart_render_workers), thread_name_prefix="chart-render"
+        )
+        self._cache: Dict[Tuple[str, str], ChartImage] = {}
+        self._inflight: Dict[Tuple[str, str, float], "asyncio.Future[Optional[ChartImage]]"] = {}
+
+    async def get_chart(self, symbol: str, window: str) -> Optional[ChartImage]:
+        """Return a chart for ``symbol`` over ``window``, or None if there is not enough history."""
+        series = CHART_SERIES.get(symbol)
+        seconds = CHART_WINDOWS.get(window)
+        if series is None or seconds is None:
+            raise ValueError(f"Unsupported chart request: {symbol} {window}")
+
+        latest = self.history.store.series(series).latest()
+        if latest is None:
+            return None
+        bucket = latest[0]
+
+        cached = self._cache.get((symbol, window))
+        if cached and cached.bucket == bucket:
+            return cached
+
+        # Coalesce concurrent requests for the same chart into one render.
+        key = (symbol, window, bucket)
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future: "asyncio.Future[Optional[ChartImage]]" = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            chart = await self._render(symbol, window, series, seconds, bucket)
+            future.set_result(chart)
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark retrieved so a failure with no concurrent waiters is not reported as unhandled.
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        if chart is not None:
+            self._cache[(symbol, window)] = chart
+        return chart
+
+    async def _render(
+        self, symbol: str, window: str, series: str, seconds: int, bucket: float
+    ) -> Optional[ChartImage]:
+        timestamps, values = self.history.samples(series, seconds)
+        if len(values) < 2:
+            return None
+        title = f"{symbol} · {window}"
+        loop = asyncio.get_running_loop()
+        png = await loop.run_in_executor(
+            self._executor,
+            lambda: render_price_chart(timestamps, values, title=title),
+        )
+        logger.debug("Rendered %s chart from %d sample(s).", title, len(values))
+        return ChartImage(symbol=symbol, window=window, bucket=bucket, png=png)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,101 @@
+"""Shared, TTL-cached view of chat administrators."""
+
+import asyncio
+import logging
+import time
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from telegram import Bot, ChatMember, Update
+from telegram.error import TelegramError
+from telegram.ext import ContextTypes
+
+from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+ADMIN_STATUSES = (ChatMember.ADMINISTRATOR, ChatMember.OWNER)
+
+
+class ChatAdminDirectory:
+    """
+    Caches ``get_chat_administrators`` per chat for ``chat_admin_cache_ttl`` seconds.
+
+    One lookup answers every admin check in that chat until it expires, and
+    concurrent checks for an uncached chat share the same request. Cached
+    entries are dropped as soon as a ``ChatMemberUpdated`` update arrives for
+    the chat, so promotions and demotions take effect right away.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        # chat key -> (expires_at, admin user ids)
+        self._admins: Dict[str, Tuple[float, FrozenSet[int]]] = {}
+        self._inflight: Dict[str, "asyncio.Future[Optional[FrozenSet[int]]]"] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def is_admin(self, bot: Bot, chat_id: str | int, user_id: int) -> bool:
+        """Check if a user is an admin in the specified chat/channel."""
+        admins = await self.get_admins(bot, chat_id)
+        return admins is not None and user_id in admins
+
+    async def get_admins(self, bot: Bot, chat_id: str | int) -> Optional[FrozenSet[int]]:
+        key = _chat_key(chat_id)
+        cached = self._admins.get(key)
+        if cached and cached[0] > time.monotonic():
+            self.hits += 1
+            return cached[1]
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        future: "asyncio.Future[Optional[FrozenSet[int]]]" = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            admins = await self._fetch(bot, chat_id)
+            future.set_result(admins)
+        finally:
+            self._inflight.pop(key, None)
+            if not future.done():
+                # The lookup raised or was cancelled: waiters get "unknown" like a failed lookup, not a hang.
+                future.set_result(None)
+        if admins is not None:
+            self._admins[key] = (time.monotonic() + self.settings.chat_admin_cache_ttl, admins)
+        return admins
+
+    async def _fetch(self, bot: Bot, chat_id: str | int) -> Optional[FrozenSet[int]]:
+        try:
+            members = await bot.get_chat_administrators(chat_id=chat_id)
+        except TelegramError as exc:
+            # Not cached: the next check retries instead of denying for a whole TTL.
+            logger.warning("Failed to fetch administrators for %s: %s", chat_id, exc)
+            return None
+        return frozenset(member.user.id for member in members if member.status in ADMIN_STATUSES)
+
+    def invalidate(self, chat_id: str | int, username: Optional[str] = None) -> None:
+        self._admins.pop(_chat_key(chat_id), None)
+        if username:
+            # Alert channels are often configured as "@name" rather than by numeric id.
+            self._admins.pop(_chat_key(f"@{username}"), None)
+
+    async def on_chat_member_updated(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        changed = update.chat_member or update.my_chat_member
+        if not changed:
+            return
+        chat = changed.chat
+        self.invalidate(chat.id, chat.username)
+        logger.debug(
+            "Admin cache invalidated for chat %s (%s -> %s).",
+            chat.id,
+            changed.old_chat_member.status,
+            changed.new_chat_member.status,
+        )
+
+    def metrics(self) -> Dict[str, int]:
+        return {"chats": len(self._admins), "hits": self.hits, "misses": self.misses}
+
+
+def _chat_key(chat_id: str | int) -> str:
+    return str(chat_id).strip().lower()
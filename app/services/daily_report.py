@@ -1,11 +1,9 @@
 """Daily crypto metrics report service."""
 
 import asyncio
-import json
 import logging
 from dataclasses import dataclass, asdict
 from datetime import datetime
-from pathlib import Path
 from typing import Any, Dict, Optional
 
 from telegram import Bot
@@ -13,13 +11,18 @@ from telegram.ext import ContextTypes
 
 from app.clients.wchain import WChainClient
 from app.config import Settings
-from app.utils import get_resized_brand_image
+from app.services.outbound import OutboundMessageQueue, Priority
+from app.utils import (
+    BRAND_IMAGE_PATH,
+    BRAND_IMAGE_SCALE,
+    PhotoUploadRegistry,
+    get_brand_image_async,
+    get_resized_brand_image,
+)
+from app.utils.state_store import get_state_store
 
 logger = logging.getLogger(__name__)
 
-BRAND_IMAGE_PATH = Path(__file__).resolve().parents[2] / "wocean.png"
-# Scale factor for brand image (0.5 = half size)
-BRAND_IMAGE_SCALE = 0.5
 
 
 @dataclass
@@ -55,11 +58,19 @@ class DailyReportService:
     to the previous day's values.
     """
 
-    def __init__(self, settings: Settings, wchain: WChainClient):
+    def __init__(
+        self,
+        settings: Settings,
+        wchain: WChainClient,
+        uploads: Optional[PhotoUploadRegistry] = None,
+        outbound: Optional[OutboundMessageQueue] = None,
+    ):
         self.settings = settings
         self.wchain = wchain
+        self.uploads = uploads
+        self.outbound = outbound or OutboundMessageQueue(settings)
         self._lock = asyncio.Lock()
-        self._state_path = Path(self.settings.daily_report_state_path)
+        self._state = get_state_store(self.settings.daily_report_state_path, self.settings.state_flush_seconds)
         self._previous_metrics: Optional[DailyMetrics] = None
         self._fallback_chat_id: Optional[str] = None
         self._load_state()
@@ -144,24 +155,21 @@ class DailyReportService:
         # Generate and send the report
         message = self._render_report(current, previous)
 
-        try:
+        async def deliver() -> None:
             if BRAND_IMAGE_PATH.exists():
-                photo_buffer = get_resized_brand_image(BRAND_IMAGE_PATH, scale=BRAND_IMAGE_SCALE)
-                await bot.send_photo(
-                    chat_id=channel_id,
-                    photo=photo_buffer,
-                    caption=message,
-                    parse_mode="Markdown",
-                )
+                await self._send_brand_photo(bot, channel_id, message)
             else:
                 await bot.send_message(
                     chat_id=channel_id,
                     text=message,
                     parse_mode="Markdown",
                 )
+
+        try:
+            # Queued behind alerts but ahead of command follow-ups; the queue logs the failure.
+            await self.outbound.submit(channel_id, deliver, Priority.REPORT, label="daily report")
             logger.info("Daily report sent to channel %s", channel_id)
         except Exception:
-            logger.exception("Failed to send daily report to channel %s", channel_id)
             return False, f"Failed to send message to channel {channel_id}."
 
         # Update previous metrics for tomorrow's comparison
@@ -174,6 +182,21 @@ class DailyReportService:
             self._save_state()
         return True, "Daily report sent."
 
+    async def _send_brand_photo(self, bot: Bot, chat_id: str | int, caption: str) -> None:
+        """Send the report as a brand photo caption, reusing the uploaded file_id when known."""
+        if self.uploads is None:
+            photo_buffer = await asyncio.to_thread(
+                get_resized_brand_image, BRAND_IMAGE_PATH, BRAND_IMAGE_SCALE, self.settings.brand_image_policy
+            )
+            await bot.send_photo(chat_id=chat_id, photo=photo_buffer, caption=caption, parse_mode="Markdown")
+            return
+        brand_image = await get_brand_image_async(self.settings.brand_image_policy)
+        await self.uploads.send(
+            brand_image.data,
+            lambda photo: bot.send_photo(chat_id=chat_id, photo=photo, caption=caption, parse_mode="Markdown"),
+            filename=brand_image.filename,
+        )
+
     async def _fetch_current_metrics(self) -> Optional[DailyMetrics]:
         """Fetch all metrics needed for the daily report."""
         try:
@@ -337,25 +360,7 @@ class DailyReportService:
 
     def _load_state(self) -> None:
         """Load previous metrics from state file."""
-        try:
-            raw = self._state_path.read_text(encoding="utf-8")
-        except FileNotFoundError:
-            return
-        except OSError:
-            logger.exception(
-                "Failed to read daily report state from %s", self._state_path
-            )
-            return
-
-        try:
-            data = json.loads(raw)
-        except json.JSONDecodeError:
-            logger.warning(
-                "Daily report state file is invalid JSON: %s", self._state_path
-            )
-            return
-
-        daily_report = (data or {}).get("daily_report") or {}
+        daily_report = self._state.get("daily_report")
         previous = daily_report.get("previous_metrics")
         if previous:
             self._previous_metrics = DailyMetrics.from_dict(previous)
@@ -365,29 +370,15 @@ class DailyReportService:
 
     def _save_state(self) -> None:
         """Save current metrics to state file for next day comparison."""
-        data: Dict[str, Any] = {}
-        # Preserve other watcher sections if sharing a state file
-        if self._state_path.exists():
-            try:
-                data = json.loads(self._state_path.read_text(encoding="utf-8"))
-            except Exception:
-                data = {}
-
-        data["daily_report"] = {
-            "previous_metrics": (
-                self._previous_metrics.to_dict() if self._previous_metrics else None
-            ),
-            "fallback_chat_id": self._fallback_chat_id,
-        }
-
-        try:
-            self._state_path.write_text(
-                json.dumps(data, indent=2, sort_keys=True), encoding="utf-8"
-            )
-        except OSError:
-            logger.exception(
-                "Failed to write daily report state to %s", self._state_path
-            )
+        self._state.update(
+            "daily_report",
+            {
+                "previous_metrics": (
+                    self._previous_metrics.to_dict() if self._previous_metrics else None
+                ),
+                "fallback_chat_id": self._fallback_chat_id,
+            },
+        )
 
     @staticmethod
     def _safe_float(payload: Optional[Dict], key: str) -> Optional[float]:
@@ -0,0 +1,324 @@
+"""Append-only journal of alert deliveries, so a restart resends exactly the alerts that never went out."""
+
+import asyncio
+import functools
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from telegram.error import BadRequest
+
+from app.config import Settings
+from app.services.outbound import is_permanent_error
+from app.utils.metrics import LatencyStats
+from app.utils.state_store import _fsync_directory
+
+logger = logging.getLogger(__name__)
+
+# Rewrite the file down to its live entries once this many lines have been appended since the last rewrite.
+COMPACT_AFTER_LINES = 5000
+# Backoff between attempts to write a batch that failed: 1s, 2s, 4s, ... up to 30s.
+_RETRY_BASE_DELAY = 1.0
+_RETRY_MAX_DELAY = 30.0
+
+
+@dataclass
+class PendingDelivery:
+    """A detected alert that has not been confirmed sent."""
+
+    id: str
+    stream: str
+    payload: Dict[str, Any]
+    detected_at: float
+
+
+class DeliveryJournal:
+    """
+    Write-ahead log for alert sends, one JSON object per line:
+
+    - ``detected``: an alert was found; carries what is needed to send it.
+    - ``sent``: Telegram accepted it (with the ``message_id``).
+    - ``dropped``: it can never be delivered (chat gone, message rejected).
+    - ``cursor``: a watcher's cursor moved past everything detected so far.
+
+    A watcher journals its detections and the new cursor, awaits ``sync``,
+    and only then sends. A crash at any point leaves the unsent alerts as
+    ``detected`` without ``sent``. Watchers pick those up with
+    ``take_pending`` and resend them, and restore their cursor from the
+    journal. Only a chat that is gone or a message Telegram rejects is
+    journaled as ``dropped``. Sends that fail any other way (network errors,
+    flood waits, a send cut short by shutdown) are released and retried the
+    same way on the next poll or after a restart. The window for a duplicate is only between
+    Telegram accepting a message and its ``sent`` line reaching disk.
+
+    Appends only buffer a line. One flusher task writes everything buffered
+    with a single ``fsync`` and wakes every ``sync`` caller it covers, so
+    concurrent watchers share fsyncs (group commit). A batch that fails to
+    write stays first in line and is retried with backoff; ``sync`` callers
+    keep waiting until it is on disk, so nothing is sent ahead of its
+    journal entry. The file is rewritten down to the live entries at startup
+    and whenever it grows past ``COMPACT_AFTER_LINES``. Pending alerts older
+    than ``delivery_journal_max_age_seconds`` are dropped at startup as stale.
+    """
+
+    def __init__(self, settings: Settings):
+        self.path = Path(settings.delivery_journal_path)
+        self.max_age_seconds = settings.delivery_journal_max_age_seconds
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="delivery-journal")
+        self._fd: Optional[int] = None
+        self._pending: Dict[str, PendingDelivery] = {}
+        self._in_flight: Set[str] = set()
+        self._cursors: Dict[str, str] = {}
+        self._buffer: List[str] = []
+        self._appended = 0
+        self._synced = 0
+        self._waiters: List[Tuple[int, "asyncio.Future[None]"]] = []
+        self._flusher: Optional["asyncio.Task[None]"] = None
+        self._lines_since_compact = 0
+        self.fsyncs = 0
+        self.lines_written = 0
+        self.replayed = 0
+        self.dropped = 0
+        self.fsync_latency = LatencyStats()
+        self._executor.submit(self._open).result()
+
+    def cursor(self, stream: str) -> Optional[str]:
+        """The last cursor committed for ``stream``."""
+        return self._cursors.get(stream)
+
+    def cursors(self, prefix: str) -> Dict[str, str]:
+        """Cursors for streams named ``prefix<suffix>``, keyed by suffix."""
+        return {stream[len(prefix) :]: value for stream, value in self._cursors.items() if stream.startswith(prefix)}
+
+    def detect(self, stream: str, delivery_id: str, payload: Dict[str, Any]) -> None:
+        """Journal a new alert. It counts as in flight until ``sent``, ``drop`` or ``release``."""
+        pending = PendingDelivery(delivery_id, stream, payload, time.time())
+        self._pending[delivery_id] = pending
+        self._in_flight.add(delivery_id)
+        self._append(
+            {"op": "detected", "id": delivery_id, "stream": stream, "payload": payload, "at": pending.detected_at}
+        )
+
+    def commit_cursor(self, stream: str, value: Optional[str]) -> None:
+        if not value or self._cursors.get(stream) == value:
+            return
+        self._cursors[stream] = value
+        self._append({"op": "cursor", "stream": stream, "value": value})
+
+    def sent(self, delivery_id: str, message_id: Optional[int]) -> None:
+        self._in_flight.discard(delivery_id)
+        if self._pending.pop(delivery_id, None) is not None:
+            self._append({"op": "sent", "id": delivery_id, "message_id": message_id})
+
+    def drop(self, delivery_id: str) -> None:
+        self._in_flight.discard(delivery_id)
+        if self._pending.pop(delivery_id, None) is not None:
+            self.dropped += 1
+            self._append({"op": "dropped", "id": delivery_id})
+
+    def release(self, delivery_id: str) -> None:
+        """Hand an unsent alert back, to be retried by the next ``take_pending``."""
+        self._in_flight.discard(delivery_id)
+
+    def take_pending(self, stream_prefix: str) -> List[PendingDelivery]:
+        """Unsent alerts for streams starting with ``stream_prefix``, oldest first, now marked in flight."""
+        taken = [
+            pending
+            for delivery_id, pending in self._pending.items()
+            if delivery_id not in self._in_flight and pending.stream.startswith(stream_prefix)
+        ]
+        taken.sort(key=lambda pending: pending.detected_at)
+        self._in_flight.update(pending.id for pending in taken)
+        self.replayed += len(taken)
+        return taken
+
+    def track(self, delivery: "asyncio.Future[Any]", delivery_ids: Sequence[str]) -> None:
+        """Journal the outcome of an outbound-queue send covering ``delivery_ids`` once it settles."""
+        delivery.add_done_callback(functools.partial(self._settle, tuple(delivery_ids)))
+
+    async def sync(self) -> None:
+        """Wait until everything appended so far is on disk."""
+        target = self._appended
+        if self._synced >= target:
+            return
+        waiter: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        self._waiters.append((target, waiter))
+        self._ensure_flusher()
+        await waiter
+
+    async def close(self, timeout: float = 10.0) -> None:
+        try:
+            await asyncio.wait_for(self.sync(), timeout)
+        except asyncio.TimeoutError:
+            logger.error("Delivery journal still has %d unwritten entr(ies) at shutdown.", len(self._buffer))
+        if self._flusher is not None:
+            self._flusher.cancel()
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._close)
+        self._executor.shutdown(wait=True)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "lines_written": self.lines_written,
+            "fsyncs": self.fsyncs,
+            "replayed": self.replayed,
+            "dropped": self.dropped,
+            "fsync": self.fsync_latency.snapshot(),
+        }
+
+    def _settle(self, delivery_ids: Tuple[str, ...], delivery: "asyncio.Future[Any]") -> None:
+        exc = None if delivery.cancelled() else delivery.exception()
+        for delivery_id in delivery_ids:
+            if delivery.cancelled() or (exc is not None and not _undeliverable(exc)):
+                # Cancelled, out of retries, or failed for a reason unrelated to the alert itself.
+                self.release(delivery_id)
+            elif exc is not None:
+                self.drop(delivery_id)
+            else:
+                self.sent(delivery_id, getattr(delivery.result(), "message_id", None))
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        self._buffer.append(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._appended += 1
+        self._ensure_flusher()
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.get_running_loop().create_task(self._flush())
+
+    async def _flush(self) -> None:
+        loop = asyncio.get_running_loop()
+        failures = 0
+        while self._buffer:
+            lines, self._buffer = self._buffer, []
+            target = self._appended
+            # After a failure part of the batch may be on disk; the newline ends any torn line.
+            data = ("\n" if failures else "") + "".join(lines)
+            try:
+                await loop.run_in_executor(self._executor, self._write, data.encode("utf-8"))
+            except OSError:
+                failures += 1
+                delay = min(_RETRY_MAX_DELAY, _RETRY_BASE_DELAY * 2 ** (failures - 1))
+                logger.exception(
+                    "Failed to write %d delivery journal entr(ies); retrying in %.0fs", len(lines), delay
+                )
+                # Nothing appended later may count as durable before these lines do.
+                self._buffer[:0] = lines
+                await asyncio.sleep(delay)
+                continue
+            failures = 0
+            self.lines_written += len(lines)
+            self._lines_since_compact += len(lines)
+            self._synced = target
+            self._wake_waiters()
+            if not self._buffer and self._lines_since_compact >= COMPACT_AFTER_LINES:
+                # Nothing is buffered, so the in-memory state is exactly what the file describes.
+                snapshot = self._snapshot()
+                try:
+                    await loop.run_in_executor(self._executor, self._rewrite, snapshot)
+                    self._lines_since_compact = len(snapshot)
+                except OSError:
+                    logger.exception("Failed to compact the delivery journal")
+
+    def _wake_waiters(self) -> None:
+        remaining: List[Tuple[int, "asyncio.Future[None]"]] = []
+        for target, waiter in self._waiters:
+            if target <= self._synced:
+                if not waiter.done():
+                    waiter.set_result(None)
+            else:
+                remaining.append((target, waiter))
+        self._waiters = remaining
+
+    def _snapshot(self) -> List[str]:
+        lines = [
+            json.dumps({"op": "cursor", "stream": stream, "value": value}, separators=(",", ":")) + "\n"
+            for stream, value in self._cursors.items()
+        ]
+        for pending in sorted(self._pending.values(), key=lambda pending: pending.detected_at):
+            entry = {
+                "op": "detected",
+                "id": pending.id,
+                "stream": pending.stream,
+                "payload": pending.payload,
+                "at": pending.detected_at,
+            }
+            lines.append(json.dumps(entry, separators=(",", ":")) + "\n")
+        return lines
+
+    # The methods below run on the journal's thread only.
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            self._replay()
+        self._rewrite(self._snapshot())
+        self._lines_since_compact = len(self._pending) + len(self._cursors)
+        if self._pending:
+            logger.info("Delivery journal has %d unsent alert(s) to resend.", len(self._pending))
+
+    def _replay(self) -> None:
+        with self.path.open("r", encoding="utf-8", errors="replace") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    op = entry["op"]
+                    if op == "detected":
+                        self._pending[entry["id"]] = PendingDelivery(
+                            str(entry["id"]), str(entry["stream"]), dict(entry["payload"]), float(entry["at"])
+                        )
+                    elif op in ("sent", "dropped"):
+                        self._pending.pop(entry["id"], None)
+                    elif op == "cursor":
+                        self._cursors[str(entry["stream"])] = str(entry["value"])
+                except (ValueError, KeyError, TypeError):
+                    # A torn last line from a crash mid-write; everything before it is intact.
+                    logger.warning("Skipping unreadable delivery journal line in %s.", self.path)
+        if self.max_age_seconds > 0:
+            cutoff = time.time() - self.max_age_seconds
+            stale = [delivery_id for delivery_id, pending in self._pending.items() if pending.detected_at < cutoff]
+            for delivery_id in stale:
+                del self._pending[delivery_id]
+            if stale:
+                logger.info("Dropped %d unsent alert(s) older than %ss.", len(stale), self.max_age_seconds)
+
+    def _rewrite(self, lines: List[str]) -> None:
+        tmp = self.path.with_name(f"{self.path.name}.tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, "".join(lines).encode("utf-8"))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp, self.path)
+        _fsync_directory(self.path.parent)
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+
+    def _write(self, data: bytes) -> None:
+        started = time.perf_counter()
+        view = memoryview(data)
+        while view:
+            written = os.write(self._fd, view)
+            view = view[written:]
+        os.fsync(self._fd)
+        self.fsyncs += 1
+        self.fsync_latency.record(time.perf_counter() - started)
+
+    def _close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def _undeliverable(exc: BaseException) -> bool:
+    """The chat is gone, or Telegram rejected the message itself; resending would fail the same way."""
+    return is_permanent_error(exc) or isinstance(exc, BadRequest)
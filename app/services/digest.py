@@ -0,0 +1,96 @@
+"""Coalesces bursts of alerts for a channel into a single digest message."""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Generic, List, Optional, TypeVar
+
+from telegram import Bot
+
+logger = logging.getLogger(__name__)
+
+E = TypeVar("E")
+
+DigestRenderer = Callable[[List[E]], str]
+# Called with the rendered text and the events that message covers.
+ChannelSender = Callable[[Bot, str, str, List[E]], Awaitable[None]]
+
+
+@dataclass
+class _PendingBatch(Generic[E]):
+    bot: Bot
+    opened_at: float = field(default_factory=time.monotonic)
+    events: List[E] = field(default_factory=list)
+    texts: List[str] = field(default_factory=list)
+    timer: Optional["asyncio.Task[None]"] = None
+
+
+class AlertCoalescer(Generic[E]):
+    """
+    Collects alerts per channel and releases them once ``window_seconds`` have
+    passed since the first one.
+
+    When a batch has fewer than ``min_events`` alerts, each is sent as rendered.
+    Otherwise one digest is sent, rendered by ``render_digest`` from the batch.
+    With a window of 0, only alerts found in the same poll are batched, so no
+    delay is added.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float,
+        min_events: int,
+        render_digest: DigestRenderer[E],
+        send: ChannelSender[E],
+    ):
+        self.window_seconds = max(0.0, window_seconds)
+        self.min_events = max(2, min_events)
+        self._render_digest = render_digest
+        self._send = send
+        self._pending: Dict[str, _PendingBatch[E]] = {}
+        self.digests_sent = 0
+        self.alerts_coalesced = 0
+
+    def add(self, bot: Bot, channel: str, event: E, text: str) -> None:
+        batch = self._pending.get(channel)
+        if batch is None:
+            batch = self._pending[channel] = _PendingBatch(bot)
+        batch.bot = bot
+        batch.events.append(event)
+        batch.texts.append(text)
+
+    async def release(self, channel: str) -> None:
+        """Flush ``channel`` if its window has elapsed; otherwise make sure a timer will."""
+        batch = self._pending.get(channel)
+        if batch is None:
+            return
+        remaining = batch.opened_at + self.window_seconds - time.monotonic()
+        if remaining <= 0:
+            await self.flush(channel)
+        elif batch.timer is None:
+            batch.timer = asyncio.create_task(self._flush_later(channel, remaining))
+
+    async def flush(self, channel: str) -> None:
+        batch = self._pending.pop(channel, None)
+        if batch is None:
+            return
+        if batch.timer is not None and batch.timer is not asyncio.current_task():
+            batch.timer.cancel()
+
+        if len(batch.events) < self.min_events:
+            for event, text in zip(batch.events, batch.texts):
+                await self._send(batch.bot, channel, text, [event])
+            return
+
+        self.digests_sent += 1
+        self.alerts_coalesced += len(batch.events)
+        logger.info("Coalescing %d alert(s) for channel %s into one digest.", len(batch.events), channel)
+        await self._send(batch.bot, channel, self._render_digest(batch.events), batch.events)
+
+    async def _flush_later(self, channel: str, delay: float) -> None:
+        await asyncio.sleep(delay)
+        try:
+            await self.flush(channel)
+        except Exception:
+            logger.exception("Failed to flush alert digest for channel=%s", channel)
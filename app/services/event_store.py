@@ -0,0 +1,336 @@
+"""SQLite store for watcher cursors, processed keys and the history of detected events."""
+
+import asyncio
+import logging
+import sqlite3
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, TypeVar
+
+from telegram.ext import ContextTypes
+
+from app.config import Settings
+from app.utils.metrics import LatencyStats
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+WEI_PER_WCO = Decimal("1000000000000000000")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cursors (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS processed (
+    scope TEXT NOT NULL,
+    key TEXT NOT NULL,
+    seen_at REAL NOT NULL,
+    PRIMARY KEY (scope, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS processed_seen_at ON processed (seen_at);
+
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    source TEXT NOT NULL,
+    tx_hash TEXT NOT NULL,
+    block INTEGER,
+    from_address TEXT,
+    to_address TEXT,
+    amount_wei TEXT,
+    usd REAL,
+    occurred_at REAL NOT NULL,
+    recorded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_tx_hash ON events (tx_hash);
+CREATE INDEX IF NOT EXISTS events_from_address ON events (from_address, occurred_at);
+CREATE INDEX IF NOT EXISTS events_to_address ON events (to_address, occurred_at);
+CREATE INDEX IF NOT EXISTS events_occurred_at ON events (occurred_at);
+CREATE INDEX IF NOT EXISTS events_source ON events (source, occurred_at);
+"""
+
+
+@dataclass(frozen=True)
+class StoredEvent:
+    """One detected on-chain event, normalized across watchers."""
+
+    kind: str
+    source: str
+    tx_hash: str
+    from_address: Optional[str] = None
+    to_address: Optional[str] = None
+    amount_wei: Optional[int] = None
+    usd: Optional[float] = None
+    block: Optional[int] = None
+    occurred_at: Optional[float] = None
+
+
+class EventStore:
+    """
+    Durable watcher state in one SQLite database (WAL mode).
+
+    - ``cursors``: the newest item each watcher has handled, by name.
+    - ``processed``: dedupe keys per scope, so "seen before?" is a primary-key
+      lookup that also covers keys older than a watcher's in-memory cache.
+    - ``events``: every detected event, indexed by tx hash, address and time.
+
+    All queries run on one dedicated thread, which owns the connection, so the
+    event loop never blocks on disk and writes are applied in submission
+    order. Writes (``record``, ``mark_processed``, ``set_cursor``) return
+    without waiting. A periodic ``compact`` drops events and processed keys
+    past their retention and returns the space to the file.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.path = Path(settings.event_store_path)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="event-store")
+        self._conn: Optional[sqlite3.Connection] = None
+        self.events_recorded = 0
+        self.lookups = 0
+        self.lookup_hits = 0
+        self.rows_compacted = 0
+        self.query_latency = LatencyStats()
+        self.write_latency = LatencyStats()
+        # Cursors are read synchronously once, while services load their state.
+        self._cursors: Dict[str, str] = self._executor.submit(self._open).result()
+
+    def cursor(self, name: str) -> Optional[str]:
+        return self._cursors.get(name)
+
+    def cursors(self, prefix: str) -> Dict[str, str]:
+        """Cursors named ``prefix<suffix>``, keyed by suffix."""
+        return {name[len(prefix) :]: value for name, value in self._cursors.items() if name.startswith(prefix)}
+
+    def set_cursor(self, name: str, value: Optional[str]) -> None:
+        if not value or self._cursors.get(name) == value:
+            return
+        self._cursors[name] = value
+        self._write(self._upsert_cursor, name, value)
+
+    def record(self, events: Iterable[StoredEvent]) -> None:
+        rows = [_event_row(event) for event in events]
+        if rows:
+            self._write(self._insert_events, rows)
+
+    def mark_processed(self, scope: str, keys: Iterable[str]) -> None:
+        rows = [(scope, key, time.time()) for key in keys if key]
+        if rows:
+            self._write(self._insert_processed, rows)
+
+    async def is_processed(self, scope: str, key: str) -> bool:
+        found = await self._query(self._select_processed, scope, key)
+        self.lookups += 1
+        if found:
+            self.lookup_hits += 1
+        return found
+
+    async def processed_keys(self, scope: str) -> List[str]:
+        """Every dedupe key kept for ``scope``."""
+        return await self._query(self._select_processed_keys, scope)
+
+    async def recent_events(
+        self,
+        *,
+        address: Optional[str] = None,
+        tx_hash: Optional[str] = None,
+        kind: Optional[str] = None,
+        source: Optional[str] = None,
+        since: Optional[float] = None,
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        """Newest-first events matching every given filter."""
+        return await self._query(self._select_events, address, tx_hash, kind, source, since, limit)
+
+    async def job_callback(self, context: ContextTypes.DEFAULT_TYPE) -> None:
+        await self.compact()
+
+    async def compact(self) -> int:
+        """Apply the retention settings; returns the number of rows removed."""
+        removed = await self._query(self._compact)
+        self.rows_compacted += removed
+        if removed:
+            logger.info("Event store compaction removed %d row(s).", removed)
+        return removed
+
+    def close(self) -> None:
+        """Finish queued writes and close the database."""
+        self._executor.submit(self._close).result()
+        self._executor.shutdown(wait=True)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "events_recorded": self.events_recorded,
+            "lookups": self.lookups,
+            "lookup_hits": self.lookup_hits,
+            "rows_compacted": self.rows_compacted,
+            "query": self.query_latency.snapshot(),
+            "write": self.write_latency.snapshot(),
+        }
+
+    def _write(self, fn: Callable[..., Any], *args: Any) -> None:
+        future = self._executor.submit(self._timed, self.write_latency, fn, *args)
+        future.add_done_callback(_log_write_failure)
+
+    async def _query(self, fn: Callable[..., T], *args: Any) -> T:
+        future = self._executor.submit(self._timed, self.query_latency, fn, *args)
+        return await asyncio.wrap_future(future)
+
+    @staticmethod
+    def _timed(stats: LatencyStats, fn: Callable[..., T], *args: Any) -> T:
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            stats.record(time.perf_counter() - started)
+
+    # The methods below run on the store's thread only.
+
+    def _open(self) -> Dict[str, str]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        # auto_vacuum only takes effect on a new database; it lets compaction hand pages back.
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("PRAGMA journal_mode = WAL")
+        # With WAL, NORMAL loses at most the last commits on power failure, never integrity.
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.executescript(_SCHEMA)
+        self._conn = conn
+        return {row["name"]: row["value"] for row in conn.execute("SELECT name, value FROM cursors")}
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.execute("PRAGMA optimize")
+            self._conn.close()
+            self._conn = None
+
+    def _upsert_cursor(self, name: str, value: str) -> None:
+        with self._conn:
+            self._conn.execute(
+                "INSERT INTO cursors (name, value, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                (name, value, time.time()),
+            )
+
+    def _insert_events(self, rows: List[tuple]) -> None:
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO events (kind, source, tx_hash, block, from_address, to_address, amount_wei, usd, "
+                "occurred_at, recorded_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        self.events_recorded += len(rows)
+
+    def _insert_processed(self, rows: List[tuple]) -> None:
+        with self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO processed (scope, key, seen_at) VALUES (?, ?, ?)", rows)
+
+    def _select_processed(self, scope: str, key: str) -> bool:
+        row = self._conn.execute("SELECT 1 FROM processed WHERE scope = ? AND key = ?", (scope, key)).fetchone()
+        return row is not None
+
+    def _select_processed_keys(self, scope: str) -> List[str]:
+        return [row[0] for row in self._conn.execute("SELECT key FROM processed WHERE scope = ?", (scope,))]
+
+    def _select_events(
+        self,
+        address: Optional[str],
+        tx_hash: Optional[str],
+        kind: Optional[str],
+        source: Optional[str],
+        since: Optional[float],
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if address:
+            clauses.append("(from_address = ? OR to_address = ?)")
+            params += [address.lower(), address.lower()]
+        if tx_hash:
+            clauses.append("tx_hash = ?")
+            params.append(tx_hash.lower())
+        if kind:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if source:
+            clauses.append("source = ?")
+            params.append(source)
+        if since is not None:
+            clauses.append("occurred_at >= ?")
+            params.append(since)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(max(1, limit))
+        rows = self._conn.execute(f"SELECT * FROM events {where} ORDER BY occurred_at DESC LIMIT ?", params)
+        return [dict(row) for row in rows]
+
+    def _compact(self) -> int:
+        now = time.time()
+        removed = 0
+        with self._conn:
+            if self.settings.event_retention_days > 0:
+                cutoff = now - self.settings.event_retention_days * 86400
+                removed += self._conn.execute("DELETE FROM events WHERE occurred_at < ?", (cutoff,)).rowcount
+            if self.settings.processed_key_retention_days > 0:
+                cutoff = now - self.settings.processed_key_retention_days * 86400
+                removed += self._conn.execute("DELETE FROM processed WHERE seen_at < ?", (cutoff,)).rowcount
+        if removed:
+            self._conn.execute("PRAGMA incremental_vacuum")
+        # Refreshes planner statistics; without them the address OR-query may scan the table.
+        self._conn.execute("PRAGMA optimize")
+        self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return removed
+
+
+def wco_to_wei(amount: Optional[Decimal]) -> Optional[int]:
+    return int(amount * WEI_PER_WCO) if amount is not None else None
+
+
+def block_number(item: Dict[str, Any]) -> Optional[int]:
+    """Block number of a Blockscout item (``block_number``, or ``block`` on older instances)."""
+    value = item.get("block_number", item.get("block"))
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[float]:
+    """Epoch seconds from a Blockscout ISO-8601 timestamp, or None."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def _event_row(event: StoredEvent) -> tuple:
+    now = time.time()
+    return (
+        event.kind,
+        event.source,
+        event.tx_hash.lower(),
+        event.block,
+        event.from_address.lower() if event.from_address else None,
+        event.to_address.lower() if event.to_address else None,
+        # Wei amounts overflow SQLite's 64-bit integers, so they are stored as text.
+        str(event.amount_wei) if event.amount_wei is not None else None,
+        event.usd,
+        event.occurred_at if event.occurred_at is not None else now,
+        now,
+    )
+
+
+def _log_write_failure(future: "Future[Any]") -> None:
+    exc = future.exception()
+    if exc is not None:
+        logger.error("Event store write failed", exc_info=exc)
@@ -1,17 +1,18 @@
 import asyncio
-import json
 import logging
 from dataclasses import dataclass
 from decimal import Decimal, InvalidOperation
-from pathlib import Path
 from typing import Any, Dict, Optional
 
-from telegram import Bot, ChatMember
-from telegram.error import TelegramError
+from telegram import Bot
 
 from app.clients.wchain import WChainClient
 from app.config import Settings
+from app.services.chat_admins import ChatAdminDirectory
+from app.services.event_store import EventStore, StoredEvent, block_number, parse_timestamp, wco_to_wei
+from app.services.outbound import OutboundMessageQueue, Priority
 from app.utils import format_token_amount
+from app.utils.state_store import get_state_store
 
 logger = logging.getLogger(__name__)
 
@@ -34,13 +35,23 @@ class ExchangeFlowAlertService:
       - outflow (from exchange) >= threshold -> outflow alert
     """
 
-    def __init__(self, settings: Settings, wchain: WChainClient):
+    def __init__(
+        self,
+        settings: Settings,
+        wchain: WChainClient,
+        admins: Optional[ChatAdminDirectory] = None,
+        outbound: Optional[OutboundMessageQueue] = None,
+        events: Optional[EventStore] = None,
+    ):
         self.settings = settings
         self.wchain = wchain
+        self.admins = admins or ChatAdminDirectory(settings)
+        self.outbound = outbound or OutboundMessageQueue(settings)
+        self.events = events or EventStore(settings)
         self._lock = asyncio.Lock()
         self._alerts_enabled: bool = True
 
-        self._state_path = Path(self.settings.exchange_flow_alert_state_path)
+        self._state = get_state_store(self.settings.exchange_flow_alert_state_path, self.settings.state_flush_seconds)
         self._last_seen_by_exchange: Dict[str, str] = {}
         self._load_state()
 
@@ -146,15 +157,7 @@ class ExchangeFlowAlertService:
 
     async def is_admin(self, bot: Bot, chat_id: str | int, user_id: int) -> bool:
         """Check if a user is an admin in the specified chat/channel."""
-        try:
-            member = await bot.get_chat_member(chat_id=chat_id, user_id=user_id)
-            return member.status in (
-                ChatMember.ADMINISTRATOR,
-                ChatMember.OWNER,
-            )
-        except TelegramError as exc:
-            logger.warning("Failed to check admin status: %s", exc)
-            return False
+        return await self.admins.is_admin(bot, chat_id, user_id)
 
     async def toggle_alerts(
         self, bot: Bot, user_id: int, enable: Optional[bool] = None
@@ -241,6 +244,21 @@ class ExchangeFlowAlertService:
                 amount_display = format_token_amount(value)
                 template = ex.inflow_template if is_inflow else ex.outflow_template
                 text = template.format(amount=amount_display)
+                # A history of detections: recorded whether or not the send below succeeds.
+                self.events.record(
+                    [
+                        StoredEvent(
+                            kind="exchange_inflow" if is_inflow else "exchange_outflow",
+                            source=f"exchange_flow:{ex.key}",
+                            tx_hash=str(item.get("hash")),
+                            from_address=from_addr,
+                            to_address=to_addr,
+                            amount_wei=wco_to_wei(value),
+                            block=block_number(item),
+                            occurred_at=parse_timestamp(item.get("timestamp")),
+                        )
+                    ]
+                )
                 await self._send_to_channel(bot, channel, text)
                 alerts_sent += 1
             if alerts_sent > 0:
@@ -251,10 +269,9 @@ class ExchangeFlowAlertService:
                 self._save_state()
 
     async def _send_to_channel(self, bot: Bot, channel: str | int, text: str) -> None:
-        try:
-            await bot.send_message(chat_id=channel, text=text)
-        except Exception:
-            logger.exception("Failed to send exchange flow alert to channel=%s", channel)
+        self.outbound.submit(
+            channel, lambda: bot.send_message(chat_id=channel, text=text), Priority.ALERT, label="exchange flow alert"
+        )
 
     @staticmethod
     def _extract_new_items(
@@ -307,22 +324,9 @@ class ExchangeFlowAlertService:
         return wei / Decimal("1000000000000000000")
 
     def _load_state(self) -> None:
-        try:
-            raw = self._state_path.read_text(encoding="utf-8")
-        except FileNotFoundError:
-            return
-        except OSError:
-            logger.exception("Failed to read exchange flow state from %s", self._state_path)
-            return
-
-        try:
-            data = json.loads(raw)
-        except json.JSONDecodeError:
-            logger.warning("Exchange flow state file is invalid JSON: %s", self._state_path)
-            return
-
-        section = (data or {}).get("exchange_flow") or {}
-        last_seen_map = section.get("last_seen_by_exchange") or {}
+        section = self._state.get("exchange_flow")
+        # Cursors moved to the event store; the state file map is only read once, to migrate it.
+        last_seen_map = self.events.cursors("exchange_flow:") or section.get("last_seen_by_exchange") or {}
         if isinstance(last_seen_map, dict):
             parsed: Dict[str, str] = {}
             for k, v in last_seen_map.items():
@@ -334,22 +338,15 @@ class ExchangeFlowAlertService:
             self._alerts_enabled = alerts_enabled
 
     def _save_state(self) -> None:
-        data: Dict[str, Any] = {}
-        if self._state_path.exists():
-            try:
-                data = json.loads(self._state_path.read_text(encoding="utf-8"))
-            except Exception:
-                data = {}
-
-        data["exchange_flow"] = {
-            "last_seen_by_exchange": dict(self._last_seen_by_exchange),
-            "alerts_enabled": self._alerts_enabled,
-            "channel": self.settings.exchange_flow_alert_channel_id,
-            "threshold_wco": self.settings.exchange_flow_threshold_wco,
-            "exchanges": {ex.key: ex.address for ex in self._exchanges},
-        }
-        try:
-            self._state_path.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
-        except OSError:
-            logger.exception("Failed to write exchange flow state to %s", self._state_path)
+        for key, tx_hash in self._last_seen_by_exchange.items():
+            self.events.set_cursor(f"exchange_flow:{key}", tx_hash)
+        self._state.update(
+            "exchange_flow",
+            {
+                "alerts_enabled": self._alerts_enabled,
+                "channel": self.settings.exchange_flow_alert_channel_id,
+                "threshold_wco": self.settings.exchange_flow_threshold_wco,
+                "exchanges": {ex.key: ex.address for ex in self._exchanges},
+            },
+        )
 
@@ -0,0 +1,100 @@
+"""Periodic sampling of price, supply and network metrics into a time-series store."""
+
+import asyncio
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from telegram.ext import ContextTypes
+
+from app.clients.wchain import WChainClient
+from app.config import Settings
+from app.services.analytics import _safe_float
+from app.utils.timeseries import TimeSeriesStore, WindowStats
+
+logger = logging.getLogger(__name__)
+
+# Series names (max 16 ASCII chars each, see TimeSeriesStore).
+WCO_PRICE = "wco_price"
+WAVE_PRICE = "wave_price"
+WCO_CIRCULATING = "wco_circulating"
+WCO_BURNED = "wco_burned"
+TOTAL_ADDRESSES = "total_addresses"
+TOTAL_TRANSACTIONS = "total_txs"
+TRANSACTIONS_TODAY = "txs_today"
+GAS_AVERAGE = "gas_average"
+
+ALL_SERIES = (
+    WCO_PRICE,
+    WAVE_PRICE,
+    WCO_CIRCULATING,
+    WCO_BURNED,
+    TOTAL_ADDRESSES,
+    TOTAL_TRANSACTIONS,
+    TRANSACTIONS_TODAY,
+    GAS_AVERAGE,
+)
+
+
+class MetricsHistoryService:
+    """
+    Samples the oracle/Blockscout payloads already cached by ``WChainClient``
+    into fixed-size ring buffers so trend questions can be answered locally.
+    """
+
+    def __init__(self, settings: Settings, wchain: WChainClient):
+        self.settings = settings
+        self.wchain = wchain
+        self.store = TimeSeriesStore(Path(settings.timeseries_path), settings.timeseries_capacity)
+
+    async def job_callback(self, context: ContextTypes.DEFAULT_TYPE) -> None:
+        await self.sample()
+
+    async def sample(self) -> int:
+        """Record one sample per available metric; returns the number of samples written."""
+        wco_price, wave_price, supply, stats = await asyncio.gather(
+            self.wchain.get_wco_price(),
+            self.wchain.get_wave_price(),
+            self.wchain.get_wco_supply(),
+            self.wchain.get_network_stats(),
+        )
+        summary = (supply or {}).get("summary") or {}
+        gas_prices = (stats or {}).get("gas_prices") or {}
+
+        candidates: List[Tuple[str, Optional[float]]] = [
+            (WCO_PRICE, _safe_float(wco_price, "price")),
+            (WAVE_PRICE, _safe_float(wave_price, "price")),
+            (WCO_CIRCULATING, _safe_float(summary, "circulating_supply_wco")),
+            (WCO_BURNED, _safe_float(summary, "burned_supply_wco")),
+            (TOTAL_ADDRESSES, _safe_float(stats, "total_addresses")),
+            (TOTAL_TRANSACTIONS, _safe_float(stats, "total_transactions")),
+            (TRANSACTIONS_TODAY, _safe_float(stats, "transactions_today")),
+            (GAS_AVERAGE, _safe_float(gas_prices, "average")),
+        ]
+        samples = [(name, value) for name, value in candidates if value is not None]
+        if not samples:
+            logger.debug("No metrics available to sample.")
+            return 0
+        self.store.append_many(samples)
+        logger.debug("Recorded %d metric sample(s).", len(samples))
+        return len(samples)
+
+    async def flush(self) -> None:
+        """Write samples still pending (call on shutdown)."""
+        await self.store.flush()
+
+    def window_stats(self, series: str, window_seconds: float) -> Optional[WindowStats]:
+        return self.store.window_stats(series, window_seconds)
+
+    def samples(self, series: str, window_seconds: Optional[float] = None) -> Tuple[List[float], List[float]]:
+        return self.store.samples(series, window_seconds)
+
+    def latest(self) -> Dict[str, float]:
+        """Most recent value of every recorded series."""
+        result: Dict[str, float] = {}
+        for name in self.store.names:
+            point = self.store.series(name).latest()
+            if point is not None:
+                result[name] = point[1]
+        return result
+
@@ -0,0 +1,325 @@
+"""Central, rate-limit-aware queue for outgoing Telegram messages."""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set, Tuple
+
+import httpx
+from telegram.error import BadRequest, ChatMigrated, Forbidden, NetworkError, RetryAfter, TimedOut
+
+from app.config import Settings
+from app.utils.metrics import RollingPercentiles
+from app.utils.rate_limit import KeyedTokenBuckets, TokenBucket
+
+logger = logging.getLogger(__name__)
+
+SendCallable = Callable[[], Awaitable[Any]]
+
+# A message that keeps hitting flood control or network errors is dropped after this many attempts.
+MAX_ATTEMPTS = 5
+# Backoff before retrying after a network error: 1s, 2s, 4s, ...
+_RETRY_BASE_DELAY = 1.0
+# BadRequest descriptions meaning the chat itself can no longer receive messages.
+_UNREACHABLE_CHAT_ERRORS = (
+    "chat not found",
+    "user not found",
+    "peer_id_invalid",
+    "user is deactivated",
+    "group chat was deactivated",
+    "chat_write_forbidden",
+    "have no rights to send",
+    "not enough rights to send",
+)
+
+
+class Priority(IntEnum):
+    """Lanes, drained in this order."""
+
+    ALERT = 0
+    REPORT = 1
+    FOLLOW_UP = 2
+
+
+@dataclass
+class _Outgoing:
+    chat_id: str | int
+    send: SendCallable
+    priority: Priority
+    label: str
+    future: "asyncio.Future[Any]"
+    idempotent: bool = False
+    enqueued_at: float = field(default_factory=time.monotonic)
+    not_before: float = 0.0
+    attempts: int = 0
+
+
+class _Lane:
+    """One priority's messages, queued per chat; chats are served round-robin."""
+
+    def __init__(self) -> None:
+        self.chats: "OrderedDict[str, Deque[_Outgoing]]" = OrderedDict()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, item: _Outgoing) -> None:
+        self.chats.setdefault(str(item.chat_id), deque()).append(item)
+        self._size += 1
+
+    def appendleft(self, item: _Outgoing) -> None:
+        key = str(item.chat_id)
+        if key not in self.chats:
+            self.chats[key] = deque()
+            # A retry keeps its chat's place at the front of the rotation.
+            self.chats.move_to_end(key, last=False)
+        self.chats[key].appendleft(item)
+        self._size += 1
+
+    def pop(self, key: str) -> _Outgoing:
+        """Take the chat's oldest message and send the chat to the back of the rotation."""
+        queue = self.chats[key]
+        item = queue.popleft()
+        self._size -= 1
+        if queue:
+            self.chats.move_to_end(key)
+        else:
+            del self.chats[key]
+        return item
+
+
+class OutboundMessageQueue:
+    """
+    Schedules Telegram sends against Telegram's flood limits.
+
+    Producers call ``submit`` and get a future back without waiting for the
+    send. One dispatcher task drains the lanes in priority order. Each send
+    needs a token from the global bucket and from its chat's bucket: groups
+    and channels get about 20 per minute, private chats one per second.
+    Within a lane messages are queued per chat and chats take turns, so a
+    chat that is out of tokens does not hold up the chats queued behind it,
+    however many messages it has waiting. Each chat's messages go out in order.
+
+    At most ``outbound_max_in_flight`` sends are awaited at once. On
+    ``RetryAfter`` all sends pause for the time Telegram asked for, and the
+    message goes back to the front of its chat's queue. Transient network
+    errors are retried with backoff, except a timeout after the request went
+    out: Telegram may already have acted on it, so only sends submitted as
+    ``idempotent`` (edits, deletes) are retried then. Anything else, or
+    running out of attempts, is logged and set on the future. Use
+    ``is_permanent_error`` to tell "this chat is gone" from "this send failed".
+    """
+
+    def __init__(self, settings: Settings):
+        global_rate = settings.outbound_global_per_second
+        self._global = TokenBucket(global_rate, global_rate)
+        self._groups: KeyedTokenBuckets[str] = KeyedTokenBuckets(
+            settings.outbound_group_per_minute / 60, settings.outbound_group_burst
+        )
+        self._private: KeyedTokenBuckets[str] = KeyedTokenBuckets(settings.outbound_private_per_second, 1)
+        self._max_in_flight = max(1, settings.outbound_max_in_flight)
+        self._lanes: Dict[Priority, _Lane] = {priority: _Lane() for priority in Priority}
+        self._lag: Dict[Priority, RollingPercentiles] = {priority: RollingPercentiles() for priority in Priority}
+        self._wakeup = asyncio.Event()
+        self._paused_until = 0.0
+        self._dispatcher: Optional["asyncio.Task[None]"] = None
+        self._in_flight: Set["asyncio.Task[None]"] = set()
+        self.sent = 0
+        self.failed = 0
+        self.flood_waits = 0
+        self.retries = 0
+
+    def submit(
+        self,
+        chat_id: str | int,
+        send: SendCallable,
+        priority: Priority = Priority.ALERT,
+        label: str = "message",
+        idempotent: bool = False,
+    ) -> "asyncio.Future[Any]":
+        """
+        Queue ``send`` (a zero-argument coroutine function doing one Bot API call)
+        for ``chat_id``. The returned future resolves to its result; awaiting it
+        is optional. Pass ``idempotent`` when repeating the call is harmless, so
+        it is retried even after a timeout that may have reached Telegram.
+        """
+        future: "asyncio.Future[Any]" = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_exception)
+        self._lanes[priority].append(_Outgoing(chat_id, send, priority, label, future, idempotent))
+        self._ensure_dispatcher()
+        self._wakeup.set()
+        return future
+
+    def pending(self) -> int:
+        return sum(len(lane) for lane in self._lanes.values())
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Give queued sends up to ``timeout`` seconds to go out, then stop the dispatcher."""
+        deadline = time.monotonic() + timeout
+        while (self.pending() or self._in_flight) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+        dropped = self.pending()
+        if dropped:
+            logger.warning("Outbound queue stopped with %d unsent message(s).", dropped)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "queued": {priority.name.lower(): len(lane) for priority, lane in self._lanes.items()},
+            "in_flight": len(self._in_flight),
+            "sent": self.sent,
+            "failed": self.failed,
+            "flood_waits": self.flood_waits,
+            "retries": self.retries,
+            "lag": {priority.name.lower(): stats.snapshot() for priority, stats in self._lag.items()},
+        }
+
+    def _ensure_dispatcher(self) -> None:
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch(), name="outbound-dispatcher")
+
+    async def _dispatch(self) -> None:
+        while True:
+            now = time.monotonic()
+            wait: Optional[float] = None
+            if now < self._paused_until:
+                wait = self._paused_until - now
+            elif len(self._in_flight) < self._max_in_flight:
+                item, wait = self._take_ready(now)
+                if item is not None:
+                    task = asyncio.create_task(self._deliver(item))
+                    self._in_flight.add(task)
+                    task.add_done_callback(self._on_delivered)
+                    continue
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def _take_ready(self, now: float) -> Tuple[Optional[_Outgoing], Optional[float]]:
+        """Pop the first sendable item, or return how long until one may be."""
+        wait = self._global.retry_after(now=now)
+        if wait > 0:
+            return None, wait
+
+        soonest: Optional[float] = None
+        for lane in self._lanes.values():
+            # Only each chat's oldest message is a candidate; the rest share its bucket.
+            ready: Optional[Tuple[str, TokenBucket]] = None
+            for key, queue in lane.chats.items():
+                item = queue[0]
+                if item.not_before > now:
+                    backoff = item.not_before - now
+                    soonest = backoff if soonest is None else min(soonest, backoff)
+                    continue
+                bucket = self._chat_bucket(key, now)
+                chat_wait = bucket.retry_after(now=now)
+                if chat_wait == 0:
+                    ready = key, bucket
+                    break
+                soonest = chat_wait if soonest is None else min(soonest, chat_wait)
+            if ready is not None:
+                key, bucket = ready
+                bucket.try_acquire(now=now)
+                self._global.try_acquire(now=now)
+                return lane.pop(key), None
+        return None, soonest
+
+    def _chat_bucket(self, key: str, now: float) -> TokenBucket:
+        if _is_group_chat(key):
+            return self._groups.bucket(key, now)
+        return self._private.bucket(key, now)
+
+    async def _deliver(self, item: _Outgoing) -> None:
+        item.attempts += 1
+        try:
+            result = await item.send()
+        except RetryAfter as exc:
+            self.flood_waits += 1
+            delay = float(exc.retry_after)
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            if item.attempts < MAX_ATTEMPTS:
+                logger.warning("Flood control on %s to %s; pausing sends for %.0fs.", item.label, item.chat_id, delay)
+                self._lanes[item.priority].appendleft(item)
+                self._wakeup.set()
+                return
+            self._fail(item, exc)
+            return
+        except NetworkError as exc:
+            retryable = item.idempotent or not _may_have_reached_telegram(exc)
+            if is_transient_error(exc) and retryable and item.attempts < MAX_ATTEMPTS:
+                self.retries += 1
+                delay = _RETRY_BASE_DELAY * 2 ** (item.attempts - 1)
+                logger.warning("Retrying %s to %s in %.0fs: %s", item.label, item.chat_id, delay, exc)
+                item.not_before = time.monotonic() + delay
+                self._lanes[item.priority].appendleft(item)
+                self._wakeup.set()
+                return
+            self._fail(item, exc)
+            return
+        except Exception as exc:
+            self._fail(item, exc)
+            return
+
+        self.sent += 1
+        self._lag[item.priority].record(time.monotonic() - item.enqueued_at)
+        if not item.future.done():
+            item.future.set_result(result)
+
+    def _on_delivered(self, task: "asyncio.Task[None]") -> None:
+        self._in_flight.discard(task)
+        # A worker slot just freed up.
+        self._wakeup.set()
+
+    def _fail(self, item: _Outgoing, exc: Exception) -> None:
+        self.failed += 1
+        if is_permanent_error(exc):
+            # Expected churn (blocked bot, deleted chat); no traceback needed.
+            logger.warning("Chat %s is unreachable for %s: %s", item.chat_id, item.label, exc)
+        else:
+            logger.error("Failed to send %s to chat_id=%s: %s", item.label, item.chat_id, exc, exc_info=exc)
+        if not item.future.done():
+            item.future.set_exception(exc)
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """Network-level failures (timeouts, connection resets) that are worth retrying."""
+    return isinstance(exc, NetworkError) and not isinstance(exc, BadRequest)
+
+
+def is_permanent_error(exc: BaseException) -> bool:
+    """The chat can't receive messages any more: bot blocked or kicked, chat deleted or migrated."""
+    if isinstance(exc, (Forbidden, ChatMigrated)):
+        return True
+    if isinstance(exc, BadRequest):
+        message = exc.message.lower()
+        return any(fragment in message for fragment in _UNREACHABLE_CHAT_ERRORS)
+    return False
+
+
+def _may_have_reached_telegram(exc: BaseException) -> bool:
+    # Connect and pool timeouts fail before the request is written; any other timeout may not.
+    return isinstance(exc, TimedOut) and not isinstance(exc.__cause__, (httpx.ConnectTimeout, httpx.PoolTimeout))
+
+
+def _is_group_chat(chat_id: str) -> bool:
+    # Groups, supergroups and channels have negative ids or are addressed as @username.
+    return chat_id.startswith("-") or chat_id.startswith("@")
+
+
+def _consume_exception(future: "asyncio.Future[Any]") -> None:
+    # Failures are logged by the queue; fire-and-forget callers need not retrieve them.
+    if not future.cancelled():
+        future.exception()
@@ -0,0 +1,339 @@
+"""Persisted registry of W-Swap pairs, built from the factory's PairCreated logs."""
+
+import asyncio
+import logging
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.clients.wchain import WChainClient
+from app.config import Settings
+from app.utils import gather_limited
+from app.utils.state_store import get_state_store
+
+logger = logging.getLogger(__name__)
+
+STATE_SECTION = "wswap_pairs"
+# keccak256("PairCreated(address,address,address,uint256)")
+TOPIC_PAIR_CREATED = "0x0d3648bd0f6ba80134a33ba9275ac585d9d315f0ad8355cddefde31afa28d0e9"
+# Blockscout serves at most 50 logs per page.
+PAGE_SIZE = 50
+
+# (block number, log index): orders logs the way Blockscout pages them, newest first.
+_LogPosition = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class PairInfo:
+    """Metadata for a W-Swap pair."""
+
+    address: str
+    token0_address: str
+    token1_address: str
+    token0_symbol: str
+    token1_symbol: str
+    token0_decimals: int
+    token1_decimals: int
+    has_wco: bool  # True if one of the tokens is WWCO
+
+    @property
+    def name(self) -> str:
+        return f"{self.token0_symbol}/{self.token1_symbol}"
+
+    @property
+    def wco_position(self) -> Optional[int]:
+        """Returns 0 or 1 indicating which token is WCO, or None if neither."""
+        if not self.has_wco:
+            return None
+        # WWCO address (lowercase for comparison)
+        wwco = "0xedb8008031141024d50ca2839a607b2f82c1c045"
+        if self.token0_address.lower() == wwco:
+            return 0
+        if self.token1_address.lower() == wwco:
+            return 1
+        return None
+
+
+def parse_pair_created(item: Dict[str, Any]) -> Optional[Tuple[str, str, str]]:
+    """(token0, token1, pair) from a decoded PairCreated log, or None for any other log."""
+    topics = item.get("topics") or []
+    if not topics or topics[0] != TOPIC_PAIR_CREATED:
+        return None
+    decoded = item.get("decoded") or {}
+    values = {param.get("name", ""): param.get("value", "") for param in decoded.get("parameters") or []}
+    token0, token1, pair = values.get("token0"), values.get("token1"), values.get("pair")
+    if not (token0 and token1 and pair):
+        return None
+    return str(token0), str(token1), str(pair)
+
+
+class PairRegistry:
+    """
+    Every pair the W-Swap factory has created, kept in the shared state file.
+
+    The first ``sync`` backfills the factory's whole log history, page by
+    page via Blockscout's ``next_page_params``. Progress is saved after each
+    page, so an interrupted backfill resumes where it stopped. After that,
+    ``sync`` reads only logs newer than the stored cursor, which is usually
+    one request. Token metadata for new pairs is fetched concurrently, at
+    most ``token_metadata_concurrency`` requests at a time. Pairs whose
+    metadata lookup failed are stored with placeholder symbols and decimals
+    and retried on later syncs.
+    """
+
+    def __init__(self, settings: Settings, wchain: WChainClient):
+        self.settings = settings
+        self.wchain = wchain
+        self._lock = asyncio.Lock()
+        self._state = get_state_store(self.settings.wswap_liquidity_alert_state_path, self.settings.state_flush_seconds)
+        self._pairs: Dict[str, PairInfo] = {}
+        self._unresolved: Set[str] = set()
+        self._cursor: Optional[_LogPosition] = None
+        self._backfilled = False
+        # While backfilling: the next page to fetch and the newest log seen when the backfill started.
+        self._backfill_page: Optional[Dict[str, Any]] = None
+        self._backfill_head: Optional[_LogPosition] = None
+        self.pages_fetched = 0
+        self.metadata_lookups = 0
+        self._load_state()
+
+    def __len__(self) -> int:
+        return len(self._pairs)
+
+    @property
+    def backfilled(self) -> bool:
+        return self._backfilled
+
+    def get(self, address: str) -> Optional[PairInfo]:
+        return self._pairs.get(address.lower())
+
+    def pairs(self) -> List[PairInfo]:
+        return list(self._pairs.values())
+
+    def wco_pairs(self) -> List[PairInfo]:
+        return [pair for pair in self._pairs.values() if pair.has_wco]
+
+    async def sync(self) -> List[PairInfo]:
+        """Catch up with the factory; returns the pairs added by this call."""
+        async with self._lock:
+            await self._retry_unresolved()
+            if self._backfilled:
+                added = await self._follow()
+            else:
+                added = await self._backfill()
+            if added:
+                logger.info(
+                    "Pair registry added %d pair(s); %d total, %d with WCO.",
+                    len(added),
+                    len(self._pairs),
+                    len(self.wco_pairs()),
+                )
+            return added
+
+    async def add_from_log(self, item: Dict[str, Any]) -> Optional[PairInfo]:
+        """The pair a PairCreated log announces, registering it if it is new."""
+        parsed = parse_pair_created(item)
+        if parsed is None:
+            return None
+        async with self._lock:
+            known = self._pairs.get(parsed[2].lower())
+            if known is not None:
+                return known
+            added = await self._register([item])
+            self._save_state()
+        return added[0] if added else None
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "pairs": len(self._pairs),
+            "wco_pairs": len(self.wco_pairs()),
+            "unresolved": len(self._unresolved),
+            "backfilled": self._backfilled,
+            "pages_fetched": self.pages_fetched,
+            "metadata_lookups": self.metadata_lookups,
+        }
+
+    async def _backfill(self) -> List[PairInfo]:
+        factory = self.settings.wswap_factory_address
+        added: List[PairInfo] = []
+        while True:
+            payload = await self.wchain.get_address_logs(factory, page_size=PAGE_SIZE, page_params=self._backfill_page)
+            if payload is None:
+                logger.warning("Factory log backfill paused at %s; resuming on the next sync.", self._backfill_page)
+                break
+            self.pages_fetched += 1
+            items = payload.get("items") or []
+            if self._backfill_head is None:
+                self._backfill_head = next(filter(None, map(_log_position, items)), None)
+            added += await self._register(items)
+
+            next_page = payload.get("next_page_params")
+            if not next_page or not items:
+                self._backfilled = True
+                self._cursor = self._backfill_head
+                self._backfill_page = self._backfill_head = None
+                logger.info("Factory log backfill complete: %d pair(s).", len(self._pairs))
+                self._save_state()
+                break
+            self._backfill_page = dict(next_page)
+            self._save_state()
+        return added
+
+    async def _follow(self) -> List[PairInfo]:
+        factory = self.settings.wswap_factory_address
+        new_items: List[Dict[str, Any]] = []
+        newest: Optional[_LogPosition] = None
+        page_params: Optional[Dict[str, Any]] = None
+        while True:
+            payload = await self.wchain.get_address_logs(factory, page_size=PAGE_SIZE, page_params=page_params)
+            if payload is None:
+                # Keep the cursor; the same logs are read again next time.
+                added = await self._register(new_items)
+                self._save_state()
+                return added
+            self.pages_fetched += 1
+            reached = False
+            for item in payload.get("items") or []:
+                position = _log_position(item)
+                if position is None:
+                    continue
+                if self._cursor is not None and position <= self._cursor:
+                    reached = True
+                    break
+                newest = newest or position
+                new_items.append(item)
+            page_params = payload.get("next_page_params")
+            if reached or not page_params:
+                break
+
+        added = await self._register(new_items)
+        if newest is not None:
+            self._cursor = newest
+            self._save_state()
+        return added
+
+    async def _register(self, items: Iterable[Dict[str, Any]]) -> List[PairInfo]:
+        created: Dict[str, Tuple[str, str, str]] = {}
+        for item in items:
+            parsed = parse_pair_created(item)
+            if parsed is not None and parsed[2].lower() not in self._pairs:
+                created.setdefault(parsed[2].lower(), parsed)
+        if not created:
+            return []
+
+        metadata = await self._token_metadata(
+            token for token0, token1, _ in created.values() for token in (token0, token1)
+        )
+        added = []
+        for pair_lower, (token0, token1, pair_addr) in created.items():
+            pair = self._pair_info(pair_addr, token0, token1, metadata)
+            self._pairs[pair_lower] = pair
+            if metadata.get(token0.lower()) is None or metadata.get(token1.lower()) is None:
+                self._unresolved.add(pair_lower)
+            added.append(pair)
+        return added
+
+    async def _retry_unresolved(self) -> None:
+        if not self._unresolved:
+            return
+        pairs = [self._pairs[address] for address in self._unresolved if address in self._pairs]
+        metadata = await self._token_metadata(
+            token for pair in pairs for token in (pair.token0_address, pair.token1_address)
+        )
+        resolved = 0
+        for pair in pairs:
+            if metadata.get(pair.token0_address.lower()) is None or metadata.get(pair.token1_address.lower()) is None:
+                continue
+            self._pairs[pair.address.lower()] = self._pair_info(
+                pair.address, pair.token0_address, pair.token1_address, metadata
+            )
+            self._unresolved.discard(pair.address.lower())
+            resolved += 1
+        if resolved:
+            self._save_state()
+
+    async def _token_metadata(self, tokens: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        unique = sorted({token.lower(): token for token in tokens}.items())
+        self.metadata_lookups += len(unique)
+        results = await gather_limited(
+            self.settings.token_metadata_concurrency,
+            [self.wchain.get_token_info(token) for _, token in unique],
+        )
+        return {
+            lower: result if isinstance(result, dict) else None for (lower, _), result in zip(unique, results)
+        }
+
+    def _pair_info(
+        self, pair_addr: str, token0: str, token1: str, metadata: Dict[str, Optional[Dict[str, Any]]]
+    ) -> PairInfo:
+        wwco = self.settings.wwco_token_address.lower()
+        token0_info = metadata.get(token0.lower()) or {}
+        token1_info = metadata.get(token1.lower()) or {}
+        return PairInfo(
+            address=pair_addr,
+            token0_address=token0,
+            token1_address=token1,
+            token0_symbol=str(token0_info.get("symbol") or token0[:8]),
+            token1_symbol=str(token1_info.get("symbol") or token1[:8]),
+            token0_decimals=_decimals(token0_info),
+            token1_decimals=_decimals(token1_info),
+            has_wco=token0.lower() == wwco or token1.lower() == wwco,
+        )
+
+    def _load_state(self) -> None:
+        section = self._state.get(STATE_SECTION)
+        if section.get("factory") != self.settings.wswap_factory_address:
+            # Nothing stored yet, or stored for another factory: start with a fresh backfill.
+            return
+        for entry in section.get("pairs") or []:
+            try:
+                pair = PairInfo(**entry)
+            except TypeError:
+                continue
+            self._pairs[pair.address.lower()] = pair
+        self._unresolved = {str(address) for address in section.get("unresolved") or []} & set(self._pairs)
+        self._backfilled = bool(section.get("backfilled"))
+        self._cursor = _parse_position(section.get("cursor"))
+        backfill_page = section.get("backfill_page")
+        self._backfill_page = backfill_page if isinstance(backfill_page, dict) else None
+        self._backfill_head = _parse_position(section.get("backfill_head"))
+
+    def _save_state(self) -> None:
+        self._state.update(
+            STATE_SECTION,
+            {
+                "factory": self.settings.wswap_factory_address,
+                "pairs": [asdict(pair) for pair in self._pairs.values()],
+                "unresolved": sorted(self._unresolved),
+                "backfilled": self._backfilled,
+                "cursor": _format_position(self._cursor),
+                "backfill_page": self._backfill_page,
+                "backfill_head": _format_position(self._backfill_head),
+            },
+        )
+
+
+def _log_position(item: Dict[str, Any]) -> Optional[_LogPosition]:
+    try:
+        return int(item["block_number"]), int(item["index"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _parse_position(value: Any) -> Optional[_LogPosition]:
+    """Inverse of ``_format_position``; the same "block:index" form as the watcher's log keys."""
+    try:
+        block, index = str(value).split(":")
+        return int(block), int(index)
+    except ValueError:
+        return None
+
+
+def _format_position(position: Optional[_LogPosition]) -> Optional[str]:
+    return f"{position[0]}:{position[1]}" if position is not None else None
+
+
+def _decimals(token_info: Dict[str, Any]) -> int:
+    try:
+        return int(token_info.get("decimals") or 18)
+    except (TypeError, ValueError):
+        return 18
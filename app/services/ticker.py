@@ -0,0 +1,193 @@
+"""Live WCO ticker: one pinned message per chat, edited in place when the numbers change."""
+
+import asyncio
+import functools
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from telegram import Bot
+from telegram.error import BadRequest, TelegramError
+from telegram.ext import ContextTypes
+
+from app.config import Settings
+from app.services.analytics import AnalyticsService
+from app.services.outbound import OutboundMessageQueue, Priority, is_permanent_error
+from app.utils import format_token_amount, format_usd
+from app.utils.state_store import get_state_store
+
+logger = logging.getLogger(__name__)
+
+STATE_SECTION = "tickers"
+
+
+@dataclass
+class _Ticker:
+    message_id: int
+    text: str
+
+
+class TickerService:
+    """
+    Keeps one ticker message per chat up to date.
+
+    ``/ticker`` posts and pins the message. A repeating job renders the board
+    once per tick. It calls ``edit_message_text`` only in chats whose last
+    rendered text differs, so an unchanged board costs no API calls. The
+    board has no timestamp, or every tick would count as a change. Tickers,
+    with their last text, are persisted so a restart picks up the same
+    messages.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        analytics: AnalyticsService,
+        outbound: Optional[OutboundMessageQueue] = None,
+    ):
+        self.settings = settings
+        self.analytics = analytics
+        self.outbound = outbound or OutboundMessageQueue(settings)
+        self._lock = asyncio.Lock()
+        self._state = get_state_store(self.settings.ticker_state_path, self.settings.state_flush_seconds)
+        self._tickers: Dict[str, _Ticker] = {}
+        self.edits = 0
+        self.unchanged = 0
+        self._load_state()
+
+    def is_running(self, chat_id: str | int) -> bool:
+        return str(chat_id) in self._tickers
+
+    async def start(self, bot: Bot, chat_id: str | int) -> tuple[bool, str]:
+        key = str(chat_id)
+        if key in self._tickers:
+            return False, "📟 A live ticker is already running in this chat. Use /ticker off to stop it."
+
+        text = await self.render()
+        if text is None:
+            return False, "Unable to load WCO data right now. Please try again shortly."
+
+        try:
+            message = await bot.send_message(chat_id=chat_id, text=text, parse_mode="Markdown")
+        except TelegramError as exc:
+            logger.warning("Failed to post ticker in %s: %s", chat_id, exc)
+            return False, "Unable to post the ticker in this chat."
+
+        pinned = True
+        try:
+            await bot.pin_chat_message(chat_id=chat_id, message_id=message.message_id, disable_notification=True)
+        except TelegramError as exc:
+            logger.info("Ticker in %s posted but not pinned: %s", chat_id, exc)
+            pinned = False
+
+        async with self._lock:
+            self._tickers[key] = _Ticker(message_id=message.message_id, text=text)
+            self._save_state()
+
+        interval = self.settings.ticker_update_seconds
+        if pinned:
+            return True, f"📟 Live ticker started and pinned. It refreshes every {interval}s when the numbers change."
+        return True, (
+            f"📟 Live ticker started (refreshing every {interval}s). "
+            "Give the bot permission to pin messages to keep it at the top."
+        )
+
+    async def stop(self, bot: Bot, chat_id: str | int) -> tuple[bool, str]:
+        async with self._lock:
+            ticker = self._tickers.pop(str(chat_id), None)
+            if ticker is None:
+                return False, "No live ticker is running in this chat."
+            self._save_state()
+
+        try:
+            await bot.unpin_chat_message(chat_id=chat_id, message_id=ticker.message_id)
+        except TelegramError as exc:
+            logger.debug("Could not unpin ticker in %s: %s", chat_id, exc)
+        return True, "📟 Live ticker stopped."
+
+    async def job_callback(self, context: ContextTypes.DEFAULT_TYPE) -> None:
+        await self.refresh(context.bot)
+
+    async def refresh(self, bot: Bot) -> int:
+        """Edit every ticker whose text changed; returns the number of edits made."""
+        if not self._tickers:
+            return 0
+        text = await self.render()
+        if text is None:
+            # Keep showing the last good numbers rather than a board full of N/A.
+            return 0
+
+        edits = {
+            chat_id: self.outbound.submit(
+                chat_id,
+                functools.partial(
+                    bot.edit_message_text,
+                    chat_id=chat_id,
+                    message_id=ticker.message_id,
+                    text=text,
+                    parse_mode="Markdown",
+                ),
+                Priority.FOLLOW_UP,
+                label="ticker update",
+                idempotent=True,
+            )
+            for chat_id, ticker in list(self._tickers.items())
+            if ticker.text != text
+        }
+        self.unchanged += len(self._tickers) - len(edits)
+        if not edits:
+            return 0
+        await asyncio.wait(edits.values())
+
+        edited = 0
+        async with self._lock:
+            for chat_id, edit in edits.items():
+                ticker = self._tickers.get(chat_id)
+                if ticker is None:
+                    continue
+                exc = edit.exception()
+                if exc is None:
+                    ticker.text = text
+                    edited += 1
+                elif isinstance(exc, BadRequest) and "not modified" in exc.message.lower():
+                    ticker.text = text
+                elif is_permanent_error(exc) or (isinstance(exc, BadRequest) and "not found" in exc.message.lower()):
+                    logger.info("Dropping ticker in %s: %s", chat_id, exc)
+                    del self._tickers[chat_id]
+            self._save_state()
+        self.edits += edited
+        return edited
+
+    async def render(self) -> Optional[str]:
+        data = await self.analytics.build_wco_overview()
+        if not data or data.get("price") is None:
+            return None
+        return (
+            "📟 *WCO Live Ticker*\n\n"
+            f"• Price: {format_usd(data.get('price'))}\n"
+            f"• Market Cap: {format_usd(data.get('market_cap'))}\n"
+            f"• Circulating: {format_token_amount(data.get('circulating'))} WCO\n"
+            f"• Burned: {format_token_amount(data.get('burned'))} WCO\n\n"
+            f"_Updates automatically every {self.settings.ticker_update_seconds}s._"
+        )
+
+    def metrics(self) -> Dict[str, int]:
+        return {"tickers": len(self._tickers), "edits": self.edits, "unchanged": self.unchanged}
+
+    def _load_state(self) -> None:
+        section = self._state.get(STATE_SECTION)
+        for chat_id, entry in section.items():
+            if not isinstance(entry, dict):
+                continue
+            message_id = entry.get("message_id")
+            if isinstance(message_id, int):
+                self._tickers[str(chat_id)] = _Ticker(message_id=message_id, text=str(entry.get("text") or ""))
+
+    def _save_state(self) -> None:
+        self._state.update(
+            STATE_SECTION,
+            {
+                chat_id: {"message_id": ticker.message_id, "text": ticker.text}
+                for chat_id, ticker in self._tickers.items()
+            },
+        )
@@ -10,20 +10,33 @@ Monitors W-Swap pools for native WCO transactions and broadcasts alerts:
 """
 
 import asyncio
-import json
 import logging
+import time
 from dataclasses import dataclass
 from decimal import Decimal, InvalidOperation
 from enum import Enum
-from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
 
-from telegram import Bot, ChatMember
-from telegram.error import TelegramError
+from telegram import Bot, Message
 
 from app.clients.wchain import WChainClient
 from app.config import Settings
-from app.utils import escape_markdown_v2, format_token_amount, format_usd
+from app.services.auto_delete import AutoDeleteQueue
+from app.services.chat_admins import ChatAdminDirectory
+from app.services.delivery_journal import DeliveryJournal
+from app.services.digest import AlertCoalescer
+from app.services.event_store import EventStore, StoredEvent, block_number, parse_timestamp, wco_to_wei
+from app.services.outbound import OutboundMessageQueue, Priority
+from app.utils import (
+    BoundedDedupeSet,
+    LatencyStats,
+    escape_markdown_v2,
+    format_token_amount,
+    format_usd,
+    gather_limited,
+)
+from app.utils.hash_ring import HashRing
+from app.utils.state_store import get_state_store
 
 logger = logging.getLogger(__name__)
 
@@ -83,18 +96,41 @@ class WCODexAlertService:
         ),
     ]
 
-    def __init__(self, settings: Settings, wchain: WChainClient):
+    def __init__(
+        self,
+        settings: Settings,
+        wchain: WChainClient,
+        admins: Optional[ChatAdminDirectory] = None,
+        outbound: Optional[OutboundMessageQueue] = None,
+        deletions: Optional[AutoDeleteQueue] = None,
+        events: Optional[EventStore] = None,
+        journal: Optional[DeliveryJournal] = None,
+    ):
         self.settings = settings
         self.wchain = wchain
+        self.admins = admins or ChatAdminDirectory(settings)
+        self.outbound = outbound or OutboundMessageQueue(settings)
+        self.deletions = deletions or AutoDeleteQueue(settings)
+        self.events = events or EventStore(settings)
+        self.journal = journal or DeliveryJournal(settings)
         self._lock = asyncio.Lock()
 
-        self._state_path = Path(self.settings.wco_dex_alert_state_path)
-        self._processed_tx_hashes: Set[str] = set()
+        self._state = get_state_store(self.settings.wco_dex_alert_state_path, self.settings.state_flush_seconds)
+        # Keys kept in memory and in the ring file; changing it resizes the file on the next start.
+        self._max_processed_cache = 1000
+        self._processed_tx_hashes = BoundedDedupeSet(
+            self._max_processed_cache,
+            settings.dedupe_bloom_capacity,
+            settings.dedupe_bloom_error_rate,
+            ring=HashRing(settings.wco_dex_processed_ring_path, self._max_processed_cache),
+        )
         self._last_seen_by_pool: Dict[str, str] = {}
         self._last_seen_router: Optional[str] = None
         self._last_seen_whale_tx: Optional[str] = None
-        self._max_processed_cache = 1000
         self._alerts_enabled: bool = True  # Can be toggled by admins
+        self.cycle_time = LatencyStats()
+        self.last_cycle_seconds = 0.0
+        self.poll_failures = 0
 
         # Also track exchange addresses to exclude from whale alerts
         self._exchange_addresses_lower: Set[str] = {
@@ -103,8 +139,12 @@ class WCODexAlertService:
             "0x430d2ada8140378989d20eae6d48ea05bbce2977",  # Bitmart
         }
 
-        # Store job queue reference for auto-delete scheduling
-        self._job_queue = None
+        self._digest: AlertCoalescer[WCODexEvent] = AlertCoalescer(
+            settings.wco_dex_digest_window_seconds,
+            settings.wco_dex_digest_min_events,
+            self._render_digest,
+            self._send_to_channel,
+        )
 
         # Build pool registry from config + defaults
         self._pools = self._build_pool_registry()
@@ -206,9 +246,6 @@ class WCODexAlertService:
 
     async def job_callback(self, context) -> None:
         """Telegram job callback for periodic polling."""
-        # Store job queue reference for auto-delete scheduling
-        if context.job_queue and not self._job_queue:
-            self._job_queue = context.job_queue
         await self.poll_and_alert(context.bot)
 
     @property
@@ -218,15 +255,7 @@ class WCODexAlertService:
 
     async def is_admin(self, bot: Bot, chat_id: str | int, user_id: int) -> bool:
         """Check if a user is an admin in the specified chat/channel."""
-        try:
-            member = await bot.get_chat_member(chat_id=chat_id, user_id=user_id)
-            return member.status in (
-                ChatMember.ADMINISTRATOR,
-                ChatMember.OWNER,
-            )
-        except TelegramError as e:
-            logger.warning("Failed to check admin status: %s", e)
-            return False
+        return await self.admins.is_admin(bot, chat_id, user_id)
 
     async def toggle_alerts(self, bot: Bot, user_id: int, enable: Optional[bool] = None) -> tuple[bool, str]:
         """
@@ -287,19 +316,34 @@ class WCODexAlertService:
             logger.warning("WCO_DEX_ALERT_CHANNEL_ID not configured, skipping.")
             return
 
+        started = time.perf_counter()
+        await self._refresh_dedupe_filter()
+
+        # Alerts journaled but never sent (crash, failed send) go out before anything new
+        self._resend_unsent(bot)
+
         # Get current WCO price for USD calculations
         wco_price = await self._get_wco_price()
 
-        # Poll router for internal transactions (buys via swaps)
-        await self._poll_router_buys(bot, channel, wco_price)
-
-        # Poll each pool for direct transfers
-        for pool in self._pools:
-            await self._poll_pool(bot, channel, pool, wco_price)
+        # Poll the router (buys via swaps) and each pool side by side; each one
+        # still handles its own transactions oldest-first.
+        sources = ["router"] + [pool.name for pool in self._pools]
+        results = await gather_limited(
+            self.settings.pool_poll_concurrency,
+            [self._poll_router_buys(bot, channel, wco_price)]
+            + [self._poll_pool(bot, channel, pool, wco_price) for pool in self._pools],
+        )
+        for source, result in zip(sources, results):
+            if isinstance(result, Exception):
+                self.poll_failures += 1
+                logger.error("WCO DEX poll of %s failed", source, exc_info=result)
+        await self._digest.release(channel)
 
         # Poll for whale transfers (large transfers not involving pools)
         await self._poll_whale_transfers(bot, channel, wco_price)
 
+        self._record_cycle(time.perf_counter() - started)
+
     async def _poll_router_buys(
         self,
         bot: Bot,
@@ -343,7 +387,7 @@ class WCODexAlertService:
         # Process oldest-first for chronological alerts
         new_items.reverse()
         router_lower = router.lower()
-        alerts_sent = 0
+        outgoing: List[Tuple[WCODexEvent, str]] = []
 
         for item in new_items:
             tx_hash = str(item.get("transaction_hash") or "")
@@ -351,9 +395,8 @@ class WCODexAlertService:
                 continue
 
             # Skip if already processed
-            async with self._lock:
-                if tx_hash in self._processed_tx_hashes:
-                    continue
+            if await self._is_processed(tx_hash):
+                continue
 
             from_obj = item.get("from") or {}
             to_obj = item.get("to") or {}
@@ -391,20 +434,26 @@ class WCODexAlertService:
                     timestamp=item.get("timestamp"),
                 )
                 text = self._render_alert(event)
-                await self._send_to_channel(bot, channel, text)
-                alerts_sent += 1
+                self.journal.detect("wco_dex:router", self._delivery_id(event), {"chat": channel, "text": text})
+                self.events.record([self._stored_event(event, item)])
+                outgoing.append((event, text))
 
                 async with self._lock:
                     self._mark_processed(tx_hash)
 
-        if alerts_sent > 0:
-            logger.info("Sent %d router buy alert(s) to channel %s.", alerts_sent, channel)
-
         async with self._lock:
             if newest_key:
                 self._last_seen_router = newest_key
+                self.journal.commit_cursor("wco_dex:router", newest_key)
             self._save_state()
 
+        # Send only once the detections and the cursor are durable.
+        await self.journal.sync()
+        for event, text in outgoing:
+            await self._send_to_channel(bot, channel, text, [event])
+        if outgoing:
+            logger.info("Sent %d router buy alert(s) to channel %s.", len(outgoing), channel)
+
     async def _poll_pool(
         self,
         bot: Bot,
@@ -450,9 +499,8 @@ class WCODexAlertService:
             if not tx_hash:
                 continue
 
-            async with self._lock:
-                if tx_hash in self._processed_tx_hashes:
-                    continue
+            if await self._is_processed(tx_hash):
+                continue
 
             amount = self._parse_wco_amount(item.get("value"))
             if amount is None or amount <= 0:
@@ -525,23 +573,55 @@ class WCODexAlertService:
                 timestamp=item.get("timestamp"),
             )
             text = self._render_alert(event)
-            await self._send_to_channel(bot, channel, text)
+            self.journal.detect(
+                f"wco_dex:pool:{pool_addr_lower}", self._delivery_id(event), {"chat": channel, "text": text}
+            )
+            self._digest.add(bot, channel, event, text)
+            self.events.record([self._stored_event(event, item)])
             alerts_sent += 1
 
             async with self._lock:
                 self._mark_processed(tx_hash)
 
+        async with self._lock:
+            self._last_seen_by_pool[pool_addr_lower] = newest_hash
+            self.journal.commit_cursor(f"wco_dex:pool:{pool_addr_lower}", newest_hash)
+            self._save_state()
+
+        # The digest is released, and so sent, only once these are durable.
+        await self.journal.sync()
         if alerts_sent > 0:
             logger.info(
-                "Sent %d %s alert(s) to channel %s.",
+                "Queued %d %s alert(s) for channel %s.",
                 alerts_sent,
                 pool.name,
                 channel,
             )
 
-        async with self._lock:
-            self._last_seen_by_pool[pool_addr_lower] = newest_hash
-            self._save_state()
+    def _record_cycle(self, seconds: float) -> None:
+        self.cycle_time.record(seconds)
+        self.last_cycle_seconds = seconds
+        if seconds > self.settings.wco_dex_poll_seconds:
+            logger.warning(
+                "WCO DEX poll took %.1fs, longer than its %ss interval (%d pools).",
+                seconds,
+                self.settings.wco_dex_poll_seconds,
+                len(self._pools),
+            )
+        else:
+            logger.debug("WCO DEX poll took %.2fs (%d pools).", seconds, len(self._pools))
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "pools": len(self._pools),
+            "last_cycle_ms": self.last_cycle_seconds * 1000,
+            "cycle": self.cycle_time.snapshot(),
+            "poll_failures": self.poll_failures,
+        }
+
+    def close(self) -> None:
+        """Flush and unmap the processed-hash ring; called on shutdown, after polling has stopped."""
+        self._processed_tx_hashes.close()
 
     async def _poll_whale_transfers(
         self,
@@ -596,9 +676,8 @@ class WCODexAlertService:
             if not tx_hash:
                 continue
 
-            async with self._lock:
-                if tx_hash in self._processed_tx_hashes:
-                    continue
+            if await self._is_processed(tx_hash):
+                continue
 
             # Only process transactions with native value transfer
             amount = self._parse_wco_amount(item.get("value"))
@@ -650,6 +729,7 @@ class WCODexAlertService:
             )
             text = self._render_alert(event)
             await self._send_to_channel(bot, channel, text)
+            self.events.record([self._stored_event(event, item)])
             alerts_sent += 1
 
             async with self._lock:
@@ -722,6 +802,39 @@ class WCODexAlertService:
             logger.warning("Failed to fetch WCO price: %s", exc)
         return None
 
+    def _render_digest(self, events: List[WCODexEvent]) -> str:
+        """Render a burst of pool alerts as one MarkdownV2 summary."""
+        labels = {
+            AlertType.BUY: ("🟢", "buy", "buys"),
+            AlertType.SELL: ("🔴", "sell", "sells"),
+            AlertType.LIQUIDITY_ADDED: ("💦", "liquidity add", "liquidity adds"),
+            AlertType.LIQUIDITY_REMOVED: ("🔥", "liquidity removal", "liquidity removals"),
+            AlertType.WHALE_MOVE: ("🐋", "whale move", "whale moves"),
+        }
+        pools = sorted({event.pool_name or "Unknown Pool" for event in events})
+        lines = [
+            f"📊 *W\\-Swap activity: {len(events)} alerts*",
+            f"🏊 *Pool:* {escape_markdown_v2(', '.join(pools))}",
+            "",
+        ]
+        for alert_type, (emoji, singular, plural) in labels.items():
+            group = [event for event in events if event.alert_type == alert_type]
+            if not group:
+                continue
+            total_wco = sum((event.amount_wco for event in group), Decimal(0))
+            summary = f"{len(group)} {singular if len(group) == 1 else plural} totaling {format_token_amount(total_wco)} WCO"
+            usd_values = [event.usd_value for event in group if event.usd_value is not None]
+            if usd_values:
+                summary += f" (~{format_usd(sum(usd_values, Decimal(0)))})"
+            lines.append(f"{emoji} {escape_markdown_v2(summary)}")
+
+        largest = max(events, key=lambda event: event.amount_wco)
+        largest_label = labels.get(largest.alert_type, ("", largest.alert_type.value, ""))[1]
+        largest_display = escape_markdown_v2(f"{format_token_amount(largest.amount_wco)} WCO {largest_label}")
+        lines.append("")
+        lines.append(f"🏆 *Largest:* {largest_display} \\([View Tx](https://scan.w-chain.com/tx/{largest.tx_hash})\\)")
+        return "\n".join(lines)
+
     def _render_alert(self, event: WCODexEvent) -> str:
         """Render alert message in Telegram MarkdownV2 format."""
         amount_display = escape_markdown_v2(format_token_amount(event.amount_wco))
@@ -801,59 +914,90 @@ class WCODexAlertService:
 
         return f"Unknown alert type: {event.alert_type}"
 
-    async def _send_to_channel(self, bot: Bot, channel: str, text: str) -> None:
-        """Send alert message to Telegram channel with auto-delete."""
-        try:
+    async def _send_to_channel(
+        self, bot: Bot, channel: str, text: str, events: Sequence[WCODexEvent] = ()
+    ) -> None:
+        """Queue an alert for the channel; ``events`` are the journaled alerts it delivers."""
+        self._submit(bot, channel, text, [self._delivery_id(event) for event in events])
+
+    def _resend_unsent(self, bot: Bot) -> None:
+        pending = self.journal.take_pending("wco_dex:")
+        for delivery in pending:
+            self._submit(bot, str(delivery.payload.get("chat")), str(delivery.payload.get("text")), [delivery.id])
+        if pending:
+            logger.info("Resending %d unsent WCO DEX alert(s) from the journal.", len(pending))
+
+    def _submit(self, bot: Bot, channel: str, text: str, delivery_ids: List[str]) -> None:
+        """Queue a message; auto-delete is scheduled and the journal updated once it is sent."""
+
+        async def deliver() -> Message:
             message = await bot.send_message(
                 chat_id=channel,
                 text=text,
                 parse_mode="MarkdownV2",
                 disable_web_page_preview=True,
             )
-            
+
             # Schedule auto-delete if configured
             auto_delete_seconds = self.settings.wco_dex_auto_delete_seconds
-            if auto_delete_seconds > 0 and self._job_queue:
-                self._job_queue.run_once(
-                    self._delete_message_callback,
-                    when=auto_delete_seconds,
-                    data={"chat_id": channel, "message_id": message.message_id},
-                    name=f"delete_msg_{message.message_id}",
-                )
-                logger.debug(
-                    "Scheduled auto-delete for message %s in %d seconds.",
-                    message.message_id,
-                    auto_delete_seconds,
-                )
-        except Exception:
-            logger.exception("Failed to send WCO DEX alert to channel=%s", channel)
-
-    async def _delete_message_callback(self, context) -> None:
-        """Callback to delete a message after the auto-delete delay."""
-        data = context.job.data
-        chat_id = data.get("chat_id")
-        message_id = data.get("message_id")
-        
-        if not chat_id or not message_id:
+            if auto_delete_seconds > 0:
+                self.deletions.schedule(channel, message.message_id, auto_delete_seconds)
+            return message
+
+        delivery = self.outbound.submit(channel, deliver, Priority.ALERT, label="WCO DEX alert")
+        if delivery_ids:
+            self.journal.track(delivery, delivery_ids)
+
+    async def _refresh_dedupe_filter(self) -> None:
+        """(Re)build the Bloom tier from the event store at startup and whenever it has filled up."""
+        if not self._processed_tx_hashes.needs_bloom_rebuild:
             return
-            
-        try:
-            await context.bot.delete_message(chat_id=chat_id, message_id=message_id)
-            logger.debug("Auto-deleted message %s from channel %s.", message_id, chat_id)
-        except TelegramError as e:
-            # Message might already be deleted or bot lacks permission
-            logger.debug("Could not delete message %s: %s", message_id, e)
+        # Held across the query so no key is marked processed between the read and the swap.
+        async with self._lock:
+            try:
+                keys = await self.events.processed_keys("wco_dex")
+            except Exception:
+                # Without a filter every cache miss goes to the database; try again next poll.
+                logger.exception("Failed to load processed keys for the dedupe filter")
+                return
+            self._processed_tx_hashes.rebuild_bloom(keys)
+        logger.info("Rebuilt the wco_dex dedupe filter from %d stored key(s).", len(keys))
+
+    async def _is_processed(self, tx_hash: str) -> bool:
+        """Check the in-memory cache, then the event store for hashes that have aged out of it."""
+        async with self._lock:
+            if tx_hash in self._processed_tx_hashes:
+                return True
+            if not self._processed_tx_hashes.might_contain(tx_hash):
+                # The Bloom tier holds every key in the event store and has never seen this one.
+                return False
+        return await self.events.is_processed("wco_dex", tx_hash)
+
+    async def recent_events(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """The newest WCO DEX alerts from the event store."""
+        return await self.events.recent_events(source="wco_dex", limit=limit)
+
+    def _stored_event(self, event: WCODexEvent, item: Dict[str, Any]) -> StoredEvent:
+        return StoredEvent(
+            kind=event.alert_type.value,
+            source="wco_dex",
+            tx_hash=event.tx_hash,
+            from_address=event.from_address,
+            to_address=event.to_address,
+            amount_wei=wco_to_wei(event.amount_wco),
+            usd=float(event.usd_value) if event.usd_value is not None else None,
+            block=block_number(item),
+            occurred_at=parse_timestamp(event.timestamp),
+        )
+
+    @staticmethod
+    def _delivery_id(event: WCODexEvent) -> str:
+        return f"wco_dex:{event.unique_key}"
 
     def _mark_processed(self, tx_hash: str) -> None:
         """Mark a transaction as processed (must be called within lock)."""
         self._processed_tx_hashes.add(tx_hash)
-        # Limit cache size
-        if len(self._processed_tx_hashes) > self._max_processed_cache:
-            # Remove oldest entries (convert to list, slice, convert back)
-            excess = len(self._processed_tx_hashes) - self._max_processed_cache
-            to_remove = list(self._processed_tx_hashes)[:excess]
-            for h in to_remove:
-                self._processed_tx_hashes.discard(h)
+        self.events.mark_processed("wco_dex", [tx_hash])
 
     @staticmethod
     def _unique_key_internal(item: Optional[Dict[str, Any]]) -> Optional[str]:
@@ -881,36 +1025,30 @@ class WCODexAlertService:
 
     def _load_state(self) -> None:
         """Load persisted state from file."""
-        try:
-            raw = self._state_path.read_text(encoding="utf-8")
-        except FileNotFoundError:
-            return
-        except OSError:
-            logger.exception("Failed to read WCO DEX alert state from %s", self._state_path)
-            return
-
-        try:
-            data = json.loads(raw)
-        except json.JSONDecodeError:
-            logger.warning("WCO DEX alert state file is invalid JSON: %s", self._state_path)
-            return
-
-        section = (data or {}).get("wco_dex") or {}
+        section = self._state.get("wco_dex")
 
+        # Cursors moved to the event store; the state file values are only read once, to migrate them.
         # Load last seen by pool
-        last_seen_map = section.get("last_seen_by_pool") or {}
+        last_seen_map = self.events.cursors("wco_dex:pool:") or section.get("last_seen_by_pool") or {}
         if isinstance(last_seen_map, dict):
             for k, v in last_seen_map.items():
                 if isinstance(k, str) and isinstance(v, str) and k and v:
                     self._last_seen_by_pool[k.lower()] = v
+        # Journal cursors are fsynced before anything is sent, so they are the most recent.
+        for k, v in self.journal.cursors("wco_dex:pool:").items():
+            self._last_seen_by_pool[k.lower()] = v
 
         # Load last seen router
-        last_seen_router = section.get("last_seen_router")
+        last_seen_router = (
+            self.journal.cursor("wco_dex:router")
+            or self.events.cursor("wco_dex:router")
+            or section.get("last_seen_router")
+        )
         if isinstance(last_seen_router, str) and last_seen_router:
             self._last_seen_router = last_seen_router
 
         # Load last seen whale tx
-        last_seen_whale = section.get("last_seen_whale_tx")
+        last_seen_whale = self.events.cursor("wco_dex:whale") or section.get("last_seen_whale_tx")
         if isinstance(last_seen_whale, str) and last_seen_whale:
             self._last_seen_whale_tx = last_seen_whale
 
@@ -920,31 +1058,20 @@ class WCODexAlertService:
             self._alerts_enabled = alerts_enabled
 
         # Load processed tx hashes
-        processed = section.get("processed_tx_hashes") or []
-        if isinstance(processed, list):
-            for h in processed[-self._max_processed_cache :]:
-                if isinstance(h, str) and h:
-                    self._processed_tx_hashes.add(h)
+        self._processed_tx_hashes.load(section.get("processed_tx_hashes"))
 
     def _save_state(self) -> None:
         """Persist state to file."""
-        data: Dict[str, Any] = {}
-        if self._state_path.exists():
-            try:
-                data = json.loads(self._state_path.read_text(encoding="utf-8"))
-            except Exception:
-                data = {}
-
-        data["wco_dex"] = {
-            "last_seen_by_pool": dict(self._last_seen_by_pool),
-            "last_seen_router": self._last_seen_router,
-            "last_seen_whale_tx": self._last_seen_whale_tx,
-            "alerts_enabled": self._alerts_enabled,
-            "processed_tx_hashes": list(self._processed_tx_hashes)[-self._max_processed_cache :],
-            "channel": self.settings.wco_dex_alert_channel_id,
-            "pools": [p.address for p in self._pools],
-        }
-        try:
-            self._state_path.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
-        except OSError:
-            logger.exception("Failed to write WCO DEX alert state to %s", self._state_path)
+        for pool_addr, tx_hash in self._last_seen_by_pool.items():
+            self.events.set_cursor(f"wco_dex:pool:{pool_addr}", tx_hash)
+        self.events.set_cursor("wco_dex:router", self._last_seen_router)
+        self.events.set_cursor("wco_dex:whale", self._last_seen_whale_tx)
+        self._state.update(
+            "wco_dex",
+            {
+                "alerts_enabled": self._alerts_enabled,
+                "processed_tx_hashes": self._processed_tx_hashes.to_dict(),
+                "channel": self.settings.wco_dex_alert_channel_id,
+                "pools": [p.address for p in self._pools],
+            },
+        )
@@ -1,16 +1,17 @@
 import asyncio
-import json
 import logging
 from dataclasses import dataclass
 from decimal import Decimal, InvalidOperation
-from pathlib import Path
 from typing import Any, Dict, Optional
 
 from telegram import Bot
 
 from app.clients.wchain import WChainClient
 from app.config import Settings
+from app.services.event_store import EventStore, StoredEvent, parse_timestamp, wco_to_wei
+from app.services.outbound import OutboundMessageQueue, Priority
 from app.utils import format_token_amount
+from app.utils.state_store import get_state_store
 
 logger = logging.getLogger(__name__)
 
@@ -37,12 +38,20 @@ class WCOWhaleAlert:
     MEGA_MIN = Decimal("1000000")
     ULTRA_MIN = Decimal("5000000")
 
-    def __init__(self, settings: Settings, wchain: WChainClient):
+    def __init__(
+        self,
+        settings: Settings,
+        wchain: WChainClient,
+        outbound: Optional[OutboundMessageQueue] = None,
+        events: Optional[EventStore] = None,
+    ):
         self.settings = settings
         self.wchain = wchain
+        self.outbound = outbound or OutboundMessageQueue(settings)
+        self.events = events or EventStore(settings)
         self._lock = asyncio.Lock()
 
-        self._state_path = Path(self.settings.whale_alert_state_path)
+        self._state = get_state_store(self.settings.whale_alert_state_path, self.settings.state_flush_seconds)
         self._last_seen_key: Optional[str] = None
         self._load_state()
 
@@ -114,6 +123,7 @@ class WCOWhaleAlert:
                 logger.debug("Skipping whale event %s: amount %.2f below threshold.", event.tx_hash, event.amount_wco)
                 continue
             text = self._render_message(event)
+            self.events.record([self._stored_event(event)])
             await self._send_to_channel(bot, channel, text)
             alerts_sent += 1
         if alerts_sent > 0:
@@ -123,6 +133,17 @@ class WCOWhaleAlert:
             self._last_seen_key = newest_key
             self._save_state()
 
+    def _stored_event(self, event: WhaleBuyEvent) -> StoredEvent:
+        return StoredEvent(
+            kind="whale_buy",
+            source="whale",
+            tx_hash=event.tx_hash,
+            from_address=self.settings.whale_router_address,
+            to_address=event.buyer_wallet,
+            amount_wei=wco_to_wei(event.amount_wco),
+            occurred_at=parse_timestamp(event.timestamp),
+        )
+
     def _render_message(self, event: WhaleBuyEvent) -> str:
         # Requirement: commas + 2 decimals.
         amount_display = format_token_amount(event.amount_wco)
@@ -154,11 +175,10 @@ class WCOWhaleAlert:
         )
 
     async def _send_to_channel(self, bot: Bot, channel: str | int, text: str) -> None:
-        try:
-            # Use plain text to avoid markdown escaping issues with hashes/addresses.
-            await bot.send_message(chat_id=channel, text=text)
-        except Exception:
-            logger.exception("Failed to send whale alert to channel=%s", channel)
+        # Use plain text to avoid markdown escaping issues with hashes/addresses.
+        self.outbound.submit(
+            channel, lambda: bot.send_message(chat_id=channel, text=text), Priority.ALERT, label="whale alert"
+        )
 
     def _extract_new_whale_buys(
         self, payload: Optional[Dict[str, Any]], *, last_seen: Optional[str]
@@ -248,41 +268,19 @@ class WCOWhaleAlert:
         return wei / Decimal("1000000000000000000")
 
     def _load_state(self) -> None:
-        try:
-            raw = self._state_path.read_text(encoding="utf-8")
-        except FileNotFoundError:
-            return
-        except OSError:
-            logger.exception("Failed to read whale alert state from %s", self._state_path)
-            return
-
-        try:
-            data = json.loads(raw)
-        except json.JSONDecodeError:
-            logger.warning("Whale alert state file is invalid JSON: %s", self._state_path)
-            return
-
-        whale = (data or {}).get("whale") or {}
-        last_seen = whale.get("last_seen_key")
+        whale = self._state.get("whale")
+        # The cursor moved to the event store; the state file value is only read once, to migrate it.
+        last_seen = self.events.cursor("whale") or whale.get("last_seen_key")
         if isinstance(last_seen, str) and last_seen:
             self._last_seen_key = last_seen
 
     def _save_state(self) -> None:
-        data: Dict[str, Any] = {}
-        # Preserve other sections if the state file is shared (e.g., buyback).
-        if self._state_path.exists():
-            try:
-                data = json.loads(self._state_path.read_text(encoding="utf-8"))
-            except Exception:
-                data = {}
-
-        data["whale"] = {
-            "last_seen_key": self._last_seen_key,
-            "router": self.settings.whale_router_address,
-            "channel": self.settings.whale_alert_channel_id,
-        }
-        try:
-            self._state_path.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
-        except OSError:
-            logger.exception("Failed to write whale alert state to %s", self._state_path)
+        self.events.set_cursor("whale", self._last_seen_key)
+        self._state.update(
+            "whale",
+            {
+                "router": self.settings.whale_router_address,
+                "channel": self.settings.whale_alert_channel_id,
+            },
+        )
 
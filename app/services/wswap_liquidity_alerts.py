@@ -12,20 +12,34 @@ WWCO: 0xEdB8008031141024d50cA2839A607B2f82C1c045
 """
 
 import asyncio
-import json
 import logging
+import time
 from dataclasses import dataclass
 from decimal import Decimal, InvalidOperation
 from enum import Enum
-from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
 
-from telegram import Bot, ChatMember
-from telegram.error import TelegramError
+from telegram import Bot, Message
 
 from app.clients.wchain import WChainClient
 from app.config import Settings
-from app.utils import escape_markdown_v2, format_token_amount, format_usd
+from app.services.auto_delete import AutoDeleteQueue
+from app.services.chat_admins import ChatAdminDirectory
+from app.services.delivery_journal import DeliveryJournal
+from app.services.digest import AlertCoalescer
+from app.services.event_store import EventStore, StoredEvent, block_number, wco_to_wei
+from app.services.outbound import OutboundMessageQueue, Priority
+from app.services.pair_registry import PairInfo, PairRegistry, parse_pair_created
+from app.utils import (
+    BoundedDedupeSet,
+    LatencyStats,
+    escape_markdown_v2,
+    format_token_amount,
+    format_usd,
+    gather_limited,
+)
+from app.utils.hash_ring import HashRing
+from app.utils.state_store import get_state_store
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +47,6 @@ logger = logging.getLogger(__name__)
 ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 
 # Event topic signatures (keccak256 of event signature)
-TOPIC_PAIR_CREATED = "0x0d3648bd0f6ba80134a33ba9275ac585d9d315f0ad8355cddefde31afa28d0e9"
 TOPIC_MINT = "0x4c209b5fc8ad50758f13e2e1088ba56a560dff690a1c6fef26394f4c03821c4f"
 TOPIC_BURN = "0xdccd412f0b1252819cb1fd330b93224ca42612892bb3f4f789976e6d81936496"
 TOPIC_SWAP = "0xd78ad95fa46c994b6551d0da85fc275fe613ce37657fb8d5e3d130840159d822"
@@ -46,37 +59,6 @@ class LiquidityEventType(Enum):
     NEW_PAIR = "new_pair"
 
 
-@dataclass(frozen=True)
-class PairInfo:
-    """Metadata for a W-Swap pair."""
-
-    address: str
-    token0_address: str
-    token1_address: str
-    token0_symbol: str
-    token1_symbol: str
-    token0_decimals: int
-    token1_decimals: int
-    has_wco: bool  # True if one of the tokens is WWCO
-
-    @property
-    def name(self) -> str:
-        return f"{self.token0_symbol}/{self.token1_symbol}"
-
-    @property
-    def wco_position(self) -> Optional[int]:
-        """Returns 0 or 1 indicating which token is WCO, or None if neither."""
-        if not self.has_wco:
-            return None
-        # WWCO address (lowercase for comparison)
-        wwco = "0xedb8008031141024d50ca2839a607b2f82c1c045"
-        if self.token0_address.lower() == wwco:
-            return 0
-        if self.token1_address.lower() == wwco:
-            return 1
-        return None
-
-
 @dataclass(frozen=True)
 class LiquidityEvent:
     """Represents a liquidity event to alert on."""
@@ -107,118 +89,70 @@ class WSwapLiquidityAlertService:
     - Filters by minimum USD value
     """
 
-    def __init__(self, settings: Settings, wchain: WChainClient):
+    def __init__(
+        self,
+        settings: Settings,
+        wchain: WChainClient,
+        admins: Optional[ChatAdminDirectory] = None,
+        outbound: Optional[OutboundMessageQueue] = None,
+        deletions: Optional[AutoDeleteQueue] = None,
+        events: Optional[EventStore] = None,
+        journal: Optional[DeliveryJournal] = None,
+    ):
         self.settings = settings
         self.wchain = wchain
+        self.admins = admins or ChatAdminDirectory(settings)
+        self.outbound = outbound or OutboundMessageQueue(settings)
+        self.deletions = deletions or AutoDeleteQueue(settings)
+        self.events = events or EventStore(settings)
+        self.journal = journal or DeliveryJournal(settings)
         self._lock = asyncio.Lock()
 
-        self._state_path = Path(self.settings.wswap_liquidity_alert_state_path)
-        self._processed_event_keys: Set[str] = set()
+        self._state = get_state_store(self.settings.wswap_liquidity_alert_state_path, self.settings.state_flush_seconds)
+        # Keys kept in memory and in the ring file; changing it resizes the file on the next start.
+        self._max_processed_cache = 2000
+        self._processed_event_keys = BoundedDedupeSet(
+            self._max_processed_cache,
+            settings.dedupe_bloom_capacity,
+            settings.dedupe_bloom_error_rate,
+            ring=HashRing(settings.wswap_liquidity_processed_ring_path, self._max_processed_cache),
+        )
         self._last_seen_factory_log: Optional[str] = None
         self._last_seen_by_pair: Dict[str, str] = {}
-        self._max_processed_cache = 2000
+        # Pre-existing pairs whose cursor could not be seeded yet; they are not polled until it is.
+        self._unseeded_pairs: Set[str] = set()
         self._alerts_enabled: bool = True
-
-        # Cache of discovered pairs: address -> PairInfo
-        self._pairs_cache: Dict[str, PairInfo] = {}
-        self._pairs_last_refresh: float = 0
-        self._pairs_refresh_interval = 300  # Refresh every 5 minutes
-
-        # Store job queue reference for auto-delete scheduling
-        self._job_queue = None
+        self.cycle_time = LatencyStats()
+        self.last_cycle_seconds = 0.0
+        self.last_pair_count = 0
+        self.poll_failures = 0
+
+        # Every pair the factory has created, backfilled once and then followed incrementally
+        self.pairs = PairRegistry(settings, wchain)
+
+        self._digest: AlertCoalescer[LiquidityEvent] = AlertCoalescer(
+            settings.wswap_liquidity_digest_window_seconds,
+            settings.wswap_liquidity_digest_min_events,
+            self._render_digest,
+            self._send_to_channel,
+        )
 
         self._load_state()
 
-    async def discover_pairs(self, force: bool = False) -> List[PairInfo]:
+    async def discover_pairs(self) -> List[PairInfo]:
         """
-        Discover all WCO pairs from the factory contract.
+        Catch the pair registry up with the factory's new PairCreated logs.
         Returns list of pairs that contain WWCO.
         """
-        import time
-
-        current_time = time.time()
-        if not force and self._pairs_cache and (current_time - self._pairs_last_refresh) < self._pairs_refresh_interval:
-            return list(self._pairs_cache.values())
-
-        factory_addr = self.settings.wswap_factory_address
-        wwco_addr_lower = self.settings.wwco_token_address.lower()
-
-        # Fetch PairCreated events from factory logs
-        payload = await self.wchain.get_address_logs(factory_addr, page_size=100)
-        items = (payload or {}).get("items") or []
-
-        discovered_pairs: Dict[str, PairInfo] = {}
-
-        for item in items:
-            topics = item.get("topics") or []
-            if not topics or topics[0] != TOPIC_PAIR_CREATED:
-                continue
-
-            decoded = item.get("decoded") or {}
-            params = decoded.get("parameters") or []
-            if len(params) < 3:
-                continue
-
-            # Extract pair info from PairCreated event
-            token0_addr = None
-            token1_addr = None
-            pair_addr = None
-
-            for param in params:
-                name = param.get("name", "")
-                value = param.get("value", "")
-                if name == "token0":
-                    token0_addr = value
-                elif name == "token1":
-                    token1_addr = value
-                elif name == "pair":
-                    pair_addr = value
-
-            if not all([token0_addr, token1_addr, pair_addr]):
-                continue
-
-            pair_addr_lower = pair_addr.lower()
-            if pair_addr_lower in discovered_pairs:
-                continue
-
-            # Check if this pair contains WWCO
-            has_wco = (
-                token0_addr.lower() == wwco_addr_lower
-                or token1_addr.lower() == wwco_addr_lower
-            )
-
-            # Fetch token info for both tokens
-            token0_info = await self.wchain.get_token_info(token0_addr)
-            token1_info = await self.wchain.get_token_info(token1_addr)
-
-            token0_symbol = (token0_info or {}).get("symbol", token0_addr[:8])
-            token1_symbol = (token1_info or {}).get("symbol", token1_addr[:8])
-            token0_decimals = int((token0_info or {}).get("decimals", 18))
-            token1_decimals = int((token1_info or {}).get("decimals", 18))
-
-            pair_info = PairInfo(
-                address=pair_addr,
-                token0_address=token0_addr,
-                token1_address=token1_addr,
-                token0_symbol=token0_symbol,
-                token1_symbol=token1_symbol,
-                token0_decimals=token0_decimals,
-                token1_decimals=token1_decimals,
-                has_wco=has_wco,
-            )
-            discovered_pairs[pair_addr_lower] = pair_info
-
-        self._pairs_cache = discovered_pairs
-        self._pairs_last_refresh = current_time
-
-        wco_pairs = [p for p in discovered_pairs.values() if p.has_wco]
-        logger.info(
-            "Discovered %d total pairs, %d with WCO.",
-            len(discovered_pairs),
-            len(wco_pairs),
-        )
-
-        return wco_pairs
+        backfilling = not self.pairs.backfilled
+        added = await self.pairs.sync()
+        # Pairs found by the backfill existed before the watcher started: start them at their
+        # latest log. Pairs created since start without a cursor, so their first logs alert.
+        historic = [pair for pair in added if pair.has_wco] if backfilling else []
+        async with self._lock:
+            historic += [pair for pair in self.pairs.wco_pairs() if pair.address.lower() in self._unseeded_pairs]
+        await self._seed_pair_cursors(historic)
+        return self.pairs.wco_pairs()
 
     async def ensure_initialized(self) -> None:
         """
@@ -232,7 +166,7 @@ class WSwapLiquidityAlertService:
             return
 
         # Discover pairs first
-        wco_pairs = await self.discover_pairs(force=True)
+        wco_pairs = await self.discover_pairs()
 
         # Initialize last_seen for factory
         async with self._lock:
@@ -253,31 +187,44 @@ class WSwapLiquidityAlertService:
                         self._save_state()
 
         # Initialize last_seen for each WCO pair
-        for pair in wco_pairs:
-            pair_addr_lower = pair.address.lower()
-            async with self._lock:
-                if pair_addr_lower in self._last_seen_by_pair:
-                    continue
-
-            payload = await self.wchain.get_address_logs(pair.address, page_size=1)
-            items = (payload or {}).get("items") or []
-            if items:
-                latest_key = self._unique_key_from_log(items[0])
-                if latest_key:
-                    async with self._lock:
-                        if pair_addr_lower not in self._last_seen_by_pair:
-                            self._last_seen_by_pair[pair_addr_lower] = latest_key
-                            self._save_state()
+        await self._seed_pair_cursors(wco_pairs)
 
         logger.info(
             "W-Swap liquidity alerts initialized with %d WCO pairs.",
             len(wco_pairs),
         )
 
+    async def _seed_pair_cursors(self, pairs: Sequence[PairInfo]) -> None:
+        """Point each pair without a cursor at its latest log, so its history is never alerted."""
+        async with self._lock:
+            pending = [pair for pair in pairs if pair.address.lower() not in self._last_seen_by_pair]
+            self._unseeded_pairs.update(pair.address.lower() for pair in pending)
+        if not pending:
+            return
+
+        results = await gather_limited(
+            self.settings.pool_poll_concurrency,
+            [self.wchain.get_address_logs(pair.address, page_size=1) for pair in pending],
+        )
+        async with self._lock:
+            for pair, payload in zip(pending, results):
+                if isinstance(payload, BaseException) or payload is None:
+                    # Left unseeded (and unpolled) until a later poll seeds it.
+                    continue
+                pair_addr_lower = pair.address.lower()
+                items = payload.get("items") or []
+                latest_key = self._unique_key_from_log(items[0]) if items else None
+                if latest_key and pair_addr_lower not in self._last_seen_by_pair:
+                    self._last_seen_by_pair[pair_addr_lower] = latest_key
+                if latest_key or not items:
+                    # A pair with no logs yet has no history to skip.
+                    self._unseeded_pairs.discard(pair_addr_lower)
+            self._save_state()
+        if self._unseeded_pairs:
+            logger.warning("%d liquidity pair cursor(s) not seeded yet; retrying next poll.", len(self._unseeded_pairs))
+
     async def job_callback(self, context) -> None:
         """Telegram job callback for periodic polling."""
-        if context.job_queue and not self._job_queue:
-            self._job_queue = context.job_queue
         await self.poll_and_alert(context.bot)
 
     @property
@@ -287,15 +234,7 @@ class WSwapLiquidityAlertService:
 
     async def is_admin(self, bot: Bot, chat_id: str | int, user_id: int) -> bool:
         """Check if a user is an admin in the specified chat/channel."""
-        try:
-            member = await bot.get_chat_member(chat_id=chat_id, user_id=user_id)
-            return member.status in (
-                ChatMember.ADMINISTRATOR,
-                ChatMember.OWNER,
-            )
-        except TelegramError as e:
-            logger.warning("Failed to check admin status: %s", e)
-            return False
+        return await self.admins.is_admin(bot, chat_id, user_id)
 
     async def toggle_alerts(
         self, bot: Bot, user_id: int, enable: Optional[bool] = None
@@ -339,18 +278,61 @@ class WSwapLiquidityAlertService:
             logger.warning("WSWAP_LIQUIDITY_ALERT_CHANNEL_ID not configured, skipping.")
             return
 
+        started = time.perf_counter()
+        await self._refresh_dedupe_filter()
+
+        # Alerts journaled but never sent (crash, failed send) go out before anything new
+        self._resend_unsent(bot)
+
         # Get current WCO price for USD calculations
         wco_price = await self._get_wco_price()
 
         # Refresh pairs periodically
         wco_pairs = await self.discover_pairs()
+        async with self._lock:
+            wco_pairs = [pair for pair in wco_pairs if pair.address.lower() not in self._unseeded_pairs]
 
         # Poll factory for new pair creation events
         await self._poll_factory_events(bot, channel, wco_price)
 
-        # Poll each WCO pair for liquidity events
-        for pair in wco_pairs:
-            await self._poll_pair_liquidity(bot, channel, pair, wco_price)
+        # Poll the WCO pairs side by side; each pair's events are still handled in order
+        results = await gather_limited(
+            self.settings.pool_poll_concurrency,
+            [self._poll_pair_liquidity(bot, channel, pair, wco_price) for pair in wco_pairs],
+        )
+        for pair, result in zip(wco_pairs, results):
+            if isinstance(result, Exception):
+                self.poll_failures += 1
+                logger.error("Liquidity poll of %s failed", pair.name, exc_info=result)
+        await self._digest.release(channel)
+
+        self.last_pair_count = len(wco_pairs)
+        self._record_cycle(time.perf_counter() - started)
+
+    def _record_cycle(self, seconds: float) -> None:
+        self.cycle_time.record(seconds)
+        self.last_cycle_seconds = seconds
+        if seconds > self.settings.wswap_liquidity_poll_seconds:
+            logger.warning(
+                "Liquidity poll took %.1fs, longer than its %ss interval (%d pairs).",
+                seconds,
+                self.settings.wswap_liquidity_poll_seconds,
+                self.last_pair_count,
+            )
+        else:
+            logger.debug("Liquidity poll took %.2fs (%d pairs).", seconds, self.last_pair_count)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "pairs": self.last_pair_count,
+            "last_cycle_ms": self.last_cycle_seconds * 1000,
+            "cycle": self.cycle_time.snapshot(),
+            "poll_failures": self.poll_failures,
+        }
+
+    def close(self) -> None:
+        """Flush and unmap the processed-hash ring; called on shutdown, after polling has stopped."""
+        self._processed_event_keys.close()
 
     async def _poll_factory_events(
         self,
@@ -386,73 +368,22 @@ class WSwapLiquidityAlertService:
 
         newest_key = self._unique_key_from_log(new_items[0])
         new_items.reverse()  # oldest-first
-        alerts_sent = 0
-
-        wwco_addr_lower = self.settings.wwco_token_address.lower()
+        new_pairs: List[Tuple[LiquidityEvent, str]] = []
 
         for item in new_items:
-            topics = item.get("topics") or []
-            if not topics or topics[0] != TOPIC_PAIR_CREATED:
-                continue
-
-            decoded = item.get("decoded") or {}
-            params = decoded.get("parameters") or []
-
-            token0_addr = None
-            token1_addr = None
-            pair_addr = None
-
-            for param in params:
-                name = param.get("name", "")
-                value = param.get("value", "")
-                if name == "token0":
-                    token0_addr = value
-                elif name == "token1":
-                    token1_addr = value
-                elif name == "pair":
-                    pair_addr = value
-
-            if not all([token0_addr, token1_addr, pair_addr]):
+            if parse_pair_created(item) is None:
                 continue
 
-            # Check if this involves WCO
-            has_wco = (
-                token0_addr.lower() == wwco_addr_lower
-                or token1_addr.lower() == wwco_addr_lower
-            )
-
-            if not has_wco:
+            # Usually registered already by discover_pairs; a pair created since is added here
+            pair_info = await self.pairs.add_from_log(item)
+            if pair_info is None or not pair_info.has_wco:
                 continue
 
             tx_hash = item.get("transaction_hash", "")
-            event_key = self._unique_key_from_log(item)
+            event_key = self._processed_key(item)
 
-            async with self._lock:
-                if event_key in self._processed_event_keys:
-                    continue
-
-            # Fetch token info
-            token0_info = await self.wchain.get_token_info(token0_addr)
-            token1_info = await self.wchain.get_token_info(token1_addr)
-
-            token0_symbol = (token0_info or {}).get("symbol", token0_addr[:8])
-            token1_symbol = (token1_info or {}).get("symbol", token1_addr[:8])
-            token0_decimals = int((token0_info or {}).get("decimals", 18))
-            token1_decimals = int((token1_info or {}).get("decimals", 18))
-
-            pair_info = PairInfo(
-                address=pair_addr,
-                token0_address=token0_addr,
-                token1_address=token1_addr,
-                token0_symbol=token0_symbol,
-                token1_symbol=token1_symbol,
-                token0_decimals=token0_decimals,
-                token1_decimals=token1_decimals,
-                has_wco=has_wco,
-            )
-
-            # Add to cache
-            self._pairs_cache[pair_addr.lower()] = pair_info
+            if await self._is_processed(event_key):
+                continue
 
             # Create and send alert
             event = LiquidityEvent(
@@ -472,20 +403,26 @@ class WSwapLiquidityAlertService:
             )
 
             text = self._render_alert(event, wco_price)
-            await self._send_to_channel(bot, channel, text)
-            alerts_sent += 1
+            self.journal.detect("wswap_liquidity:factory", self._delivery_id(event), {"chat": channel, "text": text})
+            new_pairs.append((event, text))
+            self.events.record([self._stored_event(event, item)])
 
             async with self._lock:
                 self._mark_processed(event_key or tx_hash)
 
-        if alerts_sent > 0:
-            logger.info("Sent %d new pair alert(s) to channel %s.", alerts_sent, channel)
-
         async with self._lock:
             if newest_key:
                 self._last_seen_factory_log = newest_key
+                self.journal.commit_cursor("wswap_liquidity:factory", newest_key)
             self._save_state()
 
+        # Sent only once the detections and the cursor are durable.
+        await self.journal.sync()
+        for event, text in new_pairs:
+            await self._send_to_channel(bot, channel, text, [event])
+        if new_pairs:
+            logger.info("Sent %d new pair alert(s) to channel %s.", len(new_pairs), channel)
+
     async def _poll_pair_liquidity(
         self,
         bot: Bot,
@@ -608,11 +545,10 @@ class WSwapLiquidityAlertService:
                 continue
 
             tx_hash = item.get("transaction_hash", "")
-            event_key = self._unique_key_from_log(item)
+            event_key = self._processed_key(item)
 
-            async with self._lock:
-                if event_key in self._processed_event_keys:
-                    continue
+            if await self._is_processed(event_key):
+                continue
 
             event = LiquidityEvent(
                 unique_key=event_key or tx_hash,
@@ -631,25 +567,33 @@ class WSwapLiquidityAlertService:
             )
 
             text = self._render_alert(event, wco_price)
-            await self._send_to_channel(bot, channel, text)
+            self.journal.detect(
+                f"wswap_liquidity:pair:{pair_addr_lower}", self._delivery_id(event), {"chat": channel, "text": text}
+            )
+            self._digest.add(bot, channel, event, text)
+            self.events.record([self._stored_event(event, item)])
             alerts_sent += 1
 
             async with self._lock:
                 self._mark_processed(event_key or tx_hash)
 
+        async with self._lock:
+            if newest_key:
+                self._last_seen_by_pair[pair_addr_lower] = newest_key
+                self.journal.commit_cursor(f"wswap_liquidity:pair:{pair_addr_lower}", newest_key)
+            self._save_state()
+
+        # The digest is released, and so sent, only once these are durable. Alerts still
+        # waiting in a digest window at a restart are resent from the journal.
+        await self.journal.sync()
         if alerts_sent > 0:
             logger.info(
-                "Sent %d liquidity alert(s) for %s to channel %s.",
+                "Queued %d liquidity alert(s) for %s for channel %s.",
                 alerts_sent,
                 pair.name,
                 channel,
             )
 
-        async with self._lock:
-            if newest_key:
-                self._last_seen_by_pair[pair_addr_lower] = newest_key
-            self._save_state()
-
     async def _get_wco_price(self) -> Optional[Decimal]:
         """Fetch current WCO price."""
         try:
@@ -660,6 +604,31 @@ class WSwapLiquidityAlertService:
             logger.warning("Failed to fetch WCO price: %s", exc)
         return None
 
+    def _render_digest(self, events: List[LiquidityEvent]) -> str:
+        """Render a burst of liquidity alerts as one MarkdownV2 summary."""
+        lines = [f"📊 *W\\-Swap liquidity: {len(events)} events*", ""]
+        for event_type, emoji, singular, plural in (
+            (LiquidityEventType.LIQUIDITY_ADDED, "💦", "add", "adds"),
+            (LiquidityEventType.LIQUIDITY_REMOVED, "🔥", "removal", "removals"),
+        ):
+            group = [event for event in events if event.event_type == event_type]
+            if not group:
+                continue
+            total_usd = sum((event.usd_value for event in group if event.usd_value is not None), Decimal(0))
+            total_wco = sum((event.wco_amount for event in group if event.wco_amount is not None), Decimal(0))
+            pairs = sorted({event.pair.name for event in group})
+            summary = (
+                f"{len(group)} {singular if len(group) == 1 else plural} totaling ~{format_usd(total_usd)}"
+                f" ({format_token_amount(total_wco)} WCO) on {', '.join(pairs)}"
+            )
+            lines.append(f"{emoji} {escape_markdown_v2(summary)}")
+
+        largest = max(events, key=lambda event: event.usd_value or Decimal(0))
+        largest_display = escape_markdown_v2(f"~{format_usd(largest.usd_value or Decimal(0))} on {largest.pair.name}")
+        lines.append("")
+        lines.append(f"🏆 *Largest:* {largest_display} \\([View Tx](https://scan.w-chain.com/tx/{largest.tx_hash})\\)")
+        return "\n".join(lines)
+
     def _render_alert(self, event: LiquidityEvent, wco_price: Optional[Decimal]) -> str:
         """Render alert message in Telegram MarkdownV2 format."""
         pair_name = escape_markdown_v2(event.pair.name)
@@ -732,9 +701,23 @@ class WSwapLiquidityAlertService:
             f"🔗 [View Tx]({explorer_link})"
         )
 
-    async def _send_to_channel(self, bot: Bot, channel: str, text: str) -> None:
-        """Send alert message to Telegram channel with auto-delete."""
-        try:
+    async def _send_to_channel(
+        self, bot: Bot, channel: str, text: str, events: Sequence[LiquidityEvent] = ()
+    ) -> None:
+        """Queue an alert for the channel; ``events`` are the journaled alerts it delivers."""
+        self._submit(bot, channel, text, [self._delivery_id(event) for event in events])
+
+    def _resend_unsent(self, bot: Bot) -> None:
+        pending = self.journal.take_pending("wswap_liquidity:")
+        for delivery in pending:
+            self._submit(bot, str(delivery.payload.get("chat")), str(delivery.payload.get("text")), [delivery.id])
+        if pending:
+            logger.info("Resending %d unsent liquidity alert(s) from the journal.", len(pending))
+
+    def _submit(self, bot: Bot, channel: str, text: str, delivery_ids: List[str]) -> None:
+        """Queue a message; auto-delete is scheduled and the journal updated once it is sent."""
+
+        async def deliver() -> Message:
             message = await bot.send_message(
                 chat_id=channel,
                 text=text,
@@ -744,44 +727,75 @@ class WSwapLiquidityAlertService:
 
             # Schedule auto-delete if configured
             auto_delete_seconds = self.settings.wswap_liquidity_auto_delete_seconds
-            if auto_delete_seconds > 0 and self._job_queue:
-                self._job_queue.run_once(
-                    self._delete_message_callback,
-                    when=auto_delete_seconds,
-                    data={"chat_id": channel, "message_id": message.message_id},
-                    name=f"delete_liq_msg_{message.message_id}",
-                )
-                logger.debug(
-                    "Scheduled auto-delete for liquidity message %s in %d seconds.",
-                    message.message_id,
-                    auto_delete_seconds,
-                )
-        except Exception:
-            logger.exception("Failed to send liquidity alert to channel=%s", channel)
+            if auto_delete_seconds > 0:
+                self.deletions.schedule(channel, message.message_id, auto_delete_seconds)
+            return message
 
-    async def _delete_message_callback(self, context) -> None:
-        """Callback to delete a message after the auto-delete delay."""
-        data = context.job.data
-        chat_id = data.get("chat_id")
-        message_id = data.get("message_id")
+        delivery = self.outbound.submit(channel, deliver, Priority.ALERT, label="liquidity alert")
+        if delivery_ids:
+            self.journal.track(delivery, delivery_ids)
 
-        if not chat_id or not message_id:
+    async def _refresh_dedupe_filter(self) -> None:
+        """(Re)build the Bloom tier from the event store at startup and whenever it has filled up."""
+        if not self._processed_event_keys.needs_bloom_rebuild:
             return
+        # Held across the query so no key is marked processed between the read and the swap.
+        async with self._lock:
+            try:
+                keys = await self.events.processed_keys("wswap_liquidity")
+            except Exception:
+                # Without a filter every cache miss goes to the database; try again next poll.
+                logger.exception("Failed to load processed keys for the dedupe filter")
+                return
+            self._processed_event_keys.rebuild_bloom(keys)
+        logger.info("Rebuilt the wswap_liquidity dedupe filter from %d stored key(s).", len(keys))
 
-        try:
-            await context.bot.delete_message(chat_id=chat_id, message_id=message_id)
-            logger.debug("Auto-deleted liquidity message %s from channel %s.", message_id, chat_id)
-        except TelegramError as e:
-            logger.debug("Could not delete message %s: %s", message_id, e)
+    async def _is_processed(self, key: Optional[str]) -> bool:
+        """Check the in-memory cache, then the event store for keys that have aged out of it."""
+        if not key:
+            return False
+        async with self._lock:
+            if key in self._processed_event_keys:
+                return True
+            if not self._processed_event_keys.might_contain(key):
+                # The Bloom tier holds every key in the event store and has never seen this one.
+                return False
+        return await self.events.is_processed("wswap_liquidity", key)
+
+    async def recent_events(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """The newest liquidity alerts from the event store."""
+        return await self.events.recent_events(source="wswap_liquidity", limit=limit)
+
+    @staticmethod
+    def _stored_event(event: LiquidityEvent, item: Dict[str, Any]) -> StoredEvent:
+        return StoredEvent(
+            kind=event.event_type.value,
+            source="wswap_liquidity",
+            tx_hash=event.tx_hash,
+            from_address=event.provider_address,
+            to_address=event.pair.address,
+            amount_wei=wco_to_wei(event.wco_amount),
+            usd=float(event.usd_value) if event.usd_value is not None else None,
+            block=block_number(item),
+        )
 
     def _mark_processed(self, key: str) -> None:
         """Mark an event as processed (must be called within lock)."""
         self._processed_event_keys.add(key)
-        if len(self._processed_event_keys) > self._max_processed_cache:
-            excess = len(self._processed_event_keys) - self._max_processed_cache
-            to_remove = list(self._processed_event_keys)[:excess]
-            for k in to_remove:
-                self._processed_event_keys.discard(k)
+        self.events.mark_processed("wswap_liquidity", [key])
+
+    @staticmethod
+    def _delivery_id(event: LiquidityEvent) -> str:
+        return f"wswap_liquidity:{event.unique_key}"
+
+    @staticmethod
+    def _processed_key(item: Dict[str, Any]) -> Optional[str]:
+        """Dedupe key for a log: "tx_hash:log_index", which the processed-hash ring stores in 36 bytes."""
+        tx_hash = item.get("transaction_hash")
+        idx = item.get("index")
+        if not tx_hash:
+            return None
+        return f"{tx_hash}:{idx}" if idx is not None else str(tx_hash)
 
     @staticmethod
     def _unique_key_from_log(item: Optional[Dict[str, Any]]) -> Optional[str]:
@@ -797,31 +811,25 @@ class WSwapLiquidityAlertService:
 
     def _load_state(self) -> None:
         """Load persisted state from file."""
-        try:
-            raw = self._state_path.read_text(encoding="utf-8")
-        except FileNotFoundError:
-            return
-        except OSError:
-            logger.exception("Failed to read liquidity alert state from %s", self._state_path)
-            return
-
-        try:
-            data = json.loads(raw)
-        except json.JSONDecodeError:
-            logger.warning("Liquidity alert state file is invalid JSON: %s", self._state_path)
-            return
-
-        section = (data or {}).get("wswap_liquidity") or {}
+        section = self._state.get("wswap_liquidity")
 
+        # Cursors moved to the event store; the state file values are only read once, to migrate them.
         # Load last seen by pair
-        last_seen_map = section.get("last_seen_by_pair") or {}
+        last_seen_map = self.events.cursors("wswap_liquidity:pair:") or section.get("last_seen_by_pair") or {}
         if isinstance(last_seen_map, dict):
             for k, v in last_seen_map.items():
                 if isinstance(k, str) and isinstance(v, str) and k and v:
                     self._last_seen_by_pair[k.lower()] = v
+        # Journal cursors are fsynced before anything is sent, so they are the most recent.
+        for k, v in self.journal.cursors("wswap_liquidity:pair:").items():
+            self._last_seen_by_pair[k.lower()] = v
 
         # Load last seen factory
-        last_seen_factory = section.get("last_seen_factory_log")
+        last_seen_factory = (
+            self.journal.cursor("wswap_liquidity:factory")
+            or self.events.cursor("wswap_liquidity:factory")
+            or section.get("last_seen_factory_log")
+        )
         if isinstance(last_seen_factory, str) and last_seen_factory:
             self._last_seen_factory_log = last_seen_factory
 
@@ -831,35 +839,22 @@ class WSwapLiquidityAlertService:
             self._alerts_enabled = alerts_enabled
 
         # Load processed event keys
-        processed = section.get("processed_event_keys") or []
-        if isinstance(processed, list):
-            for k in processed[-self._max_processed_cache:]:
-                if isinstance(k, str) and k:
-                    self._processed_event_keys.add(k)
+        self._processed_event_keys.load(section.get("processed_event_keys"))
 
     def _save_state(self) -> None:
         """Persist state to file."""
-        data: Dict[str, Any] = {}
-        if self._state_path.exists():
-            try:
-                data = json.loads(self._state_path.read_text(encoding="utf-8"))
-            except Exception:
-                data = {}
-
-        data["wswap_liquidity"] = {
-            "last_seen_by_pair": dict(self._last_seen_by_pair),
-            "last_seen_factory_log": self._last_seen_factory_log,
-            "alerts_enabled": self._alerts_enabled,
-            "processed_event_keys": list(self._processed_event_keys)[-self._max_processed_cache:],
-            "channel": self.settings.wswap_liquidity_alert_channel_id,
-            "factory": self.settings.wswap_factory_address,
-        }
-        try:
-            self._state_path.write_text(
-                json.dumps(data, indent=2, sort_keys=True), encoding="utf-8"
-            )
-        except OSError:
-            logger.exception("Failed to write liquidity alert state to %s", self._state_path)
+        for pair_addr, key in self._last_seen_by_pair.items():
+            self.events.set_cursor(f"wswap_liquidity:pair:{pair_addr}", key)
+        self.events.set_cursor("wswap_liquidity:factory", self._last_seen_factory_log)
+        self._state.update(
+            "wswap_liquidity",
+            {
+                "alerts_enabled": self._alerts_enabled,
+                "processed_event_keys": self._processed_event_keys.to_dict(),
+                "channel": self.settings.wswap_liquidity_alert_channel_id,
+                "factory": self.settings.wswap_factory_address,
+            },
+        )
 
     async def get_all_pairs_summary(self) -> str:
         """Get a summary of all discovered WCO pairs for display."""
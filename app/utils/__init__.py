@@ -1,6 +1,8 @@
 """Utility helpers for caching and formatting outputs."""
 
-from .cache import TTLCache
+from .cache import TTLCache, refresh_ahead
+from .concurrency import gather_limited
+from .dedupe import BloomFilter, BoundedDedupeSet
 from .formatters import (
     escape_markdown_v2,
     format_percent,
@@ -8,16 +10,55 @@ from .formatters import (
     format_usd,
     humanize_number,
 )
-from .images import get_resized_brand_image, resize_image
+from .hash_ring import HashRing
+from .images import (
+    BRAND_IMAGE_PATH,
+    BRAND_IMAGE_SCALE,
+    EncodedImage,
+    EncodingPolicy,
+    ImageAssetCache,
+    get_brand_image,
+    get_brand_image_async,
+    get_resized_brand_image,
+    image_assets,
+    resize_image,
+    warm_brand_image,
+)
+from .metrics import LatencyStats
+from .response_cache import CachedResponse, ResponseCache
+from .state_store import StateStore, flush_state_stores, get_state_store, state_store_metrics
+from .uploads import PhotoUploadRegistry
 
 __all__ = [
+    "BRAND_IMAGE_PATH",
+    "BRAND_IMAGE_SCALE",
+    "BloomFilter",
+    "BoundedDedupeSet",
+    "CachedResponse",
+    "EncodedImage",
+    "EncodingPolicy",
+    "HashRing",
+    "ImageAssetCache",
+    "LatencyStats",
+    "PhotoUploadRegistry",
+    "ResponseCache",
+    "StateStore",
     "TTLCache",
     "escape_markdown_v2",
     "format_percent",
     "format_token_amount",
+    "flush_state_stores",
     "format_usd",
+    "gather_limited",
+    "get_brand_image",
+    "get_brand_image_async",
     "get_resized_brand_image",
+    "get_state_store",
     "humanize_number",
+    "image_assets",
+    "refresh_ahead",
     "resize_image",
+    "state_store_metrics",
+    "warm_brand_image",
 ]
 
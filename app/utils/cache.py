@@ -1,5 +1,27 @@
+import itertools
 import time
-from typing import Any, Dict, Optional, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Shared across caches so a version never repeats, even after an entry is replaced.
+_VERSION_COUNTER = itertools.count(1)
+
+# (horizon in seconds, first version issued inside the block) of the active ``refresh_ahead``.
+_refresh_horizon: ContextVar[Optional[Tuple[float, int]]] = ContextVar("cache_refresh_horizon", default=None)
+
+
+@contextmanager
+def refresh_ahead(seconds: float) -> Iterator[None]:
+    """
+    Within this block, ``TTLCache.fresh`` misses on entries that expire in the
+    next ``seconds``, unless they were already refetched inside the block.
+    """
+    token = _refresh_horizon.set((seconds, next(_VERSION_COUNTER)))
+    try:
+        yield
+    finally:
+        _refresh_horizon.reset(token)
 
 
 class TTLCache:
@@ -7,6 +29,7 @@ class TTLCache:
 
     def __init__(self):
         self._store: Dict[str, Tuple[float, Any]] = {}
+        self._versions: Dict[str, int] = {}
 
     def get(self, key: str) -> Optional[Any]:
         item = self._store.get(key)
@@ -15,12 +38,35 @@ class TTLCache:
         expires_at, value = item
         if expires_at < time.time():
             self._store.pop(key, None)
+            self._versions.pop(key, None)
+            return None
+        return value
+
+    def fresh(self, key: str) -> Optional[Any]:
+        """
+        Like ``get``, but also misses when the entry expires within the current
+        ``refresh_ahead`` horizon, so the caller refetches it early. The entry
+        itself stays readable through ``get`` until it really expires.
+        """
+        value = self.get(key)
+        refresh = _refresh_horizon.get()
+        if value is None or refresh is None:
+            return value
+        horizon, since_version = refresh
+        if self._store[key][0] - time.time() <= horizon and self._versions[key] < since_version:
             return None
         return value
 
     def set(self, key: str, value: Any, ttl_seconds: int) -> None:
         self._store[key] = (time.time() + ttl_seconds, value)
+        self._versions[key] = next(_VERSION_COUNTER)
+
+    def version(self, key: str) -> Optional[int]:
+        """Return the version of a live entry, or None when it is missing or expired."""
+        if self.get(key) is None:
+            return None
+        return self._versions.get(key)
 
     def clear(self) -> None:
         self._store.clear()
-
+        self._versions.clear()
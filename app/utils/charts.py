@@ -0,0 +1,156 @@
+"""Pillow line-chart rendering for stored price samples.
+
+Rendering is CPU-bound and synchronous; callers are expected to run
+``render_price_chart`` in a worker thread.
+"""
+
+import io
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+from .formatters import format_usd
+from .images import BRAND_IMAGE_PATH, image_assets
+
+logger = logging.getLogger(__name__)
+
+CHART_SIZE = (960, 540)
+_PADDING = (90, 80, 30, 50)  # left, top, right, bottom
+_BACKGROUND = (8, 20, 38)
+_GRID = (40, 62, 92)
+_TEXT = (225, 235, 245)
+_MUTED = (140, 160, 185)
+_UP = (46, 204, 113)
+_DOWN = (231, 76, 60)
+_LOGO_SIZE = 56
+
+
+def _font(size: int) -> ImageFont.ImageFont:
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow < 10.1 only ships the fixed-size bitmap font.
+        return ImageFont.load_default()
+
+
+def _downsample(
+    timestamps: Sequence[float], values: Sequence[float], buckets: int
+) -> Tuple[List[float], List[float]]:
+    """Average samples into at most ``buckets`` evenly spaced time buckets."""
+    if len(values) <= buckets:
+        return list(timestamps), list(values)
+    start, end = timestamps[0], timestamps[-1]
+    span = (end - start) or 1.0
+    sums = [0.0] * buckets
+    counts = [0] * buckets
+    ts_sums = [0.0] * buckets
+    for ts, value in zip(timestamps, values):
+        idx = min(int((ts - start) / span * buckets), buckets - 1)
+        sums[idx] += value
+        ts_sums[idx] += ts
+        counts[idx] += 1
+    out_ts = [ts_sums[i] / counts[i] for i in range(buckets) if counts[i]]
+    out_values = [sums[i] / counts[i] for i in range(buckets) if counts[i]]
+    return out_ts, out_values
+
+
+def _paste_logo(canvas: Image.Image, brand_path: Path) -> None:
+    try:
+        logo_bytes = image_assets.get_bytes(brand_path, max_width=_LOGO_SIZE, max_height=_LOGO_SIZE)
+        with Image.open(io.BytesIO(logo_bytes)) as logo:
+            logo = logo.convert("RGB")
+            mask = Image.new("L", logo.size, 0)
+            ImageDraw.Draw(mask).ellipse((0, 0, logo.size[0] - 1, logo.size[1] - 1), fill=255)
+            canvas.paste(logo, (CHART_SIZE[0] - _PADDING[2] - logo.size[0], 12), mask)
+    except OSError:
+        logger.warning("Brand image unavailable for chart: %s", brand_path)
+
+
+def render_price_chart(
+    timestamps: Sequence[float],
+    values: Sequence[float],
+    *,
+    title: str,
+    brand_path: Optional[Path] = BRAND_IMAGE_PATH,
+) -> bytes:
+    """
+    Render a branded line chart and return it as PNG bytes.
+
+    Args:
+        timestamps: Sample timestamps (unix seconds), oldest first.
+        values: Sample values aligned with ``timestamps``.
+        title: Heading drawn in the top-left corner (e.g. "WCO · 7d").
+        brand_path: Logo drawn in the top-right corner; skipped when None.
+    """
+    if len(values) < 2:
+        raise ValueError("At least two samples are required to draw a chart")
+
+    width, height = CHART_SIZE
+    left, top, right, bottom = _PADDING
+    plot_w = width - left - right
+    plot_h = height - top - bottom
+
+    xs, ys = _downsample(timestamps, values, plot_w)
+    low, high = min(ys), max(ys)
+    if high == low:
+        pad = abs(high) * 0.01 or 1.0
+        low, high = low - pad, high + pad
+    t0, t1 = xs[0], xs[-1]
+    t_span = (t1 - t0) or 1.0
+
+    def to_point(ts: float, value: float) -> Tuple[float, float]:
+        x = left + (ts - t0) / t_span * plot_w
+        y = top + (1 - (value - low) / (high - low)) * plot_h
+        return x, y
+
+    canvas = Image.new("RGB", CHART_SIZE, _BACKGROUND)
+    draw = ImageDraw.Draw(canvas)
+    label_font = _font(14)
+    title_font = _font(26)
+
+    # Horizontal grid with price labels.
+    for step in range(5):
+        value = low + (high - low) * step / 4
+        _, y = to_point(t0, value)
+        draw.line((left, y, width - right, y), fill=_GRID, width=1)
+        draw.text((left - 8, y), format_usd(value), fill=_MUTED, font=label_font, anchor="rm")
+
+    # Time labels.
+    for step in range(5):
+        ts = t0 + t_span * step / 4
+        x, _ = to_point(ts, low)
+        label = datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%d %b %H:%M")
+        anchor = "lm" if step == 0 else "rm" if step == 4 else "mm"
+        draw.text((x, height - bottom + 18), label, fill=_MUTED, font=label_font, anchor=anchor)
+
+    first, last = values[0], values[-1]
+    color = _UP if last >= first else _DOWN
+    points = [to_point(ts, value) for ts, value in zip(xs, ys)]
+
+    # Soft area fill under the line, blended onto the background.
+    overlay = Image.new("RGB", CHART_SIZE, _BACKGROUND)
+    ImageDraw.Draw(overlay).polygon(
+        [(points[0][0], top + plot_h), *points, (points[-1][0], top + plot_h)], fill=color
+    )
+    canvas = Image.blend(canvas, overlay, 0.12)
+    draw = ImageDraw.Draw(canvas)
+    draw.line(points, fill=color, width=3, joint="curve")
+
+    change_pct = (last - first) / abs(first) * 100 if first else 0.0
+    draw.text((left, 22), title, fill=_TEXT, font=title_font)
+    draw.text(
+        (left, 56),
+        f"{format_usd(last)}  ({change_pct:+.2f}%)",
+        fill=color,
+        font=label_font,
+    )
+
+    if brand_path is not None:
+        _paste_logo(canvas, brand_path)
+
+    buffer = io.BytesIO()
+    canvas.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
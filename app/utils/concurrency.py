@@ -0,0 +1,23 @@
+"""Helpers for running independent coroutines side by side."""
+
+import asyncio
+from typing import Awaitable, Iterable, List, TypeVar, Union
+
+T = TypeVar("T")
+
+
+async def gather_limited(limit: int, awaitables: Iterable[Awaitable[T]]) -> List[Union[T, BaseException]]:
+    """
+    Await ``awaitables`` concurrently, at most ``limit`` at a time.
+
+    Results come back in input order. A failure is returned in its slot
+    instead of being raised, so one failing task neither cancels nor hides
+    the others.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(awaitable: Awaitable[T]) -> T:
+        async with semaphore:
+            return await awaitable
+
+    return await asyncio.gather(*(run(awaitable) for awaitable in awaitables), return_exceptions=True)
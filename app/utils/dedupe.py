@@ -0,0 +1,174 @@
+"""Bounded, insertion-ordered dedupe set with an optional Bloom filter tier."""
+
+import hashlib
+import math
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Iterator, Optional, Set, Union
+
+from .hash_ring import HashRing, decode_key, encode_key
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    Sized for ``capacity`` keys at ``error_rate`` false positives. Bit positions
+    come from one BLAKE2b digest split into two 64-bit halves (double hashing).
+    """
+
+    __slots__ = ("capacity", "error_rate", "size", "hashes", "count", "_bits")
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+    def _positions(self, key: str) -> Iterator[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+
+class BoundedDedupeSet:
+    """
+    The ``capacity`` most recently added keys, with O(1) add, lookup and
+    eviction of the oldest key (a ring of keys plus a hash index).
+
+    With ``bloom_capacity`` > 0, a Bloom filter tier answers "was this key
+    ever added?" for the keys an authoritative store (a database) holds
+    beyond the ring. The filter is never persisted: ``rebuild_bloom`` fills it
+    from every key in that store, sized for at least ``bloom_capacity`` or
+    twice as many keys. Every later ``add`` goes into it too, so a False from
+    ``might_contain`` is exact and the store lookup can be skipped. Until the
+    first rebuild, ``might_contain`` is always True. Once the filter holds more
+    keys than it was sized for, ``needs_bloom_rebuild`` asks for a larger one;
+    its negatives stay exact meanwhile, only false positives grow.
+
+    Given a ``HashRing``, the keys live in that memory-mapped file instead of
+    in ``to_dict`` output. The index then holds the 36-byte records, built
+    straight from the mapping at startup.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        bloom_capacity: int = 0,
+        bloom_error_rate: float = 0.001,
+        ring: Optional[HashRing] = None,
+    ):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = ring.capacity if ring is not None else capacity
+        self.bloom_capacity = max(0, bloom_capacity)
+        self.bloom_error_rate = bloom_error_rate
+        self._ring = ring
+        self._order: Deque[str] = deque()
+        self._index: Set[Union[str, bytes]] = set(ring.records()) if ring is not None else set()
+        # Built by rebuild_bloom; None until then or with the tier disabled.
+        self._bloom: Optional[BloomFilter] = None
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: object) -> bool:
+        if self._ring is not None:
+            return isinstance(key, str) and encode_key(key) in self._index
+        return key in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        """Oldest first. Keys a ring stored as digests are skipped."""
+        if self._ring is None:
+            return iter(self._order)
+        return (key for key in map(decode_key, self._ring.records()) if key is not None)
+
+    def add(self, key: str) -> None:
+        if self._ring is not None:
+            record = encode_key(key)
+            if record in self._index:
+                return
+            self._index.add(record)
+            evicted = self._ring.append(record)
+            if evicted is not None:
+                self._index.discard(evicted)
+        else:
+            if key in self._index:
+                return
+            self._order.append(key)
+            self._index.add(key)
+            if len(self._order) > self.capacity:
+                self._index.discard(self._order.popleft())
+        if self._bloom is not None:
+            self._bloom.add(key)
+
+    def update(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.add(key)
+
+    def might_contain(self, key: str) -> bool:
+        """False only if ``key`` was certainly never added; always True until the filter is built."""
+        if key in self or self._bloom is None:
+            return True
+        return key in self._bloom
+
+    @property
+    def needs_bloom_rebuild(self) -> bool:
+        return self.bloom_capacity > 0 and (self._bloom is None or self._bloom.full)
+
+    def rebuild_bloom(self, keys: Iterable[str]) -> None:
+        """Replace the filter with one holding ``keys`` (every key the authoritative store has) and the ring."""
+        if not self.bloom_capacity:
+            return
+        keys = [key for key in keys if key]
+        recent = list(self)
+        bloom = BloomFilter(max(self.bloom_capacity, 2 * (len(keys) + len(recent))), self.bloom_error_rate)
+        for key in (*keys, *recent):
+            bloom.add(key)
+        self._bloom = bloom
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {} if self._ring is not None else {"keys": list(self._order)}
+
+    def load(self, data: Any) -> None:
+        """
+        Restore from ``to_dict`` output. A bare list of keys (the old format) is
+        accepted too. With a ring, saved keys are only imported while the ring
+        is still empty, i.e. when moving from the state file to the ring.
+        Filters saved by older versions are ignored; ``rebuild_bloom`` builds a
+        complete one.
+        """
+        keys: Any = data.get("keys") if isinstance(data, dict) else data
+        if not isinstance(keys, list) or (self._ring is not None and len(self._ring)):
+            keys = []
+
+        if self._ring is None:
+            self._order.clear()
+            self._index.clear()
+        for key in keys[-self.capacity :]:
+            if isinstance(key, str) and key:
+                self.add(key)
+
+    def close(self) -> None:
+        """Write the ring back to disk and unmap it; call once, at shutdown."""
+        if self._ring is not None:
+            self._ring.close()
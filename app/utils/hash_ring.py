@@ -0,0 +1,154 @@
+"""Fixed-size, memory-mapped ring of processed transaction hashes."""
+
+import hashlib
+import logging
+import mmap
+import os
+import re
+import struct
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"WHR1"
+# magic, capacity, next slot to write, number of records
+_HEADER = struct.Struct("<4sIII")
+# 32-byte hash, log index
+_RECORD = struct.Struct("<32sI")
+RECORD_SIZE = _RECORD.size
+
+# Log index stored for plain transaction hashes.
+NO_LOG_INDEX = 0xFFFFFFFF
+# Log index marking a key that wasn't a hash; its 32 bytes are a BLAKE2b digest of the key.
+DIGEST_LOG_INDEX = 0xFFFFFFFE
+
+_HASH_KEY = re.compile(r"0x([0-9a-fA-F]{64})(?::(\d+))?")
+
+
+def encode_key(key: str) -> bytes:
+    """
+    The 36-byte record for a processed key.
+
+    ``0x<64 hex>`` and ``0x<64 hex>:<log index>`` keys are stored raw. Any other
+    key is stored as a digest, which is enough to test membership.
+    """
+    match = _HASH_KEY.fullmatch(key)
+    if match is not None:
+        if match.group(2) is None:
+            return _RECORD.pack(bytes.fromhex(match.group(1)), NO_LOG_INDEX)
+        log_index = int(match.group(2))
+        if log_index < DIGEST_LOG_INDEX:
+            return _RECORD.pack(bytes.fromhex(match.group(1)), log_index)
+    return _RECORD.pack(hashlib.blake2b(key.encode("utf-8"), digest_size=32).digest(), DIGEST_LOG_INDEX)
+
+
+def decode_key(record: bytes) -> Optional[str]:
+    """The key a record was encoded from, or None for digested keys."""
+    digest, log_index = _RECORD.unpack(record)
+    if log_index == DIGEST_LOG_INDEX:
+        return None
+    if log_index == NO_LOG_INDEX:
+        return f"0x{digest.hex()}"
+    return f"0x{digest.hex()}:{log_index}"
+
+
+class HashRing:
+    """
+    The last ``capacity`` records, kept in a preallocated file that is mapped
+    into memory.
+
+    The file holds a 16-byte header (magic, capacity, next slot, count)
+    followed by ``capacity`` 36-byte records. Appending writes one record and
+    the header, so persisting a key touches about 50 bytes instead of
+    rewriting a list. The OS writes dirty pages back, so a process crash loses
+    nothing; ``close`` flushes them for power loss. Opening the ring only
+    maps the file; ``records`` yields raw records straight from the mapping
+    without decoding them.
+    """
+
+    def __init__(self, path: str | Path, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.path = Path(path)
+        self.capacity = capacity
+        self._next = 0
+        self._count = 0
+        self._map = self._open()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, record: bytes) -> Optional[bytes]:
+        """Store ``record``; returns the record it overwrote once the ring is full."""
+        offset = _HEADER.size + self._next * RECORD_SIZE
+        evicted = self._map[offset : offset + RECORD_SIZE] if self._count == self.capacity else None
+        self._map[offset : offset + RECORD_SIZE] = record
+        self._next = (self._next + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+        # Header last: a crash in between loses the new record, never corrupts an old one.
+        _HEADER.pack_into(self._map, 0, MAGIC, self.capacity, self._next, self._count)
+        return evicted
+
+    def records(self) -> Iterator[bytes]:
+        """Oldest first."""
+        start = (self._next - self._count) % self.capacity
+        for i in range(self._count):
+            offset = _HEADER.size + ((start + i) % self.capacity) * RECORD_SIZE
+            yield self._map[offset : offset + RECORD_SIZE]
+
+    def close(self) -> None:
+        if not self._map.closed:
+            self._map.flush()
+            self._map.close()
+
+    def _open(self) -> mmap.mmap:
+        size = _HEADER.size + self.capacity * RECORD_SIZE
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            carried = self._adopt(fd)
+            if carried is None:
+                return mmap.mmap(fd, size)
+            os.ftruncate(fd, 0)
+            os.ftruncate(fd, size)
+            mapping = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+        _HEADER.pack_into(mapping, 0, MAGIC, self.capacity, 0, 0)
+        self._map = mapping
+        for record in carried[-self.capacity :]:
+            self.append(record)
+        return mapping
+
+    def _adopt(self, fd: int) -> Optional[List[bytes]]:
+        """
+        Inspect an existing file. Returns None when it can be used as is (the
+        cursor is then restored), otherwise the records to carry into a fresh
+        file, oldest first.
+        """
+        size = os.fstat(fd).st_size
+        if size == 0:
+            return []
+        if size < _HEADER.size:
+            logger.warning("Processed-hash ring %s is truncated; starting empty.", self.path)
+            return []
+        with mmap.mmap(fd, size, access=mmap.ACCESS_READ) as mapping:
+            magic, capacity, next_slot, count = _HEADER.unpack_from(mapping, 0)
+            if (
+                magic != MAGIC
+                or capacity == 0
+                or size != _HEADER.size + capacity * RECORD_SIZE
+                or next_slot >= capacity
+                or count > capacity
+            ):
+                logger.warning("Processed-hash ring %s is not a valid ring file; starting empty.", self.path)
+                return []
+            if capacity == self.capacity:
+                self._next, self._count = next_slot, count
+                return None
+            # Resized: carry the newest records over.
+            start = (next_slot - count) % capacity
+            offsets = (_HEADER.size + ((start + i) % capacity) * RECORD_SIZE for i in range(count))
+            return [mapping[offset : offset + RECORD_SIZE] for offset in offsets]
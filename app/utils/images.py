@@ -1,20 +1,284 @@
 """Image utility helpers for resizing and preparing images for Telegram."""
 
+import asyncio
 import io
 import logging
+import math
+import threading
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
-from PIL import Image
+from PIL import Image, ImageChops, ImageStat
 
 logger = logging.getLogger(__name__)
 
+# Brand artwork shipped at the repository root.
+BRAND_IMAGE_PATH = Path(__file__).resolve().parents[2] / "wocean.png"
+# Scale factor for brand image (0.5 = half size)
+BRAND_IMAGE_SCALE = 0.5
+
+# Lossy quality settings tried per format, best first.
+QUALITY_TIERS: Tuple[int, ...] = (95, 85, 75, 60)
+LOSSLESS_FORMATS = frozenset({"PNG"})
+_EXTENSIONS = {"PNG": "png", "JPEG": "jpg", "WEBP": "webp"}
+
+
+@dataclass(frozen=True)
+class EncodingPolicy:
+    """
+    Output formats to consider and the bar a variant has to clear.
+
+    ``min_psnr`` is the lowest acceptable PSNR (dB) against the resized
+    source; ``max_bytes`` is a soft payload budget that is only exceeded when
+    no variant clears ``min_psnr`` within it.
+    """
+
+    formats: Tuple[str, ...] = ("PNG",)
+    min_psnr: float = 40.0
+    max_bytes: Optional[int] = None
+
+    @classmethod
+    def parse(cls, formats: str, min_psnr: float, max_bytes: Optional[int]) -> "EncodingPolicy":
+        names = tuple(
+            "JPEG" if name.strip().upper() == "JPG" else name.strip().upper()
+            for name in formats.split(",")
+            if name.strip()
+        )
+        unknown = [name for name in names if name not in _EXTENSIONS]
+        if unknown:
+            raise ValueError(f"Unsupported image format(s): {', '.join(unknown)}")
+        return cls(formats=names or ("PNG",), min_psnr=min_psnr, max_bytes=max_bytes or None)
+
+
+PNG_POLICY = EncodingPolicy()
+
+
+@dataclass(frozen=True)
+class EncodedImage:
+    """Encoded image bytes and the format/quality tier that produced them."""
+
+    data: bytes
+    format: str
+    quality: Optional[int]
+    psnr: float
+    size: Tuple[int, int]
+
+    @property
+    def filename(self) -> str:
+        return f"image.{_EXTENSIONS.get(self.format, self.format.lower())}"
+
+
+# (path, scale, max_width, max_height, policy)
+VariantKey = Tuple[str, float, Optional[int], Optional[int], EncodingPolicy]
+
+
+def _load_resized(
+    image_path: Path,
+    scale: float,
+    max_width: Optional[int],
+    max_height: Optional[int],
+) -> Image.Image:
+    """Decode and resize the source image."""
+    with Image.open(image_path) as img:
+        original_width, original_height = img.size
+
+        if max_width or max_height:
+            # Resize to fit within max dimensions while preserving aspect ratio
+            new_width = max_width or original_width
+            new_height = max_height or original_height
+            img.thumbnail((new_width, new_height), Image.Resampling.LANCZOS)
+            resized = img.copy()
+        else:
+            # Resize by scale factor
+            new_width = int(original_width * scale)
+            new_height = int(original_height * scale)
+            resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+
+    logger.debug(
+        "Resized image from %dx%d to %dx%d",
+        original_width,
+        original_height,
+        resized.size[0],
+        resized.size[1],
+    )
+    return resized
+
+
+def _encode(img: Image.Image, image_format: str, quality: Optional[int], optimize: bool = True) -> bytes:
+    buffer = io.BytesIO()
+    if image_format in LOSSLESS_FORMATS:
+        img.save(buffer, format=image_format, optimize=optimize)
+    elif image_format == "WEBP":
+        img.save(buffer, format=image_format, quality=quality, method=4)
+    else:
+        img.save(buffer, format=image_format, quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def psnr(reference: Image.Image, data: bytes) -> float:
+    """Peak signal-to-noise ratio (dB) of encoded ``data`` against an RGB ``reference``."""
+    with Image.open(io.BytesIO(data)) as decoded:
+        decoded = decoded.convert("RGB")
+        stat = ImageStat.Stat(ImageChops.difference(reference, decoded))
+    width, height = reference.size
+    mse = sum(stat.sum2) / (width * height * len(stat.sum2))
+    if mse == 0:
+        return math.inf
+    return 10 * math.log10(255 ** 2 / mse)
+
+
+def encode_candidates(img: Image.Image, policy: EncodingPolicy) -> List[EncodedImage]:
+    """
+    Encode ``img`` in every format of ``policy``.
+
+    Lossy formats walk ``QUALITY_TIERS`` from best to worst and stop after the
+    first tier that falls below ``policy.min_psnr``. PNG's slow ``optimize``
+    pass only runs when PNG is the only format; next to a lossy format it
+    rarely wins on size anyway.
+    """
+    rgb = img.convert("RGB")
+    candidates: List[EncodedImage] = []
+    for image_format in policy.formats:
+        if image_format in LOSSLESS_FORMATS:
+            data = _encode(img, image_format, None, optimize=len(policy.formats) == 1)
+            candidates.append(EncodedImage(data, image_format, None, math.inf, img.size))
+            continue
+        for quality in QUALITY_TIERS:
+            data = _encode(rgb, image_format, quality)
+            score = psnr(rgb, data)
+            candidates.append(EncodedImage(data, image_format, quality, score, img.size))
+            if score < policy.min_psnr:
+                break
+    return candidates
+
+
+def select_encoding(img: Image.Image, policy: EncodingPolicy) -> EncodedImage:
+    """Pick the smallest candidate that meets the quality bar, preferring those within budget."""
+    candidates = encode_candidates(img, policy)
+    good = [c for c in candidates if c.psnr >= policy.min_psnr]
+    if not good:
+        best = max(candidates, key=lambda c: c.psnr)
+        logger.warning(
+            "No %s variant reaches %.1f dB PSNR; using %s q=%s (%.1f dB).",
+            "/".join(policy.formats),
+            policy.min_psnr,
+            best.format,
+            best.quality,
+            best.psnr,
+        )
+        return best
+    if policy.max_bytes:
+        within = [c for c in good if len(c.data) <= policy.max_bytes]
+        if within:
+            good = within
+        else:
+            logger.warning(
+                "No variant meeting %.1f dB PSNR fits %d bytes; using the smallest.",
+                policy.min_psnr,
+                policy.max_bytes,
+            )
+    return min(good, key=lambda c: len(c.data))
+
+
+class ImageAssetCache:
+    """
+    Process-wide cache of encoded image variants.
+
+    Each (path, scale, max size, encoding policy) variant is decoded, resized
+    and encoded once; callers get a fresh ``BytesIO`` over the shared bytes so
+    concurrent sends never share a file position. Encoding holds a thread
+    lock for up to a second or two, so coroutines use ``get_async``.
+    """
+
+    def __init__(self):
+        self._variants: Dict[VariantKey, EncodedImage] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        image_path: Path,
+        scale: float = 0.5,
+        max_width: Optional[int] = None,
+        max_height: Optional[int] = None,
+        policy: EncodingPolicy = PNG_POLICY,
+    ) -> EncodedImage:
+        key: VariantKey = (str(image_path), scale, max_width, max_height, policy)
+        encoded = self._variants.get(key)
+        if encoded is not None:
+            return encoded
+        with self._lock:
+            encoded = self._variants.get(key)
+            if encoded is None:
+                try:
+                    img = _load_resized(image_path, scale, max_width, max_height)
+                    encoded = select_encoding(img, policy)
+                except Exception:
+                    logger.exception("Failed to resize image %s", image_path)
+                    raise
+                logger.debug(
+                    "Encoded %s as %s q=%s (%d bytes, %.1f dB).",
+                    image_path.name,
+                    encoded.format,
+                    encoded.quality,
+                    len(encoded.data),
+                    encoded.psnr,
+                )
+                self._variants[key] = encoded
+        return encoded
+
+    async def get_async(
+        self,
+        image_path: Path,
+        scale: float = 0.5,
+        max_width: Optional[int] = None,
+        max_height: Optional[int] = None,
+        policy: EncodingPolicy = PNG_POLICY,
+    ) -> EncodedImage:
+        """``get`` for coroutines: a variant that isn't cached yet is encoded on a worker thread."""
+        encoded = self._variants.get((str(image_path), scale, max_width, max_height, policy))
+        if encoded is not None:
+            return encoded
+        return await asyncio.to_thread(self.get, image_path, scale, max_width, max_height, policy)
+
+    def get_bytes(
+        self,
+        image_path: Path,
+        scale: float = 0.5,
+        max_width: Optional[int] = None,
+        max_height: Optional[int] = None,
+        policy: EncodingPolicy = PNG_POLICY,
+    ) -> bytes:
+        return self.get(image_path, scale, max_width, max_height, policy).data
+
+    def open(
+        self,
+        image_path: Path,
+        scale: float = 0.5,
+        max_width: Optional[int] = None,
+        max_height: Optional[int] = None,
+        policy: EncodingPolicy = PNG_POLICY,
+    ) -> io.BytesIO:
+        encoded = self.get(image_path, scale, max_width, max_height, policy)
+        buffer = io.BytesIO(encoded.data)
+        # Lets python-telegram-bot send a filename/MIME type matching the format.
+        buffer.name = encoded.filename
+        return buffer
+
+    def clear(self) -> None:
+        with self._lock:
+            self._variants.clear()
+
+
+image_assets = ImageAssetCache()
+
 
 def resize_image(
     image_path: Path,
     scale: float = 0.5,
     max_width: Optional[int] = None,
     max_height: Optional[int] = None,
+    policy: EncodingPolicy = PNG_POLICY,
 ) -> io.BytesIO:
     """
     Resize an image by a scale factor or to fit within max dimensions.
@@ -24,53 +288,54 @@ def resize_image(
         scale: Scale factor (0.5 = half size). Used if max_width/max_height not set.
         max_width: Optional maximum width in pixels.
         max_height: Optional maximum height in pixels.
+        policy: Output formats and quality bar; PNG by default.
 
     Returns:
-        BytesIO buffer containing the resized PNG image, ready for Telegram.
+        BytesIO buffer containing the resized image, ready for Telegram.
     """
-    try:
-        with Image.open(image_path) as img:
-            original_width, original_height = img.size
-
-            if max_width or max_height:
-                # Resize to fit within max dimensions while preserving aspect ratio
-                new_width = max_width or original_width
-                new_height = max_height or original_height
-                img.thumbnail((new_width, new_height), Image.Resampling.LANCZOS)
-            else:
-                # Resize by scale factor
-                new_width = int(original_width * scale)
-                new_height = int(original_height * scale)
-                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-
-            # Save to BytesIO buffer
-            buffer = io.BytesIO()
-            img.save(buffer, format="PNG", optimize=True)
-            buffer.seek(0)
-
-            logger.debug(
-                "Resized image from %dx%d to %dx%d",
-                original_width,
-                original_height,
-                img.size[0],
-                img.size[1],
-            )
-
-            return buffer
-    except Exception:
-        logger.exception("Failed to resize image %s", image_path)
-        raise
+    return image_assets.open(image_path, scale=scale, max_width=max_width, max_height=max_height, policy=policy)
 
 
-def get_resized_brand_image(image_path: Path, scale: float = 0.5) -> io.BytesIO:
+def get_resized_brand_image(
+    image_path: Path, scale: float = 0.5, policy: EncodingPolicy = PNG_POLICY
+) -> io.BytesIO:
     """
     Get the brand image resized to the specified scale.
 
     Args:
         image_path: Path to the brand image.
         scale: Scale factor (default 0.5 = half size).
+        policy: Output formats and quality bar; PNG by default.
 
     Returns:
         BytesIO buffer containing the resized image.
     """
-    return resize_image(image_path, scale=scale)
+    return resize_image(image_path, scale=scale, policy=policy)
+
+
+def get_brand_image(
+    policy: EncodingPolicy = PNG_POLICY,
+    image_path: Path = BRAND_IMAGE_PATH,
+    scale: float = BRAND_IMAGE_SCALE,
+) -> EncodedImage:
+    """Encoded brand image variant for ``policy`` (cached after the first call)."""
+    return image_assets.get(image_path, scale=scale, policy=policy)
+
+
+async def get_brand_image_async(
+    policy: EncodingPolicy = PNG_POLICY,
+    image_path: Path = BRAND_IMAGE_PATH,
+    scale: float = BRAND_IMAGE_SCALE,
+) -> EncodedImage:
+    """``get_brand_image`` for coroutines; never encodes on the event loop."""
+    return await image_assets.get_async(image_path, scale=scale, policy=policy)
+
+
+def warm_brand_image(
+    image_path: Path = BRAND_IMAGE_PATH,
+    scale: float = BRAND_IMAGE_SCALE,
+    policy: EncodingPolicy = PNG_POLICY,
+) -> None:
+    """Pre-encode the brand variant so the first send does not pay for it."""
+    if image_path.exists():
+        image_assets.get_bytes(image_path, scale=scale, policy=policy)
@@ -0,0 +1,66 @@
+"""Lightweight in-process latency metrics."""
+
+from array import array
+from typing import Dict, List
+
+
+class LatencyStats:
+    """Running count, mean and max of latency samples (seconds)."""
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        return {"count": self.count, "mean_ms": self.mean * 1000, "max_ms": self.max * 1000}
+
+
+class RollingPercentiles:
+    """
+    Percentiles over the most recent ``capacity`` samples (seconds).
+
+    Samples live in a fixed ring; percentiles are computed on read by sorting
+    a copy, which is cheap at this size and keeps ``record`` O(1).
+    """
+
+    __slots__ = ("capacity", "_samples", "_next", "count")
+
+    def __init__(self, capacity: int = 512):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._samples = array("d")
+        self._next = 0
+        self.count = 0
+
+    def record(self, seconds: float) -> None:
+        if len(self._samples) < self.capacity:
+            self._samples.append(seconds)
+        else:
+            self._samples[self._next] = seconds
+        self._next = (self._next + 1) % self.capacity
+        self.count += 1
+
+    def percentiles(self, *quantiles: float) -> List[float]:
+        if not self._samples:
+            return [0.0 for _ in quantiles]
+        ordered = sorted(self._samples)
+        last = len(ordered) - 1
+        return [ordered[min(last, int(round(q * last)))] for q in quantiles]
+
+    def snapshot(self) -> Dict[str, float]:
+        p50, p95, p99 = self.percentiles(0.5, 0.95, 0.99)
+        return {"count": self.count, "p50_ms": p50 * 1000, "p95_ms": p95 * 1000, "p99_ms": p99 * 1000}
@@ -0,0 +1,83 @@
+"""Token-bucket rate limiting primitives."""
+
+import time
+from typing import Dict, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+
+class TokenBucket:
+    """
+    Classic token bucket: holds up to ``capacity`` tokens and refills at
+    ``rate`` tokens per second. Refill is computed lazily on access.
+    """
+
+    __slots__ = ("rate", "capacity", "_tokens", "_updated")
+
+    def __init__(self, rate: float, capacity: float, now: Optional[float] = None):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic() if now is None else now
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0, now: Optional[float] = None) -> bool:
+        self._refill(time.monotonic() if now is None else now)
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    def retry_after(self, tokens: float = 1.0, now: Optional[float] = None) -> float:
+        """Seconds until ``tokens`` will be available (0 if they already are)."""
+        self._refill(time.monotonic() if now is None else now)
+        missing = tokens - self._tokens
+        return max(0.0, missing / self.rate)
+
+    def is_full(self, now: Optional[float] = None) -> bool:
+        self._refill(time.monotonic() if now is None else now)
+        return self._tokens >= self.capacity
+
+
+class KeyedTokenBuckets(Generic[K]):
+    """
+    One ``TokenBucket`` per key, created on demand.
+
+    Once more than ``max_keys`` buckets exist, buckets that have refilled
+    completely are dropped; they carry no state a fresh bucket would not.
+    """
+
+    def __init__(self, rate: float, capacity: float, max_keys: int = 10_000):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self._buckets: Dict[K, TokenBucket] = {}
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def bucket(self, key: K, now: Optional[float] = None) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            now = time.monotonic() if now is None else now
+            if len(self._buckets) >= self.max_keys:
+                self.prune(now)
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.capacity, now)
+        return bucket
+
+    def try_acquire(self, key: K, tokens: float = 1.0, now: Optional[float] = None) -> bool:
+        return self.bucket(key, now).try_acquire(tokens, now)
+
+    def prune(self, now: Optional[float] = None) -> int:
+        now = time.monotonic() if now is None else now
+        idle = [key for key, bucket in self._buckets.items() if bucket.is_full(now)]
+        for key in idle:
+            del self._buckets[key]
+        return len(idle)
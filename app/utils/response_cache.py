@@ -0,0 +1,53 @@
+"""Cache of fully rendered command responses keyed by their source data versions."""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from .metrics import LatencyStats
+
+Stamp = Tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """Rendered reply text plus the stamp of the data it was rendered from."""
+
+    text: str
+    parse_mode: Optional[str]
+    stamp: Stamp
+
+
+class ResponseCache:
+    """
+    Holds the rendered text for parameterless commands.
+
+    An entry is served only while the caller-supplied stamp (the versions of the
+    upstream cache entries it was built from) still matches, so a refresh of
+    the underlying data transparently triggers a re-render.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, CachedResponse] = {}
+        self.render_latency = LatencyStats()
+        self.served_latency = LatencyStats()
+
+    def get(self, key: str, stamp: Optional[Stamp]) -> Optional[CachedResponse]:
+        if stamp is None:
+            return None
+        entry = self._entries.get(key)
+        if entry is None or entry.stamp != stamp:
+            return None
+        return entry
+
+    def put(self, key: str, text: str, parse_mode: Optional[str], stamp: Optional[Stamp]) -> None:
+        if stamp is None:
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = CachedResponse(text=text, parse_mode=parse_mode, stamp=stamp)
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """Compare render-on-demand latency with served-from-cache latency."""
+        return {
+            "rendered": self.render_latency.snapshot(),
+            "served": self.served_latency.snapshot(),
+        }
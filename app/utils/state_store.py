@@ -0,0 +1,191 @@
+"""Process-wide, in-memory JSON state documents with debounced atomic writes."""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+from .metrics import LatencyStats
+
+logger = logging.getLogger(__name__)
+
+# Seconds to coalesce section updates before the document is written.
+DEFAULT_FLUSH_DELAY = 1.0
+
+
+class StateStore:
+    """
+    One JSON document (e.g. ``.alert_state.json``) shared by every service
+    persisting a section into it.
+
+    The file is read once. Services replace whole sections with ``update``,
+    which only marks the section dirty and schedules a flush ``flush_delay``
+    seconds later, so a burst of updates costs one write. A flush
+    re-serializes only the dirty sections. The file is written off the event
+    loop, to a temp file that is fsynced and then renamed over the original,
+    so a crash leaves either the old document or the new one.
+    """
+
+    def __init__(self, path: Path, flush_delay: float = DEFAULT_FLUSH_DELAY):
+        self.path = Path(path)
+        self.flush_delay = max(0.0, flush_delay)
+        self._sections: Dict[str, Any] = {}
+        # Serialized form of each section, refreshed only when it is dirty.
+        self._encoded: Dict[str, str] = {}
+        self._dirty: Set[str] = set()
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_lock = asyncio.Lock()
+        self._write_lock = threading.Lock()
+        self.writes = 0
+        self.write_latency = LatencyStats()
+        self.last_size = 0
+        self._load()
+
+    def get(self, name: str) -> Dict[str, Any]:
+        """The stored section, or an empty dict. Treat it as read-only; use ``update`` to change it."""
+        section = self._sections.get(name)
+        return section if isinstance(section, dict) else {}
+
+    def update(self, name: str, value: Dict[str, Any]) -> None:
+        """Replace section ``name`` and schedule a write."""
+        self._sections[name] = value
+        self._dirty.add(name)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts, start-up code): write straight away.
+            self.flush_sync()
+            return
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.flush_delay, self._start_flush)
+
+    async def flush(self) -> None:
+        """Write pending changes now (in a worker thread)."""
+        self._cancel_scheduled()
+        async with self._flush_lock:
+            payload = self._encode_dirty()
+            if payload is None:
+                return
+            await asyncio.to_thread(self._write, payload)
+
+    def flush_sync(self) -> None:
+        self._cancel_scheduled()
+        payload = self._encode_dirty()
+        if payload is not None:
+            self._write(payload)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "sections": len(self._sections),
+            "dirty": len(self._dirty),
+            "writes": self.writes,
+            "bytes": self.last_size,
+            "write": self.write_latency.snapshot(),
+        }
+
+    def _start_flush(self) -> None:
+        self._flush_handle = None
+        task = asyncio.get_running_loop().create_task(self.flush())
+        task.add_done_callback(_log_flush_failure)
+
+    def _cancel_scheduled(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+    def _encode_dirty(self) -> Optional[str]:
+        if not self._dirty:
+            return None
+        for name in self._dirty:
+            self._encoded[name] = json.dumps(self._sections[name], separators=(",", ":"), default=str)
+        self._dirty.clear()
+        body = ",".join(f"{json.dumps(name)}:{encoded}" for name, encoded in sorted(self._encoded.items()))
+        return "{" + body + "}"
+
+    def _write(self, payload: str) -> None:
+        started = time.perf_counter()
+        data = payload.encode("utf-8")
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        with self._write_lock:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(tmp_path, "wb") as handle:
+                    handle.write(data)
+                    handle.flush()
+                    os.fsync(handle.fileno())
+                os.replace(tmp_path, self.path)
+                _fsync_directory(self.path.parent)
+            except OSError:
+                logger.exception("Failed to write state to %s", self.path)
+                return
+        self.writes += 1
+        self.last_size = len(data)
+        self.write_latency.record(time.perf_counter() - started)
+
+    def _load(self) -> None:
+        try:
+            raw = self.path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return
+        except OSError:
+            logger.exception("Failed to read state from %s", self.path)
+            return
+
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError:
+            logger.warning("State file is invalid JSON: %s", self.path)
+            return
+        if not isinstance(data, dict):
+            return
+
+        self._sections = data
+        # Unknown sections (other tools, older versions) are written back as they were read.
+        self._encoded = {
+            name: json.dumps(section, separators=(",", ":"), default=str) for name, section in data.items()
+        }
+
+
+_stores: Dict[Path, StateStore] = {}
+
+
+def get_state_store(path: str | Path, flush_delay: float = DEFAULT_FLUSH_DELAY) -> StateStore:
+    """The process-wide store for ``path``; every caller naming the same file shares it."""
+    key = Path(path).resolve()
+    store = _stores.get(key)
+    if store is None:
+        store = _stores[key] = StateStore(Path(path), flush_delay)
+    return store
+
+
+async def flush_state_stores() -> None:
+    """Write every store's pending changes (call on shutdown)."""
+    for store in list(_stores.values()):
+        await store.flush()
+
+
+def state_store_metrics() -> Dict[str, Dict[str, Any]]:
+    return {str(store.path): store.metrics() for store in _stores.values()}
+
+
+def _fsync_directory(directory: Path) -> None:
+    # Makes the rename itself durable; not supported everywhere (e.g. Windows).
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _log_flush_failure(task: "asyncio.Task[None]") -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("State flush failed", exc_info=task.exception())
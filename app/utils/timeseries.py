@@ -0,0 +1,309 @@
+"""Compact fixed-size time-series storage backed by ``array('d')`` ring buffers."""
+
+import asyncio
+import logging
+import os
+import struct
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# On-disk record: series name (NUL padded), timestamp, value.
+_RECORD = struct.Struct("<16sdd")
+MAX_SERIES_NAME = 16
+
+
+@dataclass(frozen=True)
+class WindowStats:
+    """Aggregates over the samples that fall inside a query window."""
+
+    count: int
+    first: float
+    last: float
+    min: float
+    max: float
+    mean: float
+    start_ts: float
+    end_ts: float
+
+    @property
+    def change(self) -> float:
+        return self.last - self.first
+
+    @property
+    def change_pct(self) -> Optional[float]:
+        if not self.first:
+            return None
+        return (self.last - self.first) / abs(self.first) * 100
+
+
+class RingSeries:
+    """
+    Fixed-capacity ring of (timestamp, value) samples.
+
+    Appends are O(1) and overwrite the oldest sample once full. Samples are
+    expected in non-decreasing timestamp order, which lets window queries
+    binary-search the start of the window instead of scanning the ring.
+    """
+
+    __slots__ = ("capacity", "_timestamps", "_values", "_head", "_size")
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        self._head = 0  # next slot to write
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, timestamp: float, value: float) -> None:
+        latest = self.latest()
+        if latest is not None and timestamp < latest[0]:
+            # Keep the ring sorted; late samples are dropped rather than reordered.
+            return
+        self._timestamps[self._head] = timestamp
+        self._values[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def copy(self) -> "RingSeries":
+        clone = RingSeries.__new__(RingSeries)
+        clone.capacity = self.capacity
+        clone._timestamps = self._timestamps[:]
+        clone._values = self._values[:]
+        clone._head = self._head
+        clone._size = self._size
+        return clone
+
+    def latest(self) -> Optional[Tuple[float, float]]:
+        if not self._size:
+            return None
+        idx = (self._head - 1) % self.capacity
+        return self._timestamps[idx], self._values[idx]
+
+    def _physical(self, logical: int) -> int:
+        """Map a logical index (0 = oldest) to its slot in the ring."""
+        return (self._head - self._size + logical) % self.capacity
+
+    def _first_index_at_or_after(self, since: float) -> int:
+        lo, hi = 0, self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._timestamps[self._physical(mid)] < since:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def samples(self, since: Optional[float] = None) -> Tuple[List[float], List[float]]:
+        """Return (timestamps, values) oldest-first, optionally limited to ts >= since."""
+        start = self._first_index_at_or_after(since) if since is not None else 0
+        timestamps: List[float] = []
+        values: List[float] = []
+        for logical in range(start, self._size):
+            idx = self._physical(logical)
+            timestamps.append(self._timestamps[idx])
+            values.append(self._values[idx])
+        return timestamps, values
+
+    def window_stats(self, since: float) -> Optional[WindowStats]:
+        start = self._first_index_at_or_after(since)
+        count = self._size - start
+        if count <= 0:
+            return None
+        first_idx = self._physical(start)
+        last_idx = self._physical(self._size - 1)
+        low = high = self._values[first_idx]
+        total = 0.0
+        for logical in range(start, self._size):
+            value = self._values[self._physical(logical)]
+            total += value
+            if value < low:
+                low = value
+            elif value > high:
+                high = value
+        return WindowStats(
+            count=count,
+            first=self._values[first_idx],
+            last=self._values[last_idx],
+            min=low,
+            max=high,
+            mean=total / count,
+            start_ts=self._timestamps[first_idx],
+            end_ts=self._timestamps[last_idx],
+        )
+
+
+class TimeSeriesStore:
+    """
+    Named ring series persisted as an append-only log of fixed-size records.
+
+    Each append writes one 32-byte record; the log is compacted back down to
+    the live ring contents once it grows past twice the retained sample count.
+    Appends update the rings right away. Inside an event loop the records are
+    written, and the log compacted, in a worker thread; compaction works from
+    a copy of the rings taken on the loop.
+    """
+
+    def __init__(self, path: Path, capacity: int):
+        self._path = Path(path)
+        self.capacity = capacity
+        self._series: Dict[str, RingSeries] = {}
+        self._log_records = 0
+        # Records appended in memory but not yet written, and whether the next write compacts.
+        self._pending = bytearray()
+        self._compact_due = False
+        self._flush_lock = asyncio.Lock()
+        self._write_lock = threading.Lock()
+        self._load()
+
+    def series(self, name: str) -> RingSeries:
+        ring = self._series.get(name)
+        if ring is None:
+            ring = self._series[name] = RingSeries(self.capacity)
+        return ring
+
+    @property
+    def names(self) -> List[str]:
+        return sorted(self._series)
+
+    def append(self, name: str, value: float, timestamp: Optional[float] = None) -> None:
+        self.append_many([(name, value)], timestamp=timestamp)
+
+    def append_many(self, samples: Iterable[Tuple[str, float]], timestamp: Optional[float] = None) -> None:
+        """Append one sample per series at a shared timestamp and persist them in one write."""
+        ts = time.time() if timestamp is None else timestamp
+        chunk = bytearray()
+        for name, value in samples:
+            encoded = name.encode("ascii")
+            if len(encoded) > MAX_SERIES_NAME:
+                raise ValueError(f"Series name too long: {name!r}")
+            self.series(name).append(ts, float(value))
+            chunk += _RECORD.pack(encoded, ts, float(value))
+        if not chunk:
+            return
+        self._pending += chunk
+        self._log_records += len(chunk) // _RECORD.size
+        if self._log_records > self._compact_threshold():
+            self._compact_due = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts, start-up code): write straight away.
+            self.flush_sync()
+            return
+        task = loop.create_task(self.flush())
+        task.add_done_callback(_log_flush_failure)
+
+    async def flush(self) -> None:
+        """Write pending records now (in a worker thread)."""
+        async with self._flush_lock:
+            job = self._take_pending()
+            if job is not None:
+                await asyncio.to_thread(self._write, *job)
+
+    def flush_sync(self) -> None:
+        job = self._take_pending()
+        if job is not None:
+            self._write(*job)
+
+    def window_stats(self, name: str, window_seconds: float, now: Optional[float] = None) -> Optional[WindowStats]:
+        ring = self._series.get(name)
+        if ring is None:
+            return None
+        since = (time.time() if now is None else now) - window_seconds
+        return ring.window_stats(since)
+
+    def samples(
+        self, name: str, window_seconds: Optional[float] = None, now: Optional[float] = None
+    ) -> Tuple[List[float], List[float]]:
+        ring = self._series.get(name)
+        if ring is None:
+            return [], []
+        since = None
+        if window_seconds is not None:
+            since = (time.time() if now is None else now) - window_seconds
+        return ring.samples(since)
+
+    def compact(self) -> None:
+        """Rewrite the log now so it only holds samples still retained in memory."""
+        self._compact_due = True
+        self.flush_sync()
+
+    def _compact_threshold(self) -> int:
+        return 2 * self.capacity * max(len(self._series), 1)
+
+    def _take_pending(self) -> Optional[Tuple[bytes, Optional[Dict[str, RingSeries]]]]:
+        if not self._pending and not self._compact_due:
+            return None
+        chunk = bytes(self._pending)
+        self._pending.clear()
+        snapshot: Optional[Dict[str, RingSeries]] = None
+        if self._compact_due:
+            self._compact_due = False
+            snapshot = {name: ring.copy() for name, ring in self._series.items()}
+            self._log_records = sum(len(ring) for ring in snapshot.values())
+        return chunk, snapshot
+
+    def _write(self, chunk: bytes, snapshot: Optional[Dict[str, RingSeries]]) -> None:
+        with self._write_lock:
+            if snapshot is not None:
+                # The copy already holds the pending records.
+                self._rewrite(snapshot)
+                return
+            try:
+                with self._path.open("ab") as handle:
+                    handle.write(chunk)
+            except OSError:
+                logger.exception("Failed to append time-series samples to %s", self._path)
+
+    def _rewrite(self, snapshot: Dict[str, RingSeries]) -> None:
+        chunk = bytearray()
+        for name, ring in snapshot.items():
+            encoded = name.encode("ascii")
+            for ts, value in zip(*ring.samples()):
+                chunk += _RECORD.pack(encoded, ts, value)
+        tmp_path = self._path.with_name(self._path.name + ".tmp")
+        try:
+            with tmp_path.open("wb") as handle:
+                handle.write(chunk)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(tmp_path, self._path)
+        except OSError:
+            logger.exception("Failed to compact time-series log %s", self._path)
+
+    def _load(self) -> None:
+        try:
+            raw = self._path.read_bytes()
+        except FileNotFoundError:
+            return
+        except OSError:
+            logger.exception("Failed to read time-series log from %s", self._path)
+            return
+
+        usable = len(raw) - len(raw) % _RECORD.size
+        if usable != len(raw):
+            logger.warning("Ignoring truncated trailing record in %s", self._path)
+        for name_raw, ts, value in _RECORD.iter_unpack(memoryview(raw)[:usable]):
+            name = name_raw.rstrip(b"\0").decode("ascii", errors="ignore")
+            if name:
+                self.series(name).append(ts, value)
+        self._log_records = usable // _RECORD.size
+        if usable != len(raw) or self._log_records > self._compact_threshold():
+            self.compact()
+
+
+def _log_flush_failure(task: "asyncio.Task[None]") -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Time-series flush failed", exc_info=task.exception())
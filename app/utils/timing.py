@@ -0,0 +1,147 @@
+"""Per-command latency breakdown: upstream wait, render time and Telegram send time."""
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+
+from telegram.request import HTTPXRequest
+
+from .metrics import RollingPercentiles
+
+logger = logging.getLogger(__name__)
+
+
+class _PhaseClock:
+    """
+    Wall time during which at least one operation of a phase was in flight.
+
+    Overlapping operations (e.g. upstream calls fanned out with
+    ``asyncio.gather``) are counted once, so the phases never add up to more
+    than the handler's wall time.
+    """
+
+    __slots__ = ("active", "started", "total")
+
+    def __init__(self):
+        self.active = 0
+        self.started = 0.0
+        self.total = 0.0
+
+    def enter(self) -> None:
+        if self.active == 0:
+            self.started = time.perf_counter()
+        self.active += 1
+
+    def exit(self) -> None:
+        self.active -= 1
+        if self.active == 0:
+            self.total += time.perf_counter() - self.started
+
+
+@dataclass
+class RequestTiming:
+    """Phase clocks for one handler invocation."""
+
+    upstream: _PhaseClock = field(default_factory=_PhaseClock)
+    send: _PhaseClock = field(default_factory=_PhaseClock)
+    started: float = field(default_factory=time.perf_counter)
+
+
+_current: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+
+@contextmanager
+def _phase(name: str) -> Iterator[None]:
+    timing = _current.get()
+    if timing is None:
+        yield
+        return
+    clock: _PhaseClock = getattr(timing, name)
+    clock.enter()
+    try:
+        yield
+    finally:
+        clock.exit()
+
+
+def upstream_phase():
+    """Mark an upstream API call; a no-op outside an instrumented handler."""
+    return _phase("upstream")
+
+
+def send_phase():
+    """Mark a Telegram Bot API call; a no-op outside an instrumented handler."""
+    return _phase("send")
+
+
+@dataclass
+class CommandLatency:
+    total: RollingPercentiles = field(default_factory=RollingPercentiles)
+    upstream: RollingPercentiles = field(default_factory=RollingPercentiles)
+    render: RollingPercentiles = field(default_factory=RollingPercentiles)
+    send: RollingPercentiles = field(default_factory=RollingPercentiles)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {
+            "total": self.total.snapshot(),
+            "upstream": self.upstream.snapshot(),
+            "render": self.render.snapshot(),
+            "send": self.send.snapshot(),
+        }
+
+
+HandlerCallback = Callable[..., Awaitable[Any]]
+
+
+class HandlerTimings:
+    """Rolling p50/p95/p99 of each command's wall time and its phase breakdown."""
+
+    def __init__(self):
+        self._commands: Dict[str, CommandLatency] = {}
+
+    def instrument(self, command: str, callback: HandlerCallback) -> HandlerCallback:
+        async def timed(*args: Any, **kwargs: Any) -> Any:
+            timing = RequestTiming()
+            token = _current.set(timing)
+            try:
+                return await callback(*args, **kwargs)
+            finally:
+                _current.reset(token)
+                self.record(command, timing)
+
+        timed.__name__ = getattr(callback, "__name__", command)
+        timed.__doc__ = getattr(callback, "__doc__", None)
+        return timed
+
+    def record(self, command: str, timing: RequestTiming) -> None:
+        total = time.perf_counter() - timing.started
+        upstream = timing.upstream.total
+        send = timing.send.total
+        latency = self._commands.get(command)
+        if latency is None:
+            latency = self._commands[command] = CommandLatency()
+        latency.total.record(total)
+        latency.upstream.record(upstream)
+        latency.send.record(send)
+        # Whatever is not waiting on someone else is our own work.
+        latency.render.record(max(0.0, total - upstream - send))
+        logger.debug(
+            "/%s took %.1fms (upstream %.1fms, send %.1fms)", command, total * 1000, upstream * 1000, send * 1000
+        )
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        return {command: latency.snapshot() for command, latency in sorted(self._commands.items())}
+
+    def items(self) -> Iterator[Tuple[str, CommandLatency]]:
+        return iter(sorted(self._commands.items()))
+
+
+class TimedHTTPXRequest(HTTPXRequest):
+    """Bot API transport that attributes request time to the handler's send phase."""
+
+    async def do_request(self, *args: Any, **kwargs: Any) -> Tuple[int, bytes]:
+        with send_phase():
+            return await super().do_request(*args, **kwargs)
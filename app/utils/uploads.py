@@ -0,0 +1,109 @@
+"""Reuse Telegram ``file_id`` values for photos the bot has already uploaded."""
+
+import hashlib
+import io
+import logging
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from telegram import Message
+from telegram.error import BadRequest
+
+from .state_store import DEFAULT_FLUSH_DELAY, get_state_store
+
+logger = logging.getLogger(__name__)
+
+STATE_SECTION = "photo_uploads"
+# BadRequest descriptions meaning the cached file_id itself is no longer usable.
+_STALE_FILE_ID_ERRORS = (
+    "wrong file identifier",
+    "wrong remote file identifier",
+    "file reference expired",
+    "invalid file_id",
+    "file_id_invalid",
+)
+
+PhotoInput = Union[str, io.BytesIO]
+PhotoSender = Callable[[PhotoInput], Awaitable[Message]]
+
+
+class PhotoUploadRegistry:
+    """
+    Remembers the ``file_id`` Telegram assigns to each uploaded image variant.
+
+    Variants are keyed by a SHA-256 of their encoded bytes, and ids are stored
+    per bot (file ids are only valid for the bot that uploaded them) under the
+    ``photo_uploads`` section of the shared state file. Once an id is known the
+    photo is sent by reference; if Telegram rejects it the id is dropped and
+    the bytes are uploaded again.
+    """
+
+    def __init__(self, state_path: Path, bot_token: str, flush_delay: float = DEFAULT_FLUSH_DELAY):
+        self._state = get_state_store(state_path, flush_delay)
+        # Never persist the token itself, only a fingerprint of it.
+        self._bot_key = hashlib.sha256(bot_token.encode("utf-8")).hexdigest()[:16]
+        self._file_ids: Dict[str, str] = {}
+        # Digest memo keyed by object identity; the cached asset bytes are long-lived.
+        self._digests: Dict[int, Tuple[bytes, str]] = {}
+        self.uploads = 0
+        self.reuses = 0
+        self._load_state()
+
+    def digest(self, data: bytes) -> str:
+        memo = self._digests.get(id(data))
+        if memo is not None and memo[0] is data:
+            return memo[1]
+        digest = hashlib.sha256(data).hexdigest()
+        self._digests[id(data)] = (data, digest)
+        return digest
+
+    def file_id(self, data: bytes) -> Optional[str]:
+        return self._file_ids.get(self.digest(data))
+
+    async def send(self, data: bytes, send: PhotoSender, filename: Optional[str] = None) -> Message:
+        """
+        Send ``data`` through ``send`` (e.g. ``lambda photo: message.reply_photo(photo=photo, ...)``),
+        by ``file_id`` when one is known and by upload otherwise.
+        """
+        digest = self.digest(data)
+        file_id = self._file_ids.get(digest)
+        if file_id:
+            try:
+                sent = await send(file_id)
+                self.reuses += 1
+                return sent
+            except BadRequest as exc:
+                if not _is_stale_file_id(exc):
+                    # Caption, entities, chat: uploading the bytes would fail the same way.
+                    raise
+                logger.warning("Cached photo file_id rejected (%s); re-uploading.", exc.message)
+                self._file_ids.pop(digest, None)
+                self._save_state()
+
+        buffer = io.BytesIO(data)
+        if filename:
+            buffer.name = filename
+        sent = await send(buffer)
+        self.uploads += 1
+        if sent is not None and sent.photo:
+            self._file_ids[digest] = sent.photo[-1].file_id
+            self._save_state()
+        return sent
+
+    def metrics(self) -> Dict[str, int]:
+        return {"known": len(self._file_ids), "uploads": self.uploads, "reuses": self.reuses}
+
+    def _load_state(self) -> None:
+        section = self._state.get(STATE_SECTION)
+        entries = section.get(self._bot_key) or {}
+        self._file_ids = {str(k): str(v) for k, v in entries.items() if v}
+
+    def _save_state(self) -> None:
+        section = dict(self._state.get(STATE_SECTION))
+        section[self._bot_key] = dict(self._file_ids)
+        self._state.update(STATE_SECTION, section)
+
+
+def _is_stale_file_id(exc: BadRequest) -> bool:
+    message = exc.message.lower()
+    return any(fragment in message for fragment in _STALE_FILE_ID_ERRORS)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Compare encode time, payload size and PSNR of the brand image per format/quality tier.
+
+Usage:
+    python benchmarks/image_formats.py [image_path] [--scale 0.5] [--repeat 5]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.utils.images import (  # noqa: E402
+    BRAND_IMAGE_PATH,
+    BRAND_IMAGE_SCALE,
+    LOSSLESS_FORMATS,
+    QUALITY_TIERS,
+    EncodingPolicy,
+    _encode,
+    _load_resized,
+    psnr,
+    select_encoding,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("image", nargs="?", type=Path, default=BRAND_IMAGE_PATH)
+    parser.add_argument("--scale", type=float, default=BRAND_IMAGE_SCALE)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-psnr", type=float, default=38.0)
+    parser.add_argument("--max-bytes", type=int, default=150_000)
+    args = parser.parse_args()
+
+    img = _load_resized(args.image, args.scale, None, None)
+    rgb = img.convert("RGB")
+    print(f"{args.image.name} -> {img.size[0]}x{img.size[1]} (source {args.image.stat().st_size:,} bytes)")
+    print(f"{'format':<6} {'quality':>7} {'bytes':>9} {'encode ms':>10} {'psnr dB':>8}")
+
+    for image_format in ("PNG", "JPEG", "WEBP"):
+        tiers = (None,) if image_format in LOSSLESS_FORMATS else QUALITY_TIERS
+        source = img if image_format in LOSSLESS_FORMATS else rgb
+        for quality in tiers:
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                data = _encode(source, image_format, quality)
+            elapsed_ms = (time.perf_counter() - started) / args.repeat * 1000
+            score = psnr(rgb, data)
+            print(
+                f"{image_format:<6} {quality if quality else '-':>7} {len(data):>9,} "
+                f"{elapsed_ms:>10.1f} {score:>8.2f}"
+            )
+
+    policy = EncodingPolicy.parse("jpeg,webp,png", args.min_psnr, args.max_bytes)
+    chosen = select_encoding(img, policy)
+    print(
+        f"\nselected for >= {args.min_psnr} dB within {args.max_bytes:,} bytes: "
+        f"{chosen.format} q={chosen.quality} ({len(chosen.data):,} bytes, {chosen.psnr:.2f} dB)"
+    )
+
+
+if __name__ == "__main__":
+    main()